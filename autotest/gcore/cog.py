@@ -1680,3 +1680,44 @@ def test_cog_write_jpegxl_alpha_distance_zero():
     ds = None
 
     gdal.Unlink(filename)
+
+
+###############################################################################
+# Test that the full check of the validation script detects invalid trailers,
+# with each range read on its own, and with coalesced reads
+
+
+@pytest.mark.parametrize("max_gap", [0, 1024 * 1024])
+def test_cog_validate_full_check_invalid_trailer(monkeypatch, max_gap):
+
+    path = samples_path
+    if path not in sys.path:
+        sys.path.append(path)
+    import validate_cloud_optimized_geotiff
+
+    monkeypatch.setattr(validate_cloud_optimized_geotiff, "FULL_CHECK_MAX_GAP", max_gap)
+
+    filename = "/vsimem/test_cog_validate_full_check_invalid_trailer.tif"
+    src_ds = gdal.Open("data/byte.tif")
+    gdal.GetDriverByName("COG").CreateCopy(filename, src_ds, options=["BLOCKSIZE=16"])
+    _check_cog(filename)
+
+    ds = gdal.Open(filename)
+    band = ds.GetRasterBand(1)
+    offset = int(band.GetMetadataItem("BLOCK_OFFSET_1_0", "TIFF"))
+    size = int(band.GetMetadataItem("BLOCK_SIZE_1_0", "TIFF"))
+    ds = None
+
+    f = gdal.VSIFOpenL(filename, "rb+")
+    gdal.VSIFSeekL(f, offset + size - 4, 0)
+    last_bytes = gdal.VSIFReadL(1, 4, f)
+    gdal.VSIFSeekL(f, offset + size, 0)
+    gdal.VSIFWriteL(bytes(255 - x for x in last_bytes), 1, 4, f)
+    gdal.VSIFCloseL(f)
+
+    _, errors, _ = validate_cloud_optimized_geotiff.validate(filename, full_check=True)
+    assert errors == [
+        "Main resolution image: for block (1, 0), trailer bytes are invalid"
+    ]
+
+    gdal.Unlink(filename)
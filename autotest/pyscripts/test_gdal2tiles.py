@@ -631,3 +631,410 @@ def test_gdal2tiles_py_webp(script_path):
 
     if pil_available:
         _run_webp_test(script_path, "antialias")
+
+
+def _run_and_compare_with_reference(script_path, args, reference_args="-q -z 0-2"):
+
+    shutil.rmtree("tmp/out_gdal2tiles_smallworld_ref", ignore_errors=True)
+    shutil.rmtree("tmp/out_gdal2tiles_smallworld", ignore_errors=True)
+
+    test_py_scripts.run_py_script_as_external_script(
+        script_path,
+        "gdal2tiles",
+        reference_args
+        + " "
+        + test_py_scripts.get_data_path("gdrivers")
+        + "small_world.tif tmp/out_gdal2tiles_smallworld_ref",
+    )
+    test_py_scripts.run_py_script_as_external_script(
+        script_path,
+        "gdal2tiles",
+        args
+        + " "
+        + test_py_scripts.get_data_path("gdrivers")
+        + "small_world.tif tmp/out_gdal2tiles_smallworld",
+    )
+
+    try:
+        ref_tiles = sorted(
+            os.path.relpath(f, "tmp/out_gdal2tiles_smallworld_ref")
+            for f in glob.glob("tmp/out_gdal2tiles_smallworld_ref/*/*/*.png")
+        )
+        got_tiles = sorted(
+            os.path.relpath(f, "tmp/out_gdal2tiles_smallworld")
+            for f in glob.glob("tmp/out_gdal2tiles_smallworld/*/*/*.png")
+        )
+        assert ref_tiles
+        assert got_tiles == ref_tiles
+        for tile in ref_tiles:
+            ref_ds = gdal.Open(os.path.join("tmp/out_gdal2tiles_smallworld_ref", tile))
+            expected_cs = [
+                ref_ds.GetRasterBand(i + 1).Checksum()
+                for i in range(ref_ds.RasterCount)
+            ]
+            ref_ds = None
+            _verify_raster_band_checksums(
+                os.path.join("tmp/out_gdal2tiles_smallworld", tile), expected_cs
+            )
+    finally:
+        shutil.rmtree("tmp/out_gdal2tiles_smallworld_ref", ignore_errors=True)
+        shutil.rmtree("tmp/out_gdal2tiles_smallworld", ignore_errors=True)
+
+
+@pytest.mark.require_driver("PNG")
+@pytest.mark.parametrize(
+    "extra_args", ["", "--processes=2", "--tile-store-max-memory=0"]
+)
+def test_gdal2tiles_py_in_memory_overviews(script_path, extra_args):
+
+    # Same result as when overviews are built from the PNG files
+    _run_and_compare_with_reference(
+        script_path, "-q -z 0-2 --in-memory-overviews " + extra_args
+    )
+
+
+def test_gdal2tiles_py_tile_store(tmp_path):
+
+    from osgeo_utils.gdal2tiles import TileStore
+
+    store = TileStore(10, str(tmp_path))
+    store.put((1, 0, 0), b"0123456789")
+    store.put((1, 1, 0), b"abcdefghij")
+    # First tile spilled to disk
+    assert len(store) == 2
+    assert (1, 0, 0) in store
+    assert len(os.listdir(str(tmp_path))) == 1
+    assert store.pop((1, 0, 0)) == b"0123456789"
+    assert not os.listdir(str(tmp_path))
+    assert store.pop((1, 0, 0)) is None
+    assert store.pop((1, 1, 0)) == b"abcdefghij"
+    assert len(store) == 0
+
+    store.put((2, 0, 0), b"0123456789ABCDEF")
+    assert len(os.listdir(str(tmp_path))) == 1
+    store.close()
+    assert not os.listdir(str(tmp_path))
+
+
+@pytest.mark.require_driver("PNG")
+@pytest.mark.parametrize(
+    "extra_args",
+    ["", "--processes=2", "--in-memory-overviews", "--processes=2 --xyz"],
+)
+def test_gdal2tiles_py_depth_first(script_path, extra_args):
+
+    # Same result as when tiles are generated one zoom level after the other
+    _run_and_compare_with_reference(
+        script_path,
+        "-q -z 0-2 --depth-first " + extra_args,
+        "-q -z 0-2 --xyz" if "--xyz" in extra_args else "-q -z 0-2",
+    )
+
+
+def test_gdal2tiles_py_morton_code():
+
+    from osgeo_utils.gdal2tiles import morton_code
+
+    tiles = [(x, y) for y in range(4) for x in range(4)]
+    tiles.sort(key=lambda t: morton_code(*t))
+    assert tiles[0:4] == [(0, 0), (1, 0), (0, 1), (1, 1)]
+    assert tiles[4:8] == [(2, 0), (3, 0), (2, 1), (3, 1)]
+    assert tiles[8:12] == [(0, 2), (1, 2), (0, 3), (1, 3)]
+
+
+@pytest.mark.require_driver("PNG")
+@pytest.mark.parametrize("extra_args", ["", "--processes=2"])
+def test_gdal2tiles_py_mbtiles(script_path, extra_args):
+
+    import sqlite3
+
+    shutil.rmtree("tmp/out_gdal2tiles_smallworld_ref", ignore_errors=True)
+    gdal.Unlink("tmp/out_gdal2tiles_smallworld.mbtiles")
+
+    test_py_scripts.run_py_script_as_external_script(
+        script_path,
+        "gdal2tiles",
+        "-q -z 0-2 "
+        + test_py_scripts.get_data_path("gdrivers")
+        + "small_world.tif tmp/out_gdal2tiles_smallworld_ref",
+    )
+    test_py_scripts.run_py_script_as_external_script(
+        script_path,
+        "gdal2tiles",
+        "-q -z 0-2 --container=mbtiles "
+        + extra_args
+        + " "
+        + test_py_scripts.get_data_path("gdrivers")
+        + "small_world.tif tmp/out_gdal2tiles_smallworld.mbtiles",
+    )
+
+    try:
+        conn = sqlite3.connect("tmp/out_gdal2tiles_smallworld.mbtiles")
+        metadata = dict(conn.execute("SELECT name, value FROM metadata"))
+        assert metadata["format"] == "png"
+        assert metadata["minzoom"] == "0"
+        assert metadata["maxzoom"] == "2"
+        tiles = conn.execute(
+            "SELECT zoom_level, tile_column, tile_row, tile_data FROM tiles"
+        ).fetchall()
+        conn.close()
+
+        ref_tiles = glob.glob("tmp/out_gdal2tiles_smallworld_ref/*/*/*.png")
+        assert len(tiles) == len(ref_tiles)
+        for tz, tx, ty, tile_data in tiles:
+            ref_ds = gdal.Open(
+                "tmp/out_gdal2tiles_smallworld_ref/%d/%d/%d.png" % (tz, tx, ty)
+            )
+            expected_cs = [
+                ref_ds.GetRasterBand(i + 1).Checksum()
+                for i in range(ref_ds.RasterCount)
+            ]
+            ref_ds = None
+            gdal.FileFromMemBuffer("/vsimem/tile.png", tile_data)
+            _verify_raster_band_checksums("/vsimem/tile.png", expected_cs)
+            gdal.Unlink("/vsimem/tile.png")
+
+        if gdal.GetDriverByName("MBTiles") is not None:
+            ds = gdal.Open("tmp/out_gdal2tiles_smallworld.mbtiles")
+            assert ds is not None
+            assert ds.GetRasterBand(1).GetOverviewCount() == 2
+            ds = None
+    finally:
+        shutil.rmtree("tmp/out_gdal2tiles_smallworld_ref", ignore_errors=True)
+        gdal.Unlink("tmp/out_gdal2tiles_smallworld.mbtiles")
+
+
+def _get_tile_checksums(directory):
+
+    checksums = {}
+    for f in glob.glob(directory + "/*/*/*.png"):
+        ds = gdal.Open(f)
+        checksums[os.path.relpath(f, directory)] = [
+            ds.GetRasterBand(i + 1).Checksum() for i in range(ds.RasterCount)
+        ]
+        ds = None
+    return checksums
+
+
+@pytest.mark.require_driver("PNG")
+def test_gdal2tiles_py_dirty_bbox(script_path):
+
+    shutil.rmtree("tmp/out_gdal2tiles_smallworld", ignore_errors=True)
+
+    input_file = test_py_scripts.get_data_path("gdrivers") + "small_world.tif"
+    try:
+        test_py_scripts.run_py_script_as_external_script(
+            script_path,
+            "gdal2tiles",
+            "-q -z 0-2 " + input_file + " tmp/out_gdal2tiles_smallworld",
+        )
+        ref_checksums = _get_tile_checksums("tmp/out_gdal2tiles_smallworld")
+
+        # Tiles of the western hemisphere are not regenerated
+        os.unlink("tmp/out_gdal2tiles_smallworld/2/0/1.png")
+        os.unlink("tmp/out_gdal2tiles_smallworld/2/3/1.png")
+        os.unlink("tmp/out_gdal2tiles_smallworld/1/1/1.png")
+        os.unlink("tmp/out_gdal2tiles_smallworld/0/0/0.png")
+        test_py_scripts.run_py_script_as_external_script(
+            script_path,
+            "gdal2tiles",
+            "-q -z 0-2 --dirty-bbox=100,-80,170,80 "
+            + input_file
+            + " tmp/out_gdal2tiles_smallworld",
+        )
+        assert not os.path.exists("tmp/out_gdal2tiles_smallworld/2/0/1.png")
+        del ref_checksums[os.path.join("2", "0", "1.png")]
+        assert _get_tile_checksums("tmp/out_gdal2tiles_smallworld") == ref_checksums
+    finally:
+        shutil.rmtree("tmp/out_gdal2tiles_smallworld", ignore_errors=True)
+
+
+@pytest.mark.require_driver("PNG")
+@pytest.mark.parametrize("resampling,regenerated", [("near", False), ("cubic", True)])
+def test_gdal2tiles_py_dirty_bbox_resampling_kernel(
+    script_path, resampling, regenerated
+):
+
+    shutil.rmtree("tmp/out_gdal2tiles_smallworld", ignore_errors=True)
+
+    input_file = test_py_scripts.get_data_path("gdrivers") + "small_world.tif"
+    try:
+        test_py_scripts.run_py_script_as_external_script(
+            script_path,
+            "gdal2tiles",
+            "-q -z 0-2 -r %s %s tmp/out_gdal2tiles_smallworld"
+            % (resampling, input_file),
+        )
+        ref_checksums = _get_tile_checksums("tmp/out_gdal2tiles_smallworld")
+
+        # The dirty bbox starts less than a pixel east of the 2/2/1 tile: it
+        # is within the kernel radius of cubic resampling
+        os.unlink("tmp/out_gdal2tiles_smallworld/2/2/1.png")
+        test_py_scripts.run_py_script_as_external_script(
+            script_path,
+            "gdal2tiles",
+            "-q -z 2 -r %s --dirty-bbox=90.5,-80,170,80 %s "
+            "tmp/out_gdal2tiles_smallworld" % (resampling, input_file),
+        )
+        assert os.path.exists("tmp/out_gdal2tiles_smallworld/2/2/1.png") == regenerated
+        if not regenerated:
+            del ref_checksums[os.path.join("2", "2", "1.png")]
+        assert _get_tile_checksums("tmp/out_gdal2tiles_smallworld") == ref_checksums
+    finally:
+        shutil.rmtree("tmp/out_gdal2tiles_smallworld", ignore_errors=True)
+
+
+@pytest.mark.require_driver("PNG")
+def test_gdal2tiles_py_incremental(script_path):
+
+    shutil.rmtree("tmp/out_gdal2tiles_incremental", ignore_errors=True)
+    shutil.rmtree("tmp/out_gdal2tiles_incremental_ref", ignore_errors=True)
+    os.makedirs("tmp/out_gdal2tiles_incremental")
+
+    src_filename = test_py_scripts.get_data_path("gdrivers") + "small_world.tif"
+    west = "tmp/out_gdal2tiles_incremental/west.tif"
+    east = "tmp/out_gdal2tiles_incremental/east.tif"
+    vrt = "tmp/out_gdal2tiles_incremental/mosaic.vrt"
+    output_folder = "tmp/out_gdal2tiles_incremental/tiles"
+    try:
+        gdal.Translate(west, src_filename, srcWin=[0, 0, 200, 200])
+        gdal.Translate(east, src_filename, srcWin=[200, 0, 200, 200])
+        gdal.BuildVRT(vrt, [west, east])
+
+        test_py_scripts.run_py_script_as_external_script(
+            script_path,
+            "gdal2tiles",
+            "-q -z 0-2 --incremental %s %s" % (vrt, output_folder),
+        )
+        assert os.path.exists(output_folder + "/gdal2tiles_manifest.json")
+
+        # Nothing changed: no tile is regenerated
+        os.unlink(output_folder + "/2/0/1.png")
+        test_py_scripts.run_py_script_as_external_script(
+            script_path,
+            "gdal2tiles",
+            "-q -z 0-2 --incremental %s %s" % (vrt, output_folder),
+        )
+        assert not os.path.exists(output_folder + "/2/0/1.png")
+
+        # Modify the eastern source: only the tiles covering it are regenerated
+        ds = gdal.Open(east, gdal.GA_Update)
+        ds.GetRasterBand(1).WriteRaster(0, 0, 10, 10, b"\x00" * 100)
+        ds = None
+        st = os.stat(east)
+        os.utime(east, (st.st_atime + 10, st.st_mtime + 10))
+        test_py_scripts.run_py_script_as_external_script(
+            script_path,
+            "gdal2tiles",
+            "-q -z 0-2 --incremental %s %s" % (vrt, output_folder),
+        )
+        assert not os.path.exists(output_folder + "/2/0/1.png")
+
+        test_py_scripts.run_py_script_as_external_script(
+            script_path,
+            "gdal2tiles",
+            "-q -z 0-2 %s tmp/out_gdal2tiles_incremental_ref" % vrt,
+        )
+        ref_checksums = _get_tile_checksums("tmp/out_gdal2tiles_incremental_ref")
+        del ref_checksums[os.path.join("2", "0", "1.png")]
+        assert _get_tile_checksums(output_folder) == ref_checksums
+    finally:
+        shutil.rmtree("tmp/out_gdal2tiles_incremental", ignore_errors=True)
+        shutil.rmtree("tmp/out_gdal2tiles_incremental_ref", ignore_errors=True)
+
+
+@pytest.mark.require_driver("PNG")
+@pytest.mark.parametrize("extra_args", ["", "-x", "-x --processes=2"])
+def test_gdal2tiles_py_coverage_mask(script_path, extra_args):
+
+    shutil.rmtree("tmp/out_gdal2tiles_coverage", ignore_errors=True)
+    shutil.rmtree("tmp/out_gdal2tiles_coverage_ref", ignore_errors=True)
+
+    # Input whose western hemisphere is nodata
+    input_file = "tmp/out_gdal2tiles_coverage.tif"
+    ds = gdal.Translate(
+        input_file,
+        test_py_scripts.get_data_path("gdrivers") + "small_world.tif",
+        noData=0,
+    )
+    for i in range(ds.RasterCount):
+        ds.GetRasterBand(i + 1).WriteRaster(0, 0, 200, 200, b"\x00" * (200 * 200))
+    ds = None
+
+    try:
+        test_py_scripts.run_py_script_as_external_script(
+            script_path,
+            "gdal2tiles",
+            "-q -z 0-3 %s %s tmp/out_gdal2tiles_coverage_ref"
+            % (extra_args, input_file),
+        )
+        test_py_scripts.run_py_script_as_external_script(
+            script_path,
+            "gdal2tiles",
+            "-q -z 0-3 --coverage-mask %s %s tmp/out_gdal2tiles_coverage"
+            % (extra_args, input_file),
+        )
+        ref_checksums = _get_tile_checksums("tmp/out_gdal2tiles_coverage_ref")
+        assert ref_checksums
+        assert _get_tile_checksums("tmp/out_gdal2tiles_coverage") == ref_checksums
+        if "-x" in extra_args:
+            assert not os.path.exists("tmp/out_gdal2tiles_coverage/3/0/4.png")
+        else:
+            # Fully transparent tiles are encoded only once
+            with open("tmp/out_gdal2tiles_coverage/3/0/4.png", "rb") as f:
+                empty_tile = f.read()
+            with open("tmp/out_gdal2tiles_coverage/3/1/4.png", "rb") as f:
+                assert f.read() == empty_tile
+    finally:
+        shutil.rmtree("tmp/out_gdal2tiles_coverage", ignore_errors=True)
+        shutil.rmtree("tmp/out_gdal2tiles_coverage_ref", ignore_errors=True)
+        gdal.Unlink(input_file)
+
+
+@pytest.mark.require_driver("PNG")
+@pytest.mark.parametrize(
+    "extra_args", ["", "-r near", "--processes=2", "--depth-first --processes=2"]
+)
+def test_gdal2tiles_py_metatile(script_path, extra_args):
+
+    shutil.rmtree("tmp/out_gdal2tiles_smallworld", ignore_errors=True)
+    shutil.rmtree("tmp/out_gdal2tiles_smallworld_ref", ignore_errors=True)
+
+    input_file = test_py_scripts.get_data_path("gdrivers") + "small_world.tif"
+    try:
+        test_py_scripts.run_py_script_as_external_script(
+            script_path,
+            "gdal2tiles",
+            "-q -z 0-3 %s %s tmp/out_gdal2tiles_smallworld_ref"
+            % (extra_args, input_file),
+        )
+        test_py_scripts.run_py_script_as_external_script(
+            script_path,
+            "gdal2tiles",
+            "-q -z 0-3 --metatile=4 %s %s tmp/out_gdal2tiles_smallworld"
+            % (extra_args, input_file),
+        )
+        ref_tiles = sorted(
+            os.path.relpath(f, "tmp/out_gdal2tiles_smallworld_ref")
+            for f in glob.glob("tmp/out_gdal2tiles_smallworld_ref/*/*/*.png")
+        )
+        got_tiles = sorted(
+            os.path.relpath(f, "tmp/out_gdal2tiles_smallworld")
+            for f in glob.glob("tmp/out_gdal2tiles_smallworld/*/*/*.png")
+        )
+        assert got_tiles == ref_tiles
+
+        # Tiles only differ by the resampling at the border of the tiles,
+        # which uses the pixels of the neighbouring tiles with metatiles
+        for tile in ref_tiles:
+            ref_ds = gdal.Open(os.path.join("tmp/out_gdal2tiles_smallworld_ref", tile))
+            ds = gdal.Open(os.path.join("tmp/out_gdal2tiles_smallworld", tile))
+            assert ds.RasterCount == ref_ds.RasterCount
+            for i in range(ds.RasterCount):
+                ref_data = ref_ds.GetRasterBand(i + 1).ReadRaster()
+                data = ds.GetRasterBand(i + 1).ReadRaster()
+                mean_diff = sum(abs(a - b) for a, b in zip(ref_data, data)) / len(data)
+                assert mean_diff < 2, (tile, i)
+    finally:
+        shutil.rmtree("tmp/out_gdal2tiles_smallworld", ignore_errors=True)
+        shutil.rmtree("tmp/out_gdal2tiles_smallworld_ref", ignore_errors=True)
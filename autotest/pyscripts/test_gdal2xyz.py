@@ -109,6 +109,88 @@ def test_gdal2xyz_py_1():
         assert np.all(np.equal(data, data2))
 
 
+###############################################################################
+# Test srcwin and skip, with several blocks
+
+
+def test_gdal2xyz_py_srcwin_skip(tmp_path):
+
+    ds = gdal.Open(test_py_scripts.get_data_path("gcore") + "byte.tif")
+    gt = ds.GetGeoTransform()
+    srcwin = (2, 3, 11, 9)
+    skip = (2, 3)
+
+    geo_x, geo_y, data, nodata = gdal2xyz.gdal2xyz(
+        ds,
+        None,
+        srcwin=srcwin,
+        skip=skip,
+        return_np_arrays=True,
+        block_pixels=7,
+        progress_callback=None,
+    )
+    assert nodata is None
+    expected = ds.GetRasterBand(1).ReadAsArray(*srcwin)[:: skip[1], :: skip[0]]
+    assert np.array_equal(data, expected.reshape(1, -1))
+    pixels, lines = np.meshgrid(
+        np.arange(srcwin[0], srcwin[0] + srcwin[2], skip[0]),
+        np.arange(srcwin[1], srcwin[1] + srcwin[3], skip[1]),
+    )
+    assert np.array_equal(geo_x, gt[0] + (pixels.ravel() + 0.5) * gt[1])
+    assert np.array_equal(geo_y, gt[3] + (lines.ravel() + 0.5) * gt[5])
+
+    # the text output does not depend on the block size
+    outputs = []
+    for block_pixels in (1, 7, 65536):
+        dstfile = str(tmp_path / ("out%d.xyz" % block_pixels))
+        gdal2xyz.gdal2xyz(
+            ds,
+            dstfile,
+            srcwin=srcwin,
+            skip=skip,
+            block_pixels=block_pixels,
+            progress_callback=None,
+        )
+        with open(dstfile) as f:
+            outputs.append(f.read())
+    assert outputs[0] == outputs[1] == outputs[2]
+    lines = outputs[0].splitlines()
+    assert len(lines) == data.shape[1]
+    assert lines[0] == "%.3f %.3f %g" % (geo_x[0], geo_y[0], data[0, 0])
+
+
+###############################################################################
+# Test gdal2xyz_chunks
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 400, 1000])
+def test_gdal2xyz_py_chunks(chunk_size):
+
+    ds = gdal.Open(test_py_scripts.get_data_path("gcore") + "byte.tif")
+    src_nodata = int(ds.GetRasterBand(1).ReadAsArray()[0, 0])
+
+    chunks = list(
+        gdal2xyz.gdal2xyz_chunks(ds, src_nodata=src_nodata, chunk_size=chunk_size)
+    )
+    assert chunks
+    assert all(len(geo_x) == chunk_size for geo_x, _, _ in chunks[:-1])
+    assert 0 < len(chunks[-1][0]) <= chunk_size
+
+    geo_x, geo_y, data, nodata = gdal2xyz.gdal2xyz(
+        ds,
+        None,
+        src_nodata=src_nodata,
+        skip_nodata=True,
+        return_np_arrays=True,
+        progress_callback=None,
+    )
+    assert nodata is None
+    assert src_nodata not in data
+    assert np.array_equal(np.concatenate([c[0] for c in chunks]), geo_x)
+    assert np.array_equal(np.concatenate([c[1] for c in chunks]), geo_y)
+    assert np.array_equal(np.concatenate([c[2] for c in chunks], axis=1), data)
+
+
 ###############################################################################
 # Test -b at beginning
 
@@ -565,6 +565,140 @@ def test_gdal_calc_py_multiple_inputs_same_alpha(script_path):
     assert cs == cs_ref
 
 
+def test_gdal_calc_py_chunk_size():
+    """test processing by chunks of several blocks"""
+
+    infile = get_input_file()
+    calc = "(A.astype(numpy.float32)-B)/(A.astype(numpy.float32)+B+1)"
+    ref_ds = gdal_calc.Calc(
+        calc, A=infile, B=infile, B_band=2, format="MEM", type="Float32"
+    )
+    for chunk_size in (0.0001, 0.01, 100):
+        ds = gdal_calc.Calc(
+            calc,
+            A=infile,
+            B=infile,
+            B_band=2,
+            format="MEM",
+            type="Float32",
+            chunk_size=chunk_size,
+        )
+        assert ds.GetRasterBand(1).ReadRaster() == ref_ds.GetRasterBand(1).ReadRaster()
+
+
+def test_gdal_calc_py_threads(script_path):
+    """test computing blocks with several threads"""
+
+    infile = get_input_file()
+    calc = ["A*(A>B)+B*(B>=A)", "A.astype(numpy.float32)/(B+1)"]
+    ref_ds = gdal_calc.Calc(
+        calc, A=infile, B=infile, B_band=2, format="MEM", type="Float32"
+    )
+    ds = gdal_calc.Calc(
+        calc,
+        A=infile,
+        B=infile,
+        B_band=2,
+        format="MEM",
+        type="Float32",
+        chunk_size=0.001,
+        threads=4,
+    )
+    for i in range(2):
+        assert (
+            ds.GetRasterBand(i + 1).ReadRaster()
+            == ref_ds.GetRasterBand(i + 1).ReadRaster()
+        )
+
+    test_py_scripts.run_py_script(
+        script_path,
+        "gdal_calc",
+        f'-A {infile} --calc="A*2" --threads=2 --overwrite '
+        "--outfile tmp/test_gdal_calc_py_threads.tif",
+    )
+    ds = gdal.Open("tmp/test_gdal_calc_py_threads.tif")
+    ref_ds = gdal_calc.Calc("A*2", A=infile, format="MEM")
+    assert ds.GetRasterBand(1).Checksum() == ref_ds.GetRasterBand(1).Checksum()
+    ds = None
+    gdal.Unlink("tmp/test_gdal_calc_py_threads.tif")
+
+
+def test_gdal_calc_py_numexpr(script_path):
+    """test the numexpr engine"""
+
+    pytest.importorskip("numexpr")
+
+    infile = get_input_file()
+    for calc in ("(A-B)/(A+B+1.0)", "where(A>B, A*2, sqrt(B))", "sum(A,axis=0)"):
+        args = {"A": infile, "B": infile, "B_band": 2}
+        if calc.startswith("sum"):
+            args = {"A": [infile, infile]}
+        ref_ds = gdal_calc.Calc(calc, format="MEM", type="Float32", **args)
+        ds = gdal_calc.Calc(
+            calc, format="MEM", type="Float32", engine="numexpr", **args
+        )
+        ref_array = ref_ds.GetRasterBand(1).ReadAsArray()
+        array = ds.GetRasterBand(1).ReadAsArray()
+        assert np.allclose(array, ref_array)
+
+    test_py_scripts.run_py_script(
+        script_path,
+        "gdal_calc",
+        f'-A {infile} --calc="A*2.0" --engine=numexpr --chunk-size=0.5 '
+        "--type=Float32 --overwrite --outfile tmp/test_gdal_calc_py_numexpr.tif",
+    )
+    ds = gdal.Open("tmp/test_gdal_calc_py_numexpr.tif")
+    assert np.array_equal(
+        ds.GetRasterBand(1).ReadAsArray(),
+        gdal.Open(infile).GetRasterBand(1).ReadAsArray() * 2.0,
+    )
+    ds = None
+    gdal.Unlink("tmp/test_gdal_calc_py_numexpr.tif")
+
+
+def test_gdal_calc_py_nodata_mask():
+    """test nodata propagation and masked arrays"""
+
+    a = np.array([[0, 1, 2], [3, 0, 200]], dtype=np.uint8)
+    b = np.array([[10, 20, 0], [40, 50, 60]], dtype=np.uint8)
+    for name, array in (("a", a), ("b", b)):
+        ds = gdal.GetDriverByName("GTiff").Create(
+            f"/vsimem/test_gdal_calc_py_nodata_mask_{name}.tif", 3, 2
+        )
+        ds.GetRasterBand(1).WriteArray(array)
+        ds.GetRasterBand(1).SetNoDataValue(0)
+        ds = None
+    A = "/vsimem/test_gdal_calc_py_nodata_mask_a.tif"
+    B = "/vsimem/test_gdal_calc_py_nodata_mask_b.tif"
+
+    # the output nodata value does not fit in the data type of the calculation
+    ds = gdal_calc.Calc("A+B", A=A, B=B, format="MEM", type="Int16", NoDataValue=-9999)
+    assert ds.GetRasterBand(1).GetNoDataValue() == -9999
+    assert ds.GetRasterBand(1).ReadAsArray().tolist() == [
+        [-9999, 21, -9999],
+        [43, -9999, 4],
+    ]
+
+    # with masked arrays, the calculation decides which cells are nodata
+    ds = gdal_calc.Calc(
+        "A.filled(0)+B", A=A, B=B, format="MEM", NoDataValue=255, masked=True
+    )
+    assert ds.GetRasterBand(1).ReadAsArray().tolist() == [
+        [10, 21, 255],
+        [43, 50, 4],
+    ]
+    ds = gdal_calc.Calc(
+        "maximum(A,B)", A=A, B=B, format="MEM", NoDataValue=255, masked=True
+    )
+    assert ds.GetRasterBand(1).ReadAsArray().tolist() == [
+        [255, 20, 255],
+        [40, 255, 200],
+    ]
+
+    gdal.Unlink(A)
+    gdal.Unlink(B)
+
+
 def test_gdal_calc_py_cleanup():
     """cleanup all temporary files that were created in this pytest"""
     global temp_counter_dict
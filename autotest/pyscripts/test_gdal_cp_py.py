@@ -0,0 +1,168 @@
+#!/usr/bin/env pytest
+# -*- coding: utf-8 -*-
+###############################################################################
+#
+# Project:  GDAL/OGR Test Suite
+# Purpose:  gdal_cp.py testing
+#
+###############################################################################
+# Copyright (c) 2023, GDAL contributors
+#
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included
+# in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+# OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+###############################################################################
+
+import threading
+
+import pytest
+
+pytest.importorskip("osgeo_utils.samples.gdal_cp")
+
+from osgeo import gdal
+from osgeo_utils.samples import gdal_cp
+
+# name -> size, a size of None being a directory
+TREE = {
+    "a.bin": 1000,
+    "empty.bin": 0,
+    "sub": None,
+    "sub/b.bin": 20000,
+    "sub/c.tif": 300,
+    "sub/subsub": None,
+    "sub/subsub/d.tif": 5000,
+    "emptydir": None,
+}
+
+
+def create_tree(root):
+    gdal.MkdirRecursive(root, 0o755)
+    for name, size in TREE.items():
+        if size is None:
+            gdal.Mkdir(root + "/" + name, 0o755)
+        else:
+            content = bytes((i * 7 + len(name)) % 256 for i in range(size))
+            gdal.FileFromMemBuffer(root + "/" + name, content)
+
+
+def read_file(filename):
+    f = gdal.VSIFOpenL(filename, "rb")
+    assert f is not None, filename
+    content = gdal.VSIFReadL(1, 1000000, f)
+    gdal.VSIFCloseL(f)
+    return content
+
+
+def check_tree(src_root, dst_root, names=TREE):
+    for name, size in names.items():
+        stat = gdal.VSIStatL(dst_root + "/" + name)
+        assert stat is not None, name
+        if size is None:
+            assert stat.IsDirectory(), name
+        else:
+            assert stat.size == size, name
+            assert read_file(dst_root + "/" + name) == read_file(
+                src_root + "/" + name
+            ), name
+
+
+@pytest.fixture()
+def vsimem_tree():
+    create_tree("/vsimem/gdal_cp_py/src")
+    yield "/vsimem/gdal_cp_py"
+    gdal.RmdirRecursive("/vsimem/gdal_cp_py")
+
+
+@pytest.mark.parametrize("progress", [None, "-progress", "callback"])
+def test_gdal_cp_py_recurse_parallel(vsimem_tree, progress):
+
+    src = vsimem_tree + "/src"
+    dst = vsimem_tree + "/dst"
+    argv = ["", "-r", "-j", "4", src, dst]
+    values = []
+
+    def callback(pct, msg, user_data):
+        values.append(pct)
+        return 1
+
+    if progress == "-progress":
+        assert gdal_cp.gdal_cp(argv[0:1] + ["-progress"] + argv[1:]) == 0
+    else:
+        assert gdal_cp.gdal_cp(argv, callback if progress == "callback" else None) == 0
+    check_tree(src, dst)
+
+    if progress == "callback":
+        assert values[0] == 0
+        assert values[-1] == pytest.approx(1)
+        assert values == sorted(values)
+
+    # nothing more
+    assert sorted(gdal.ReadDirRecursive(dst)) == sorted(gdal.ReadDirRecursive(src))
+
+
+def test_gdal_cp_py_recurse_parallel_chunked(vsimem_tree, monkeypatch):
+
+    # use the gdal.Sync() path for the larger files of the tree
+    sync_sources = []
+    sync = gdal.Sync
+
+    def sync_wrapper(src, dst, *args, **kwargs):
+        sync_sources.append(src)
+        # large files are transferred one at a time, outside of the pool
+        assert threading.current_thread() is threading.main_thread()
+        assert "NUM_THREADS=4" in kwargs["options"]
+        return sync(src, dst, *args, **kwargs)
+
+    monkeypatch.setattr(gdal_cp, "CHUNKED_TRANSFER_PREFIXES", ("/vsimem/",))
+    monkeypatch.setattr(gdal_cp, "LARGE_FILE_SIZE", 4000)
+    monkeypatch.setattr(gdal, "Sync", sync_wrapper)
+
+    src = vsimem_tree + "/src"
+    dst = vsimem_tree + "/dst"
+    values = []
+
+    def callback(pct, msg, user_data):
+        values.append(pct)
+        return 1
+
+    assert gdal_cp.gdal_cp(["", "-r", "-j", "4", src, dst], callback) == 0
+    check_tree(src, dst)
+    assert sorted(sync_sources) == [src + "/sub/b.bin", src + "/sub/subsub/d.tif"]
+    assert values[-1] == pytest.approx(1)
+
+
+def test_gdal_cp_py_pattern_parallel(tmp_path):
+
+    src = str(tmp_path / "src")
+    create_tree(src)
+    # to a directory
+    dst = str(tmp_path / "dst")
+    gdal.Mkdir(dst, 0o755)
+    assert gdal_cp.gdal_cp(["", "-j", "4", src + "/sub/*.tif", dst]) == 0
+    assert [x for x in gdal.ReadDir(dst) if x not in (".", "..")] == ["c.tif"]
+    check_tree(src + "/sub", dst, {"c.tif": 300})
+
+    assert gdal_cp.gdal_cp(["", "-j", "4", src + "/*.bin", dst + "/"]) == 0
+    check_tree(src, dst, {"a.bin": 1000, "empty.bin": 0})
+
+    # several files to a same target file: same result as without -j
+    assert gdal_cp.gdal_cp(["", "-j", "4", src + "/*.bin", dst + "/out"]) == 0
+    assert gdal_cp.gdal_cp(["", src + "/*.bin", dst + "/out_ref"]) == 0
+    assert read_file(dst + "/out") == read_file(dst + "/out_ref")
+
+    # nothing to copy with -progress
+    assert gdal_cp.gdal_cp(["", "-j", "4", "-progress", src + "/*.xyz", dst]) == -1
@@ -265,3 +265,51 @@ def test_gdal_ls_py_8(script_path):
         )
         != -1
     )
+
+
+###############################################################################
+# List recursively, with -depth, and recurse in a zip found in a subdirectory
+
+
+def test_gdal_ls_py_recurse_in_zip(script_path):
+
+    gdal.Mkdir("/vsimem/gdal_ls_py", 0o755)
+    gdal.Mkdir("/vsimem/gdal_ls_py/subdir", 0o755)
+    gdal.CopyFile(
+        test_py_scripts.get_data_path("ogr") + "shp/poly.zip",
+        "/vsimem/gdal_ls_py/subdir/poly.zip",
+    )
+    try:
+        ret_str = run_gdal_ls(
+            script_path, ["", "-l", "-R", "-Rzip", "/vsimem/gdal_ls_py"]
+        )
+        assert "/vsimem/gdal_ls_py/subdir/\n" in ret_str
+        assert "/vsimem/gdal_ls_py/subdir/poly.zip\n" in ret_str
+        assert (
+            "-r--r--r--  1 unknown unknown          415 2008-02-11 21:35 /vsizip//vsimem/gdal_ls_py/subdir/poly.zip/poly.PRJ"
+            in ret_str
+        )
+
+        ret_str = run_gdal_ls(
+            script_path, ["", "-R", "-Rzip", "-depth", "2", "/vsimem/gdal_ls_py"]
+        )
+        assert "/vsimem/gdal_ls_py/subdir/poly.zip\n" in ret_str
+        assert "poly.PRJ" not in ret_str
+    finally:
+        gdal.RmdirRecursive("/vsimem/gdal_ls_py")
+
+
+###############################################################################
+# List an empty directory: the directory itself is displayed
+
+
+def test_gdal_ls_py_empty_dir(script_path, tmp_path):
+
+    empty_dir = tmp_path / "empty"
+    empty_dir.mkdir()
+
+    ret_str = run_gdal_ls(script_path, ["", str(empty_dir)])
+    assert ret_str == str(empty_dir) + "/\n"
+
+    ret_str = run_gdal_ls(script_path, ["", "-R", str(tmp_path)])
+    assert ret_str == str(empty_dir) + "/\n"
@@ -0,0 +1,83 @@
+#!/usr/bin/env pytest
+# -*- coding: utf-8 -*-
+###############################################################################
+#
+# Project:  GDAL/OGR Test Suite
+# Purpose:  gdal_lut.py testing
+#
+###############################################################################
+# Copyright (c) 2023, GDAL contributors
+#
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included
+# in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+# OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+###############################################################################
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("osgeo_utils.samples.gdal_lut")
+
+from osgeo import gdal
+from osgeo_utils.samples import gdal_lut
+
+
+def gdal_lut_reference(src_filename, dst_filename, lookup):
+    """The previous scanline by scanline processing"""
+    src_ds = gdal.Open(src_filename)
+    src_band = src_ds.GetRasterBand(1)
+    dst_ds = gdal.GetDriverByName("GTiff").Create(
+        dst_filename, src_ds.RasterXSize, src_ds.RasterYSize, 1, gdal.GDT_UInt16
+    )
+    dst_band = dst_ds.GetRasterBand(1)
+    for iY in range(src_ds.RasterYSize):
+        src_data = src_band.ReadAsArray(0, iY, src_ds.RasterXSize, 1)
+        dst_band.WriteArray(np.take(lookup, src_data), 0, iY)
+
+
+@pytest.mark.parametrize(
+    "creation_options",
+    [[], ["TILED=YES", "BLOCKXSIZE=32", "BLOCKYSIZE=16"]],
+)
+def test_gdal_lut_threads(tmp_path, creation_options):
+
+    rng = np.random.default_rng(0)
+    src_filename = str(tmp_path / "src.tif")
+    ds = gdal.GetDriverByName("GTiff").Create(
+        src_filename, 150, 70, options=creation_options
+    )
+    ds.GetRasterBand(1).WriteArray(rng.integers(0, 256, (70, 150), dtype=np.uint8))
+    ds = None
+
+    # some values above 255 for an UInt16 output
+    lut = [int(v) for v in rng.integers(0, 300, 200)]
+    lut_filename = str(tmp_path / "lut.txt")
+    with open(lut_filename, "wt") as f:
+        f.write("\n".join(str(v) for v in lut) + "\n")
+    lookup = np.arange(256)
+    lookup[0 : len(lut)] = lut
+
+    gdal_lut_reference(src_filename, str(tmp_path / "ref.tif"), lookup)
+    expected = gdal.Open(str(tmp_path / "ref.tif")).ReadAsArray()
+
+    for threads in ("1", "3"):
+        dst_filename = str(tmp_path / ("out_%s.tif" % threads))
+        argv = ["", src_filename, dst_filename, "-lutfile", lut_filename]
+        assert gdal_lut.main(argv + ["-threads", threads]) == 0
+        ds = gdal.Open(dst_filename)
+        assert ds.GetRasterBand(1).DataType == gdal.GDT_UInt16
+        assert np.array_equal(ds.ReadAsArray(), expected)
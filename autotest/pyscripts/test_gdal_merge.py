@@ -35,6 +35,7 @@ import pytest
 import test_py_scripts
 
 from osgeo import gdal, osr
+from osgeo_utils import gdal_merge
 
 pytestmark = pytest.mark.skipif(
     test_py_scripts.get_py_script("gdal_merge") is None,
@@ -240,6 +241,45 @@ def test_gdal_merge_5(script_path):
     assert ds.GetRasterBand(4).Checksum() == cs, "Wrong checksum"
 
 
+###############################################################################
+# Test -blocks option
+
+
+@pytest.mark.parametrize(
+    "options", ["", "-separate", "-init 200", "-n 63", "-co TILED=YES -init 1 -n 0"]
+)
+def test_gdal_merge_blocks(options, monkeypatch):
+
+    # make several windows of blocks
+    monkeypatch.setattr(gdal_merge, "MERGE_WINDOW_MAX_PIXELS", 100)
+
+    checksums = []
+    for blocks in ([], ["-blocks"]):
+        gdal.Unlink("tmp/test_gdal_merge_blocks.tif")
+        gdal_merge.gdal_merge(
+            ["gdal_merge", "-q", "-o", "tmp/test_gdal_merge_blocks.tif"]
+            + options.split()
+            + blocks
+            + ["tmp/in1.tif", "tmp/in2.tif", "tmp/in3.tif", "tmp/in4.tif"]
+        )
+        # merge into an existing file
+        gdal_merge.gdal_merge(
+            ["gdal_merge", "-q", "-o", "tmp/test_gdal_merge_blocks.tif"]
+            + blocks
+            + ["tmp/in4.tif", "tmp/in1.tif"]
+        )
+
+        ds = gdal.Open("tmp/test_gdal_merge_blocks.tif")
+        checksums.append(
+            [ds.GetRasterBand(i + 1).Checksum() for i in range(ds.RasterCount)]
+        )
+        ds = None
+
+    assert checksums[0] == checksums[1]
+
+    gdal.Unlink("tmp/test_gdal_merge_blocks.tif")
+
+
 ###############################################################################
 # Cleanup
 
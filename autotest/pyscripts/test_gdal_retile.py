@@ -34,7 +34,7 @@ import shutil
 import pytest
 import test_py_scripts
 
-from osgeo import gdal, osr
+from osgeo import gdal, ogr, osr
 
 pytestmark = pytest.mark.skipif(
     test_py_scripts.get_py_script("gdal_retile") is None,
@@ -360,6 +360,147 @@ def test_gdal_retile_png(script_path):
         shutil.rmtree(out_dirname)
 
 
+###############################################################################
+# Test gdal_retile.py -threads
+
+
+def test_gdal_retile_threads(script_path):
+
+    out_dirnames = [os.path.join("tmp", "outretile_threads%d" % i) for i in (1, 4)]
+    for out_dirname in out_dirnames:
+        os.mkdir(out_dirname)
+
+    try:
+        for threads, out_dirname in zip((1, 4), out_dirnames):
+            test_py_scripts.run_py_script(
+                script_path,
+                "gdal_retile",
+                "-q -levels 2 -ps 8 8 -r bilinear -threads %d " % threads
+                + "-tileIndex index.shp -targetDir "
+                + out_dirname
+                + " "
+                + test_py_scripts.get_data_path("gcore")
+                + "byte.tif",
+            )
+
+        for level in ("", "1/", "2/"):
+            filenames = sorted(
+                x
+                for x in os.listdir(os.path.join(out_dirnames[0], level))
+                if x.endswith(".tif")
+            )
+            assert filenames
+            assert filenames == sorted(
+                x
+                for x in os.listdir(os.path.join(out_dirnames[1], level))
+                if x.endswith(".tif")
+            )
+            for filename in filenames:
+                ds = gdal.Open(os.path.join(out_dirnames[0], level, filename))
+                ref_ds = gdal.Open(os.path.join(out_dirnames[1], level, filename))
+                assert (
+                    ds.GetRasterBand(1).Checksum() == ref_ds.GetRasterBand(1).Checksum()
+                )
+
+        # the tile index is written in the same order
+        ds = ogr.Open(os.path.join(out_dirnames[0], "index.shp"))
+        ref_ds = ogr.Open(os.path.join(out_dirnames[1], "index.shp"))
+        assert [f.GetField(0) for f in ds.GetLayer()] == [
+            f.GetField(0) for f in ref_ds.GetLayer()
+        ]
+        ds = None
+        ref_ds = None
+    finally:
+        for out_dirname in out_dirnames:
+            shutil.rmtree(out_dirname)
+
+
+###############################################################################
+# Test gdal_retile.py -streamPyramid
+
+
+@pytest.mark.parametrize("options", ["", "-pyramidOnly"])
+def test_gdal_retile_stream_pyramid(script_path, options):
+
+    out_dirnames = [os.path.join("tmp", "outretile_stream%d" % i) for i in range(3)]
+    for out_dirname in out_dirnames:
+        os.mkdir(out_dirname)
+
+    try:
+        for extra, out_dirname in zip(
+            ("", "-streamPyramid", "-streamPyramid -threads 4"), out_dirnames
+        ):
+            test_py_scripts.run_py_script(
+                script_path,
+                "gdal_retile",
+                "-q -levels 2 -ps 8 8 -overlap 2 -r bilinear %s %s " % (options, extra)
+                + "-tileIndex index.shp -targetDir "
+                + out_dirname
+                + " "
+                + test_py_scripts.get_data_path("gcore")
+                + "byte.tif",
+            )
+
+        levels = ("1/", "2/") if options else ("", "1/", "2/")
+        for level in levels:
+            filenames = sorted(
+                x
+                for x in os.listdir(os.path.join(out_dirnames[0], level))
+                if x.endswith(".tif")
+            )
+            assert filenames
+            for out_dirname in out_dirnames[1:]:
+                assert filenames == sorted(
+                    x
+                    for x in os.listdir(os.path.join(out_dirname, level))
+                    if x.endswith(".tif")
+                )
+                for filename in filenames:
+                    ref_ds = gdal.Open(os.path.join(out_dirnames[0], level, filename))
+                    ds = gdal.Open(os.path.join(out_dirname, level, filename))
+                    assert ds.GetGeoTransform() == ref_ds.GetGeoTransform()
+                    assert (
+                        ds.GetRasterBand(1).Checksum()
+                        == ref_ds.GetRasterBand(1).Checksum()
+                    )
+
+            ref_ds = ogr.Open(os.path.join(out_dirnames[0], level, "index.shp"))
+            for out_dirname in out_dirnames[1:]:
+                ds = ogr.Open(os.path.join(out_dirname, level, "index.shp"))
+                assert [f.GetField(0) for f in ds.GetLayer()] == [
+                    f.GetField(0) for f in ref_ds.GetLayer()
+                ]
+            ds = None
+            ref_ds = None
+    finally:
+        for out_dirname in out_dirnames:
+            shutil.rmtree(out_dirname)
+
+
+###############################################################################
+# Test the cache of source tiles
+
+
+def test_gdal_retile_dataset_cache():
+
+    from osgeo_utils.gdal_retile import DataSetCache
+
+    names = [
+        test_py_scripts.get_data_path("gcore") + name
+        for name in ("byte.tif", "int16.tif", "uint16.tif")
+    ]
+    cache = DataSetCache(2)
+    ds = cache.get(names[0])
+    assert cache.get(names[1]) is not None
+    assert cache.get(names[0]) is ds
+    # the least recently used dataset is closed
+    assert cache.get(names[2]) is not None
+    assert list(cache.dict) == [names[0], names[2]]
+    assert (cache.hits, cache.misses) == (1, 3)
+    assert cache.get(names[1]) is not None
+    assert (cache.hits, cache.misses) == (1, 4)
+
+
 ###############################################################################
 # Cleanup
 
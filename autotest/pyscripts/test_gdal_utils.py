@@ -44,7 +44,15 @@ pytest.importorskip("osgeo_utils")
 
 import gdaltest
 
-from osgeo_utils.auxiliary import array_util, base, color_table, raster_creation, util
+from osgeo_utils.auxiliary import (
+    array_util,
+    base,
+    block_processing,
+    color_table,
+    raster_creation,
+    rtree,
+    util,
+)
 from osgeo_utils.auxiliary.color_palette import ColorPalette
 from osgeo_utils.auxiliary.color_table import get_color_table
 from osgeo_utils.auxiliary.extent_util import Extent
@@ -183,6 +191,88 @@ def test_utils_np_arrays():
             assert isinstance(arr, array_util.ArrayLike.__args__)
 
 
+def test_utils_rtree():
+    boxes = [
+        ((x, y, x + w, y + h), i)
+        for i, (x, y, w, h) in enumerate(
+            ((i * 7) % 50, (i * 13) % 50, i % 5, (i * 3) % 7) for i in range(500)
+        )
+    ]
+    index = rtree.RTree(boxes, node_capacity=4)
+    assert len(index) == 500
+    for query in ((0, 0, 10, 10), (20, 30, 21, 30), (-5, -5, -1, -1), (0, 0, 60, 60)):
+        assert index.query(*query) == [
+            i
+            for (min_x, min_y, max_x, max_y), i in boxes
+            if min_x <= query[2]
+            and max_x >= query[0]
+            and min_y <= query[3]
+            and max_y >= query[1]
+        ]
+    assert rtree.RTree([]).query(0, 0, 1, 1) == []
+
+
+@pytest.mark.parametrize("num_workers", [1, 3])
+def test_utils_block_processing(num_workers):
+    np = pytest.importorskip("numpy")
+
+    filename = "/vsimem/test_utils_block_processing.tif"
+    ds = gdal.GetDriverByName("GTiff").Create(
+        filename, 203, 97, options=["TILED=YES", "BLOCKXSIZE=32", "BLOCKYSIZE=16"]
+    )
+    data = np.arange(203 * 97, dtype=np.uint8).reshape(97, 203)
+    ds.GetRasterBand(1).WriteArray(data)
+    band = ds.GetRasterBand(1)
+
+    windows = block_processing.get_block_windows(band, max_pixels=1000, overlap=1)
+    assert sum(w.xsize * w.ysize for w in windows) == 203 * 97
+    for w in windows:
+        assert w.xoff % 32 == 0 and w.yoff % 16 == 0
+        assert w.read_xoff == max(0, w.xoff - 1)
+        assert w.read_xoff + w.read_xsize == min(203, w.xoff + w.xsize + 1)
+
+    # sum of the 3x3 neighbourhood of each pixel, with zeros outside
+    padded = np.pad(data.astype(np.int32), 1)
+    expected = sum(
+        padded[dy : dy + 97, dx : dx + 203] for dy in range(3) for dx in range(3)
+    )
+
+    def process(array):
+        padded = np.pad(array.astype(np.int32), 1)
+        ysize, xsize = array.shape
+        return sum(
+            padded[dy : dy + ysize, dx : dx + xsize]
+            for dy in range(3)
+            for dx in range(3)
+        )
+
+    result = np.zeros((97, 203), dtype=np.int32)
+    written = []
+
+    def write(window, array):
+        written.append(window)
+        result[
+            window.yoff : window.yoff + window.ysize,
+            window.xoff : window.xoff + window.xsize,
+        ] = window.crop(array)
+
+    progress = []
+    block_processing.process_blocks(
+        windows,
+        lambda window: band.ReadAsArray(*window.read_window),
+        process,
+        write,
+        num_workers=num_workers,
+        progress_callback=progress.append,
+    )
+    assert written == windows
+    assert progress[0] == 0 and progress[-1] == 1
+    assert np.array_equal(result, expected)
+
+    ds = None
+    gdal.Unlink(filename)
+
+
 @pytest.mark.parametrize(
     "name,count,pal",
     [
@@ -0,0 +1,158 @@
+#!/usr/bin/env pytest
+# -*- coding: utf-8 -*-
+###############################################################################
+#
+# Project:  GDAL/OGR Test Suite
+# Purpose:  gdalcompare.py testing
+#
+###############################################################################
+# Copyright (c) 2023, GDAL contributors
+#
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included
+# in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+# OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+###############################################################################
+
+import pytest
+import test_py_scripts
+
+# test that osgeo_utils and numpy are available, if not skip all tests
+pytest.importorskip("osgeo_utils")
+pytest.importorskip("numpy")
+
+from osgeo import gdal
+from osgeo_utils import gdalcompare
+
+pytestmark = pytest.mark.skipif(
+    test_py_scripts.get_py_script("gdalcompare") is None,
+    reason="gdalcompare not available",
+)
+
+
+@pytest.fixture()
+def golden_and_new(tmp_path):
+    golden_filename = str(tmp_path / "golden.tif")
+    new_filename = str(tmp_path / "new.tif")
+    for filename in (golden_filename, new_filename):
+        gdal.Translate(
+            filename,
+            test_py_scripts.get_data_path("gcore") + "byte.tif",
+            creationOptions=["TILED=YES", "BLOCKXSIZE=16", "BLOCKYSIZE=16"],
+        )
+    ds = gdal.Open(new_filename, gdal.GA_Update)
+    band = ds.GetRasterBand(1)
+    data = band.ReadAsArray()
+    data[2, 3] = data[2, 3] // 2
+    data[17, 11] = 255 - data[17, 11]
+    data[5, 18] = data[5, 18] + 1
+    band.WriteArray(data)
+    ds = None
+    return golden_filename, new_filename
+
+
+@pytest.mark.parametrize("threads", [1, 4])
+def test_gdalcompare_pixel_diffs(golden_and_new, threads, monkeypatch):
+
+    golden_filename, new_filename = golden_and_new
+    golden_ds = gdal.Open(golden_filename)
+    new_ds = gdal.Open(new_filename)
+    golden = golden_ds.GetRasterBand(1).ReadAsArray().astype(float)
+    new = new_ds.GetRasterBand(1).ReadAsArray().astype(float)
+
+    options = ["NUM_THREADS=%d" % threads]
+    monkeypatch.setattr(gdalcompare, "COMPARE_WINDOW_MAX_PIXELS", 256)
+    diff_count, max_diff, bbox, stopped = gdalcompare.get_pixel_diffs(
+        golden_ds.GetRasterBand(1), new_ds.GetRasterBand(1), options
+    )
+    assert diff_count == 3
+    assert max_diff == abs(golden - new).max()
+    assert bbox == (3, 2, 18, 17)
+    assert not stopped
+
+    diff_count, _, _, stopped = gdalcompare.get_pixel_diffs(
+        golden_ds.GetRasterBand(1),
+        new_ds.GetRasterBand(1),
+        options + ["MAX_DIFF_PIXELS=1"],
+    )
+    assert 1 <= diff_count <= 3
+    assert stopped
+
+    assert gdalcompare.compare_db(golden_ds, new_ds, options) == 1
+    assert gdalcompare.compare_db(golden_ds, gdal.Open(golden_filename), options) == 0
+
+
+@pytest.mark.parametrize("threads", [1, 4])
+def test_gdalcompare_nan(tmp_path, threads, monkeypatch):
+
+    import numpy as np
+
+    data = np.arange(40 * 30, dtype=np.float32).reshape(30, 40)
+    data[::3, ::7] = np.nan
+    filenames = []
+    for name in ("golden.tif", "new.tif"):
+        filename = str(tmp_path / name)
+        ds = gdal.GetDriverByName("GTiff").Create(
+            filename,
+            40,
+            30,
+            1,
+            gdal.GDT_Float32,
+            options=["TILED=YES", "BLOCKXSIZE=16", "BLOCKYSIZE=16"],
+        )
+        ds.GetRasterBand(1).SetNoDataValue(float("nan"))
+        ds.GetRasterBand(1).WriteArray(data)
+        ds = None
+        filenames.append(filename)
+
+    monkeypatch.setattr(gdalcompare, "COMPARE_WINDOW_MAX_PIXELS", 256)
+    options = ["NUM_THREADS=%d" % threads]
+    golden_ds = gdal.Open(filenames[0])
+    new_ds = gdal.Open(filenames[1])
+
+    # NaN on both sides are equal
+    assert gdalcompare.get_pixel_diffs(
+        golden_ds.GetRasterBand(1), new_ds.GetRasterBand(1), options
+    ) == (0, 0, None, False)
+    assert gdalcompare.compare_db(golden_ds, new_ds, options) == 0
+
+    # but a NaN on one side only is a difference
+    new_ds = None
+    ds = gdal.Open(filenames[1], gdal.GA_Update)
+    data[4, 5] = np.nan
+    data[3, 7] = 1
+    ds.GetRasterBand(1).WriteArray(data)
+    ds = None
+    new_ds = gdal.Open(filenames[1])
+    diff_count, max_diff, bbox, _ = gdalcompare.get_pixel_diffs(
+        golden_ds.GetRasterBand(1), new_ds.GetRasterBand(1), options
+    )
+    assert diff_count == 2
+    assert max_diff == 0
+    assert bbox == (5, 3, 7, 4)
+
+
+def test_gdalcompare_find_diff(golden_and_new, capsys):
+
+    golden_filename, new_filename = golden_and_new
+    # binary and pixel differences
+    assert (
+        gdalcompare.find_diff(golden_filename, new_filename, options=["NUM_THREADS=2"])
+        == 2
+    )
+    out = capsys.readouterr().out
+    assert "Pixels Differing: 3" in out
+    assert "Differences Bounding Box: pixels 3 to 18, lines 2 to 17" in out
@@ -226,6 +226,57 @@ def test_gdallocationinfo_py_7():
             assert_allclose(expected, actual, rtol=1e-4, atol=1e-3)
 
 
+def test_gdallocationinfo_py_nearest_by_blocks():
+    from osgeo.gdal_array import BandRasterIONumPy
+
+    filename = "/vsimem/test_gdallocationinfo_py_nearest_by_blocks.tif"
+    ds = gdal.Translate(
+        filename,
+        test_py_scripts.get_data_path("gcore") + "rgbsmall.tif",
+        creationOptions=["TILED=YES", "BLOCKXSIZE=16", "BLOCKYSIZE=16"],
+    )
+    bands = [ds.GetRasterBand(i + 1) for i in range(ds.RasterCount)]
+
+    rng = np.random.default_rng(0)
+    count = 1000
+    pixels = rng.uniform(-2, ds.RasterXSize + 2, count)
+    lines = rng.uniform(-2, ds.RasterYSize + 2, count)
+    # points on the pixel edges and centers
+    pixels[:100] = rng.integers(-1, ds.RasterXSize + 1, 100)
+    lines[:100] = rng.integers(-1, ds.RasterYSize + 1, 100) + 0.5
+
+    results = np.full((len(bands), count), -1, dtype=np.int16)
+    gdallocationinfo.read_nearest_by_blocks(bands, pixels, lines, results)
+
+    expected = np.full((len(bands), count), -1, dtype=np.int16)
+    buf_obj = np.empty([1, 1], dtype=np.uint8)
+    gdal.PushErrorHandler("CPLQuietErrorHandler")
+    for idx, (pixel, line) in enumerate(zip(pixels, lines)):
+        for bnd_idx, band in enumerate(bands):
+            if (
+                BandRasterIONumPy(
+                    band,
+                    0,
+                    pixel - 0.5,
+                    line - 0.5,
+                    1,
+                    1,
+                    buf_obj,
+                    gdal.GDT_Byte,
+                    gdal.GRIORA_NearestNeighbour,
+                    None,
+                    None,
+                )
+                == 0
+            ):
+                expected[bnd_idx][idx] = buf_obj[0][0]
+    gdal.PopErrorHandler()
+    np.testing.assert_array_equal(results, expected)
+
+    ds = None
+    gdal.Unlink(filename)
+
+
 def test_gdallocationinfo_py_cleanup():
     for filename in temp_files:
         try:
@@ -0,0 +1,65 @@
+#!/usr/bin/env pytest
+# -*- coding: utf-8 -*-
+###############################################################################
+#
+# Project:  GDAL/OGR Test Suite
+# Purpose:  hsv_merge.py testing
+#
+###############################################################################
+# Copyright (c) 2023, GDAL contributors
+#
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included
+# in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+# OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+###############################################################################
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("osgeo_utils.samples.hsv_merge")
+
+from osgeo_utils.samples import hsv_merge
+
+
+def hsv_merge_reference(rgb, hill, hill_nodata=None):
+    """The previous line by line implementation of the merge"""
+    hsv = hsv_merge.rgb_to_hsv(rgb[0], rgb[1], rgb[2])
+    if hill_nodata is not None:
+        v = np.choose(np.equal(hill, hill_nodata), (hill, hsv[2]))
+    else:
+        v = hill
+    return hsv_merge.hsv_to_rgb(np.asarray([hsv[0], hsv[1], v]))
+
+
+@pytest.mark.parametrize("hill_nodata", [None, 0])
+def test_hsv_merge_block(hill_nodata):
+
+    rng = np.random.default_rng(0)
+    rgb = rng.integers(0, 256, (3, 50, 60), dtype=np.uint8)
+    # grey levels, and ties between the max of the components
+    rgb[:, 0] = rgb[0, 0]
+    rgb[1, 1] = rgb[0, 1]
+    rgb[2, 2] = rgb[1, 2]
+    rgb[:, 3] = 0
+    rgb[:, 4] = 255
+    hill = rng.integers(0, 256, (50, 60), dtype=np.uint8)
+    hill[::5] = 0
+
+    result = hsv_merge.hsv_merge_block(rgb, hill, hill_nodata)
+    assert result.dtype == np.uint8
+    assert result.shape == rgb.shape
+    assert np.array_equal(result, hsv_merge_reference(rgb, hill, hill_nodata))
@@ -474,3 +474,175 @@ def test_ogr_layer_algebra_erase(script_path):
     driver.DeleteDataSource(output_path)
 
     assert featureCount == 2
+
+
+###############################################################################
+
+# Test -threads against the OGRLayer methods
+
+
+@pytest.mark.parametrize("op_str", ["Intersection", "Identity", "Clip", "Erase"])
+def test_ogr_layer_algebra_threads(script_path, op_str):
+
+    input_path = "tmp/input_layer.shp"
+    method_path = "tmp/method_layer.shp"
+    output_path = "tmp/output_layer.shp"
+    output_threads_path = "tmp/output_layer_threads.shp"
+
+    driver = ogr.GetDriverByName("ESRI Shapefile")
+    input_ds = driver.CreateDataSource(input_path)
+    method_ds = driver.CreateDataSource(method_path)
+
+    A = input_ds.CreateLayer("poly")
+    A.CreateField(ogr.FieldDefn("a", ogr.OFTInteger))
+    B = method_ds.CreateLayer("poly")
+    B.CreateField(ogr.FieldDefn("b", ogr.OFTInteger))
+
+    for i in range(20):
+        for j in range(20):
+            feat = ogr.Feature(A.GetLayerDefn())
+            feat["a"] = i * 20 + j
+            feat.SetGeometryDirectly(
+                ogr.CreateGeometryFromWkt(
+                    "POLYGON((%d %d,%d %d,%d %d,%d %d,%d %d))"
+                    % (i, j, i, j + 1, i + 1, j + 1, i + 1, j, i, j)
+                )
+            )
+            A.CreateFeature(feat)
+
+    for i in range(5):
+        feat = ogr.Feature(B.GetLayerDefn())
+        feat["b"] = i
+        feat.SetGeometryDirectly(
+            ogr.CreateGeometryFromWkt("POINT(%f %f)" % (i * 4.3, i * 3.7)).Buffer(2.5)
+        )
+        B.CreateFeature(feat)
+
+    input_ds = None
+    method_ds = None
+
+    test_py_scripts.run_py_script(
+        script_path,
+        "ogr_layer_algebra",
+        f"{op_str} -input_ds {input_path} -output_ds {output_path} -method_ds {method_path}",
+    )
+    test_py_scripts.run_py_script(
+        script_path,
+        "ogr_layer_algebra",
+        f"{op_str} -input_ds {input_path} -output_ds {output_threads_path} -method_ds {method_path} -threads 3",
+    )
+
+    ds = driver.Open(output_path, 0)
+    lyr = ds.GetLayer()
+    ds_threads = driver.Open(output_threads_path, 0)
+    lyr_threads = ds_threads.GetLayer()
+
+    assert lyr.GetFeatureCount() > 0
+    assert lyr_threads.GetFeatureCount() == lyr.GetFeatureCount()
+    assert (
+        lyr_threads.GetLayerDefn().GetFieldCount() == lyr.GetLayerDefn().GetFieldCount()
+    )
+    for f, f_threads in zip(lyr, lyr_threads):
+        for idx in range(lyr.GetLayerDefn().GetFieldCount()):
+            assert f_threads.GetField(idx) == f.GetField(idx)
+        assert f_threads.GetGeometryRef().Equals(f.GetGeometryRef())
+
+    ds = None
+    ds_threads = None
+
+    driver.DeleteDataSource(input_path)
+    driver.DeleteDataSource(method_path)
+    driver.DeleteDataSource(output_path)
+    driver.DeleteDataSource(output_threads_path)
+
+
+###############################################################################
+
+# Test that -threads creates the same output fields as the OGRLayer methods
+
+
+@pytest.mark.require_driver("GPKG")
+def test_ogr_layer_algebra_threads_field_defn(script_path, tmp_path):
+
+    input_path = str(tmp_path / "input.gpkg")
+    method_path = str(tmp_path / "method.gpkg")
+    output_path = str(tmp_path / "output.gpkg")
+    output_threads_path = str(tmp_path / "output_threads.gpkg")
+
+    driver = ogr.GetDriverByName("GPKG")
+    input_ds = driver.CreateDataSource(input_path)
+    A = input_ds.CreateLayer("input")
+    fld_defn = ogr.FieldDefn("a", ogr.OFTInteger)
+    fld_defn.SetAlternativeName("alias of a")
+    fld_defn.SetNullable(False)
+    fld_defn.SetDefault("5")
+    fld_defn.SetUnique(True)
+    A.CreateField(fld_defn)
+    feat = ogr.Feature(A.GetLayerDefn())
+    feat["a"] = 1
+    feat.SetGeometryDirectly(
+        ogr.CreateGeometryFromWkt("POLYGON((0 0,0 2,2 2,2 0,0 0))")
+    )
+    A.CreateFeature(feat)
+    input_ds = None
+
+    method_ds = driver.CreateDataSource(method_path)
+    B = method_ds.CreateLayer("method")
+    B.CreateField(ogr.FieldDefn("b", ogr.OFTString))
+    feat = ogr.Feature(B.GetLayerDefn())
+    feat["b"] = "x"
+    feat.SetGeometryDirectly(
+        ogr.CreateGeometryFromWkt("POLYGON((1 1,1 3,3 3,3 1,1 1))")
+    )
+    B.CreateFeature(feat)
+    method_ds = None
+
+    for path, extra_args in ((output_path, ""), (output_threads_path, " -threads 2")):
+        test_py_scripts.run_py_script(
+            script_path,
+            "ogr_layer_algebra",
+            f"Intersection -f GPKG -input_ds {input_path} -method_ds {method_path} -output_ds {path}"
+            + extra_args,
+        )
+
+    ds = ogr.Open(output_path)
+    defn = ds.GetLayer(0).GetLayerDefn()
+    ds_threads = ogr.Open(output_threads_path)
+    defn_threads = ds_threads.GetLayer(0).GetLayerDefn()
+    assert defn_threads.GetFieldCount() == defn.GetFieldCount() == 2
+    for idx in range(defn.GetFieldCount()):
+        fld_defn = defn.GetFieldDefn(idx)
+        fld_defn_threads = defn_threads.GetFieldDefn(idx)
+        assert fld_defn_threads.GetName() == fld_defn.GetName()
+        assert fld_defn_threads.GetType() == fld_defn.GetType()
+        assert fld_defn_threads.GetAlternativeName() == fld_defn.GetAlternativeName()
+        assert fld_defn_threads.IsNullable() == fld_defn.IsNullable()
+        assert fld_defn_threads.GetDefault() == fld_defn.GetDefault()
+        assert fld_defn_threads.IsUnique() == fld_defn.IsUnique()
+    assert not defn_threads.GetFieldDefn(0).IsNullable()
+    assert defn_threads.GetFieldDefn(0).GetDefault() == "5"
+
+
+###############################################################################
+
+# Test that boolean options follow the CPLTestBool() rule
+
+
+@pytest.mark.parametrize(
+    "value,expected",
+    [
+        ("YES", True),
+        ("y", True),
+        ("on", True),
+        ("NO", False),
+        ("off", False),
+        ("0", False),
+    ],
+)
+def test_ogr_layer_algebra_test_bool_option(value, expected):
+
+    ogr_layer_algebra = pytest.importorskip("osgeo_utils.ogr_layer_algebra")
+
+    opt = ["PROMOTE_TO_MULTI=" + value]
+    assert ogr_layer_algebra.TestBoolOption(opt, "PROMOTE_TO_MULTI", "NO") == expected
+    assert not ogr_layer_algebra.TestBoolOption([], "PROMOTE_TO_MULTI", "NO")
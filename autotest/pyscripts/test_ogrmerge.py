@@ -627,3 +627,61 @@ def test_ogrmerge_gpkg_curve_geom_in_generic_layer(script_path):
 
     gdal.Unlink("tmp/out.gpkg")
     gdal.Unlink("tmp/in.gpkg")
+
+
+###############################################################################
+# Test GPKG optimization with non-GPKG sources staged in parallel
+
+
+@pytest.mark.require_driver("GPKG")
+@pytest.mark.parametrize("has_progress", [True, False])
+def test_ogrmerge_gpkg_threads(script_path, has_progress):
+
+    gdal.VectorTranslate(
+        "tmp/in.gpkg", test_py_scripts.get_data_path("ogr") + "idlink.dbf"
+    )
+
+    gdal.Unlink("tmp/out.gpkg")
+    ogrmerge_opts = "-f GPKG -o tmp/out.gpkg -threads 2 tmp/in.gpkg -nln {DS_INDEX}"
+    ogrmerge_opts += " " + test_py_scripts.get_data_path("ogr") + "poly.shp"
+    ogrmerge_opts += " " + test_py_scripts.get_data_path("ogr") + "idlink.dbf"
+    if has_progress:
+        ogrmerge_opts += " -progress"
+    test_py_scripts.run_py_script(script_path, "ogrmerge", ogrmerge_opts)
+
+    _validate_check("tmp/out.gpkg")
+
+    ds = ogr.Open("tmp/out.gpkg")
+    assert [lyr.GetName() for lyr in ds] == ["0", "1", "2"]
+    for idx, src_dsname in enumerate(
+        [
+            "tmp/in.gpkg",
+            test_py_scripts.get_data_path("ogr") + "poly.shp",
+            test_py_scripts.get_data_path("ogr") + "idlink.dbf",
+        ]
+    ):
+        src_ds = ogr.Open(src_dsname)
+        src_lyr = src_ds.GetLayer(0)
+        lyr = ds.GetLayer(idx)
+        assert (
+            lyr.GetLayerDefn().GetFieldCount() == src_lyr.GetLayerDefn().GetFieldCount()
+        )
+        assert lyr.GetFeatureCount() == src_lyr.GetFeatureCount()
+        assert [f.GetField(0) for f in lyr] == [f.GetField(0) for f in src_lyr]
+
+    assert (
+        ds.GetLayer(1).GetExtent()
+        == ogr.Open(test_py_scripts.get_data_path("ogr") + "poly.shp")
+        .GetLayer(0)
+        .GetExtent()
+    )
+    sql_lyr = ds.ExecuteSQL("SELECT HasSpatialIndex('1', 'geom')")
+    f = sql_lyr.GetNextFeature()
+    v = f.GetField(0)
+    ds.ReleaseResultSet(sql_lyr)
+    assert v == 1
+
+    ds = None
+
+    gdal.Unlink("tmp/out.gpkg")
+    gdal.Unlink("tmp/in.gpkg")
@@ -0,0 +1,206 @@
+#!/usr/bin/env pytest
+# -*- coding: utf-8 -*-
+###############################################################################
+#
+# Project:  GDAL/OGR Test Suite
+# Purpose:  ogrupdate.py testing
+#
+###############################################################################
+# Copyright (c) 2023, GDAL contributors
+#
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included
+# in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+# OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+###############################################################################
+
+import shutil
+
+import pytest
+
+pytest.importorskip("osgeo_utils.samples.ogrupdate")
+
+from osgeo import ogr
+from osgeo_utils.samples import ogrupdate
+
+pytestmark = pytest.mark.require_driver("GPKG")
+
+# fid, id, name, value, geometry
+SRC_ROWS = [
+    (1, 1, "a", 1.5, "POINT (1 1)"),
+    (2, 2, "b2", 2.5, "POINT (2 2)"),
+    (3, 3, "c", 3.5, "POINT (3 3)"),
+    (4, 3, "c2", 3.5, "POINT (3 4)"),
+    (6, 6, "f", 6.5, "POINT (6 6)"),
+    (7, 7, "g", 7.5, "POINT (7 7)"),
+    (8, 2, "b3", 2.5, "POINT (2 3)"),
+    (9, 7, "g2", 7.5, "POINT (7 8)"),
+]
+
+DST_ROWS = [
+    (1, 1, "a", 1.5, "POINT (1 1)"),
+    (2, 2, "b", 2.5, "POINT (2 2)"),
+    (3, 3, "c", 3.5, "POINT (3 3)"),
+    (4, 4, "d", 4.5, "POINT (4 4)"),
+    (5, 5, "e", 5.5, "POINT (5 5)"),
+]
+
+
+def create_layer(filename, rows):
+    ds = ogr.GetDriverByName("GPKG").CreateDataSource(filename)
+    lyr = ds.CreateLayer("test", geom_type=ogr.wkbPoint)
+    lyr.CreateField(ogr.FieldDefn("id", ogr.OFTInteger))
+    lyr.CreateField(ogr.FieldDefn("name", ogr.OFTString))
+    lyr.CreateField(ogr.FieldDefn("value", ogr.OFTReal))
+    lyr.StartTransaction()
+    for fid, id, name, value, wkt in rows:
+        f = ogr.Feature(lyr.GetLayerDefn())
+        f.SetFID(fid)
+        f["id"] = id
+        f["name"] = name
+        f["value"] = value
+        f.SetGeometry(ogr.CreateGeometryFromWkt(wkt))
+        assert lyr.CreateFeature(f) == ogr.OGRERR_NONE
+    lyr.CommitTransaction()
+    ds = None
+
+
+@pytest.fixture()
+def src_and_dst(tmp_path):
+    src_filename = str(tmp_path / "src.gpkg")
+    dst_filename = str(tmp_path / "dst.gpkg")
+    create_layer(src_filename, SRC_ROWS)
+    create_layer(dst_filename, DST_ROWS)
+    return src_filename, dst_filename
+
+
+def run_ogrupdate(src_filename, dst_template, dst_filename, **kwargs):
+    shutil.copy(dst_template, dst_filename)
+    src_ds = ogr.Open(src_filename)
+    dst_ds = ogr.Open(dst_filename, update=1)
+    dst_lyr = dst_ds.GetLayer(0)
+    counts = [[0], [0], [0], [0]]
+    ret = ogrupdate.ogrupdate_process(
+        src_ds.GetLayer(0),
+        dst_lyr,
+        updated_count_out=counts[0],
+        updated_failed_out=counts[1],
+        inserted_count_out=counts[2],
+        inserted_failed_out=counts[3],
+        **kwargs
+    )
+    assert ret == 0
+    dst_lyr.SetAttributeFilter(None)
+    dst_lyr.ResetReading()
+    content = [
+        (
+            f.GetFID(),
+            f["id"],
+            f["name"],
+            f["value"],
+            f.GetGeometryRef().ExportToWkt(),
+        )
+        for f in dst_lyr
+    ]
+    return [count[0] for count in counts], content
+
+
+@pytest.mark.parametrize(
+    "options",
+    [
+        {},
+        {"preserve_fid": True},
+        {"matchfieldname": "id"},
+        {"update_mode": ogrupdate.UPDATE_ONLY},
+        {"update_mode": ogrupdate.APPEND_ONLY},
+        {"matchfieldname": "id", "update_mode": ogrupdate.UPDATE_ONLY},
+        {"matchfieldname": "id", "update_mode": ogrupdate.APPEND_ONLY},
+        {"compare_before_update": True},
+        {"matchfieldname": "id", "compare_before_update": True},
+        {
+            "matchfieldname": "id",
+            "update_mode": ogrupdate.UPDATE_ONLY,
+            "papszSelFields": ["name"],
+        },
+    ],
+)
+@pytest.mark.parametrize("transaction_size", [2, 100000])
+def test_ogrupdate_hash_index(tmp_path, src_and_dst, options, transaction_size):
+
+    src_filename, dst_filename = src_and_dst
+    expected_counts, expected_content = run_ogrupdate(
+        src_filename, dst_filename, str(tmp_path / "classic.gpkg"), **options
+    )
+    counts, content = run_ogrupdate(
+        src_filename,
+        dst_filename,
+        str(tmp_path / "hash_index.gpkg"),
+        hash_index=True,
+        transaction_size=transaction_size,
+        **options
+    )
+    assert counts == expected_counts
+    assert content == expected_content
+
+
+def test_ogrupdate_hash_index_expected_result(tmp_path, src_and_dst):
+
+    src_filename, dst_filename = src_and_dst
+
+    # source features 4 and 8 have the same key as an earlier one, and
+    # source features 7 and 9 have a key not in the target layer: 9 updates
+    # the feature inserted for 7
+    counts, content = run_ogrupdate(
+        src_filename,
+        dst_filename,
+        str(tmp_path / "out.gpkg"),
+        matchfieldname="id",
+        hash_index=True,
+        transaction_size=2,
+    )
+    assert counts == [6, 0, 2, 0]
+    assert content == [
+        (1, 1, "a", 1.5, "POINT (1 1)"),
+        (2, 2, "b3", 2.5, "POINT (2 3)"),
+        (3, 3, "c2", 3.5, "POINT (3 4)"),
+        (4, 4, "d", 4.5, "POINT (4 4)"),
+        (5, 5, "e", 5.5, "POINT (5 5)"),
+        (6, 6, "f", 6.5, "POINT (6 6)"),
+        (7, 7, "g2", 7.5, "POINT (7 8)"),
+    ]
+
+    # unchanged source features 1 and 3 are not updated
+    counts, _ = run_ogrupdate(
+        src_filename,
+        dst_filename,
+        str(tmp_path / "out.gpkg"),
+        matchfieldname="id",
+        compare_before_update=True,
+        hash_index=True,
+    )
+    assert counts == [4, 0, 2, 0]
+
+
+@pytest.mark.parametrize("quiet", [False, True])
+def test_ogrupdate_gt_without_hash_index(src_and_dst, capsys, quiet):
+
+    src_filename, dst_filename = src_and_dst
+    argv = ["", "-src", src_filename, "-dst", dst_filename, "-gt", "10"]
+    if quiet:
+        argv.append("-q")
+    assert ogrupdate.main(argv) == 0
+    out = capsys.readouterr().out
+    assert ("-gt is only used with -hash_index" in out) == (not quiet)
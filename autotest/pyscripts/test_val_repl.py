@@ -0,0 +1,83 @@
+#!/usr/bin/env pytest
+# -*- coding: utf-8 -*-
+###############################################################################
+#
+# Project:  GDAL/OGR Test Suite
+# Purpose:  val_repl.py testing
+#
+###############################################################################
+# Copyright (c) 2023, GDAL contributors
+#
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included
+# in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+# OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+###############################################################################
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("osgeo_utils.samples.val_repl")
+
+from osgeo import gdal
+from osgeo_utils.samples import val_repl
+
+
+def val_repl_reference(src_filename, dst_filename, in_nodata, out_nodata):
+    """The previous scanline by scanline processing"""
+    src_ds = gdal.Open(src_filename)
+    dst_ds = gdal.GetDriverByName("GTiff").Create(
+        dst_filename,
+        src_ds.RasterXSize,
+        src_ds.RasterYSize,
+        src_ds.RasterCount,
+        gdal.GDT_Int16,
+    )
+    for iBand in range(1, src_ds.RasterCount + 1):
+        inband = src_ds.GetRasterBand(iBand)
+        outband = dst_ds.GetRasterBand(iBand)
+        for i in range(inband.YSize):
+            scanline = inband.ReadAsArray(0, i, inband.XSize, 1)
+            scanline = np.choose(np.equal(scanline, in_nodata), (scanline, out_nodata))
+            outband.WriteArray(scanline, 0, i)
+
+
+@pytest.mark.parametrize(
+    "creation_options",
+    [[], ["TILED=YES", "BLOCKXSIZE=32", "BLOCKYSIZE=16"]],
+)
+def test_val_repl_threads(tmp_path, creation_options):
+
+    rng = np.random.default_rng(0)
+    src_filename = str(tmp_path / "src.tif")
+    ds = gdal.GetDriverByName("GTiff").Create(
+        src_filename, 150, 70, 3, options=creation_options
+    )
+    ds.WriteArray(rng.integers(0, 5, (3, 70, 150), dtype=np.uint8))
+    ds = None
+
+    val_repl_reference(src_filename, str(tmp_path / "ref.tif"), 0.0, 300.0)
+    expected = gdal.Open(str(tmp_path / "ref.tif")).ReadAsArray()
+    assert (expected == 300).any()
+
+    for threads in ("1", "3"):
+        dst_filename = str(tmp_path / ("out_%s.tif" % threads))
+        argv = ["", "-innd", "0", "-outnd", "300", "-ot", "Int16"]
+        argv += ["-threads", threads, src_filename, dst_filename]
+        assert val_repl.main(argv) == 0
+        ds = gdal.Open(dst_filename)
+        assert ds.RasterCount == 3
+        assert np.array_equal(ds.ReadAsArray(), expected)
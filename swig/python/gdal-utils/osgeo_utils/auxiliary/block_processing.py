@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# ******************************************************************************
+#
+#  Project:  GDAL utils.auxiliary
+#  Purpose:  block by block processing of rasters, in a pool of workers
+#
+# ******************************************************************************
+#  Copyright (c) 2023, GDAL contributors
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a
+#  copy of this software and associated documentation files (the "Software"),
+#  to deal in the Software without restriction, including without limitation
+#  the rights to use, copy, modify, merge, publish, distribute, sublicense,
+#  and/or sell copies of the Software, and to permit persons to whom the
+#  Software is furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included
+#  in all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+#  OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+#  THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#  FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+#  DEALINGS IN THE SOFTWARE.
+# ******************************************************************************
+
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, List, NamedTuple, Sequence, Union
+
+from osgeo_utils.auxiliary.progress import (
+    OptionalProgressCallback,
+    get_progress_callback,
+)
+
+
+class BlockWindow(NamedTuple):
+    """
+    A window of a raster, and the window to read to process it.
+
+    xoff, yoff, xsize, ysize -- the window to compute and write.
+    read_xoff, read_yoff, read_xsize, read_ysize -- the window extended by the
+    overlap on each side, clipped to the raster.
+    """
+
+    xoff: int
+    yoff: int
+    xsize: int
+    ysize: int
+    read_xoff: int
+    read_yoff: int
+    read_xsize: int
+    read_ysize: int
+
+    @property
+    def window(self):
+        return self.xoff, self.yoff, self.xsize, self.ysize
+
+    @property
+    def read_window(self):
+        return self.read_xoff, self.read_yoff, self.read_xsize, self.read_ysize
+
+    def crop(self, array):
+        """Return the part of an array of the read window that is in the window"""
+        x0 = self.xoff - self.read_xoff
+        y0 = self.yoff - self.read_yoff
+        return array[..., y0 : y0 + self.ysize, x0 : x0 + self.xsize]
+
+
+def get_block_windows(
+    band, max_pixels: int = 1024 * 1024, overlap: int = 0
+) -> List[BlockWindow]:
+    """
+    Return the windows, aligned on the blocks of band and made of whole blocks
+    up to about max_pixels pixels, that cover the band. Lines of blocks are
+    grouped for strip layouts, and blocks of a same row of blocks otherwise.
+
+    overlap -- number of pixels by which the read window of each window
+    extends it on each side, for neighbourhood operations.
+    """
+    block_xsize, block_ysize = band.GetBlockSize()
+    if block_xsize >= band.XSize:
+        # strips: group lines of blocks
+        win_xsize = band.XSize
+        win_ysize = block_ysize * max(1, max_pixels // (win_xsize * block_ysize))
+    else:
+        # tiles: group blocks of a same row of blocks
+        win_xsize = block_xsize * max(1, max_pixels // (block_xsize * block_ysize))
+        win_ysize = block_ysize
+
+    windows = []
+    for yoff in range(0, band.YSize, win_ysize):
+        ysize = min(win_ysize, band.YSize - yoff)
+        read_yoff = max(0, yoff - overlap)
+        read_ysize = min(band.YSize, yoff + ysize + overlap) - read_yoff
+        for xoff in range(0, band.XSize, win_xsize):
+            xsize = min(win_xsize, band.XSize - xoff)
+            read_xoff = max(0, xoff - overlap)
+            read_xsize = min(band.XSize, xoff + xsize + overlap) - read_xoff
+            windows.append(
+                BlockWindow(
+                    xoff,
+                    yoff,
+                    xsize,
+                    ysize,
+                    read_xoff,
+                    read_yoff,
+                    read_xsize,
+                    read_ysize,
+                )
+            )
+    return windows
+
+
+def get_num_workers(value: Union[int, str, None]) -> int:
+    """Return the number of workers from a number or ALL_CPUS"""
+    if value is None:
+        return 1
+    if isinstance(value, str) and value.upper() == "ALL_CPUS":
+        return os.cpu_count() or 1
+    return max(1, int(value))
+
+
+def process_blocks(
+    windows: Sequence[BlockWindow],
+    read: Callable[[BlockWindow], Any],
+    process: Callable[[Any], Any],
+    write: Callable[[BlockWindow, Any], None],
+    num_workers: int = 1,
+    use_processes: bool = False,
+    progress_callback: OptionalProgressCallback = ...,
+):
+    """
+    Process a raster window by window.
+
+    For each window, in order, read(window) is called in the calling thread,
+    process() is called on its result in a pool of num_workers threads (or
+    processes if use_processes is set, in which case process and the data must
+    be picklable), and write(window, result) is called in the calling thread,
+    in the order of the windows. At most twice as many windows as workers are
+    in flight at once.
+
+    The processing is done in the calling thread when num_workers is 1.
+    progress_callback - progress callback function. use None for quiet or
+    Ellipsis for using the default callback
+    """
+    progress_callback = get_progress_callback(progress_callback)
+    if progress_callback:
+        progress_callback(0.0)
+
+    written = 0
+
+    def write_window(window, result):
+        nonlocal written
+        write(window, result)
+        written = written + 1
+        if progress_callback:
+            progress_callback(written / len(windows))
+
+    if num_workers <= 1:
+        for window in windows:
+            write_window(window, process(read(window)))
+        return
+
+    executor_class = ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+    with executor_class(max_workers=num_workers) as executor:
+        pending = deque()
+        for window in windows:
+            pending.append((window, executor.submit(process, read(window))))
+            if len(pending) > 2 * num_workers:
+                window, future = pending.popleft()
+                write_window(window, future.result())
+
+        while pending:
+            window, future = pending.popleft()
+            write_window(window, future.result())
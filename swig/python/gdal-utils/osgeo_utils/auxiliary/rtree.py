@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# ******************************************************************************
+#
+#  Project:  GDAL utils.auxiliary
+#  Purpose:  static R-tree spatial index of bounding boxes
+#
+# ******************************************************************************
+#  Copyright (c) 2023, GDAL contributors
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a
+#  copy of this software and associated documentation files (the "Software"),
+#  to deal in the Software without restriction, including without limitation
+#  the rights to use, copy, modify, merge, publish, distribute, sublicense,
+#  and/or sell copies of the Software, and to permit persons to whom the
+#  Software is furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included
+#  in all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+#  OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+#  THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#  FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+#  DEALINGS IN THE SOFTWARE.
+# ******************************************************************************
+
+import math
+from typing import Any, Iterable, List, Tuple
+
+BBox = Tuple[float, float, float, float]  # min_x, min_y, max_x, max_y
+
+
+def _bbox_union(bboxes: Iterable[BBox]) -> BBox:
+    min_xs, min_ys, max_xs, max_ys = zip(*bboxes)
+    return min(min_xs), min(min_ys), max(max_xs), max(max_ys)
+
+
+class RTree:
+    """
+    Static R-tree of bounding boxes, bulk loaded with the Sort-Tile-Recursive
+    algorithm.
+
+    items -- sequence of (bbox, item) pairs, where bbox is
+    (min_x, min_y, max_x, max_y).
+    node_capacity -- maximum number of children of a node.
+
+    The items returned by the queries are in the order in which they were given.
+    """
+
+    def __init__(self, items: Iterable[Tuple[BBox, Any]], node_capacity: int = 16):
+        if node_capacity < 2:
+            raise ValueError("node_capacity must be at least 2")
+        self.node_capacity = node_capacity
+        # a node is a (bbox, is_leaf, children) tuple, where the children of
+        # a leaf are (bbox, index, item) tuples
+        nodes = [(tuple(bbox), index, item) for index, (bbox, item) in enumerate(items)]
+        self.count = len(nodes)
+        self.root = None
+        is_leaf = True
+        while nodes:
+            nodes = [
+                (_bbox_union(child[0] for child in children), is_leaf, children)
+                for children in self._pack(nodes)
+            ]
+            is_leaf = False
+            if len(nodes) == 1:
+                self.root = nodes[0]
+                break
+
+    def __len__(self):
+        return self.count
+
+    def _pack(self, nodes: List[tuple]) -> List[list]:
+        """Group nodes by node_capacity, tiling them by x and then by y"""
+        capacity = self.node_capacity
+        slice_count = math.ceil(math.sqrt(math.ceil(len(nodes) / capacity)))
+        slice_size = slice_count * capacity
+        nodes = sorted(nodes, key=lambda node: node[0][0] + node[0][2])
+        groups = []
+        for i in range(0, len(nodes), slice_size):
+            vertical_slice = sorted(
+                nodes[i : i + slice_size], key=lambda node: node[0][1] + node[0][3]
+            )
+            for j in range(0, len(vertical_slice), capacity):
+                groups.append(vertical_slice[j : j + capacity])
+        return groups
+
+    def query(self, min_x: float, min_y: float, max_x: float, max_y: float) -> list:
+        """Return the items whose bounding box intersects (or touches) this one"""
+        if self.root is None:
+            return []
+        found = []
+        stack = [self.root]
+        while stack:
+            _, is_leaf, children = stack.pop()
+            for child in children:
+                bbox = child[0]
+                if (
+                    bbox[0] <= max_x
+                    and bbox[2] >= min_x
+                    and bbox[1] <= max_y
+                    and bbox[3] >= min_y
+                ):
+                    if is_leaf:
+                        found.append(child)
+                    else:
+                        stack.append(child)
+        found.sort(key=lambda entry: entry[1])
+        return [entry[2] for entry in found]
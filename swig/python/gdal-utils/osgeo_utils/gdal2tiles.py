@@ -40,15 +40,20 @@ from __future__ import division, print_function
 
 import contextlib
 import glob
+import hashlib
 import json
 import math
 import optparse
 import os
+import queue
 import shutil
+import sqlite3
 import stat
+import struct
 import sys
 import tempfile
 import threading
+from collections import OrderedDict
 from functools import partial
 from typing import Any, List, NoReturn, Optional, Tuple
 from uuid import uuid4
@@ -87,6 +92,21 @@ resampling_list = (
     "q3",
 )
 webviewer_list = ("all", "google", "openlayers", "leaflet", "mapml", "none")
+container_list = ("mbtiles",)
+
+MANIFEST_FILENAME = "gdal2tiles_manifest.json"
+
+# Radius, in source pixels, of the resampling kernels: a change of the source
+# also changes the tiles within that distance. 1 for the other algorithms,
+# whose footprint may straddle a source pixel.
+RESAMPLING_KERNEL_RADIUS = {
+    "near": 0,
+    "bilinear": 1,
+    "cubic": 2,
+    "cubicspline": 2,
+    "lanczos": 3,
+    "antialias": 3,
+}
 
 
 def makedirs(path):
@@ -120,6 +140,14 @@ class VSIFile:
         if gdal.VSIFWriteL(content, 1, len(content), self.f) != len(content):
             raise Exception("Error while writing into %s" % self.filename)
 
+    def read(self):
+        content = b""
+        while True:
+            chunk = gdal.VSIFReadL(1, 65536, self.f)
+            if not chunk:
+                return content
+            content += chunk
+
 
 @contextlib.contextmanager
 def my_open(filename, mode):
@@ -1295,7 +1323,108 @@ def _get_creation_options(options):
     return copts
 
 
-def create_base_tile(tile_job_info: "TileJobInfo", tile_detail: "TileDetail") -> None:
+# Encoded content of the uniform tiles already written by this process,
+# indexed by the key returned by _get_uniform_tile_key()
+uniform_tiles_cache = {}
+UNIFORM_TILES_CACHE_MAX_SIZE = 256
+
+
+def _get_uniform_tile_key(
+    out_drv: gdal.Driver, dstile: gdal.Dataset, options: Options
+) -> Optional[tuple]:
+    """
+    Return a key identifying the encoded content of the tile if all its pixels
+    have the same value, or None otherwise
+    """
+    values = []
+    for i in range(1, dstile.RasterCount + 1):
+        data = dstile.GetRasterBand(i).ReadRaster()
+        if data.count(data[:1]) != len(data):
+            return None
+        values.append(data[0])
+    return (
+        out_drv.ShortName,
+        tuple(_get_creation_options(options)),
+        dstile.RasterXSize,
+        dstile.RasterYSize,
+        tuple(values),
+    )
+
+
+def _encode_tile(out_drv: gdal.Driver, dstile: gdal.Dataset, options: Options) -> bytes:
+    """Return the content of the tile encoded in the tile format"""
+    tmp_filename = "/vsimem/%s.%s" % (uuid4(), out_drv.ShortName)
+    out_drv.CreateCopy(
+        tmp_filename, dstile, strict=0, options=_get_creation_options(options)
+    )
+    encoded_tile = bytes(gdal.VSIGetMemFileBuffer_unsafe(tmp_filename))
+    gdal.Unlink(tmp_filename)
+    if gdal.VSIStatL(tmp_filename + ".aux.xml") is not None:
+        gdal.Unlink(tmp_filename + ".aux.xml")
+    return encoded_tile
+
+
+def _write_tile(
+    out_drv: gdal.Driver, tilefilename: str, dstile: gdal.Dataset, options: Options
+) -> Optional[bytes]:
+    """
+    Write the tile to its file, or when tiles are written in a container,
+    return its encoded content.
+
+    Uniform tiles (fully transparent, all-ocean, ...) are only encoded once,
+    and their encoded content is shared by all the identical tiles.
+    """
+    uniform_key = _get_uniform_tile_key(out_drv, dstile, options)
+    encoded_tile = None
+    if uniform_key is not None:
+        encoded_tile = uniform_tiles_cache.get(uniform_key)
+
+    if encoded_tile is None:
+        if uniform_key is None and not options.container:
+            out_drv.CreateCopy(
+                tilefilename, dstile, strict=0, options=_get_creation_options(options)
+            )
+            return None
+        encoded_tile = _encode_tile(out_drv, dstile, options)
+        if (
+            uniform_key is not None
+            and len(uniform_tiles_cache) < UNIFORM_TILES_CACHE_MAX_SIZE
+        ):
+            uniform_tiles_cache[uniform_key] = encoded_tile
+
+    if options.container:
+        return encoded_tile
+
+    with my_open(tilefilename, "wb") as f:
+        f.write(encoded_tile)
+    return None
+
+
+def _get_source_dataset(tile_job_info: "TileJobInfo") -> gdal.Dataset:
+    """Return the warped input dataset, opened once per thread"""
+    cached_ds = getattr(threadLocal, "cached_ds", None)
+    if cached_ds and cached_ds.GetDescription() == tile_job_info.src_file:
+        return cached_ds
+    ds = gdal.Open(tile_job_info.src_file, gdal.GA_ReadOnly)
+    threadLocal.cached_ds = ds
+    return ds
+
+
+def create_base_tile(
+    tile_job_info: "TileJobInfo",
+    tile_detail: "TileDetail",
+    metatile_ds: Optional[gdal.Dataset] = None,
+) -> Tuple[Optional[bytes], Optional[bytes]]:
+    """
+    Create a base tile from the input raster, or when metatile_ds is specified,
+    by slicing it from the content of its metatile.
+
+    Return a (tile_data, encoded_tile) tuple. tile_data is the raw content of
+    the tile when --in-memory-overviews is used, so that overview tiles can be
+    built from it. encoded_tile is the content of the tile in the tile format
+    when tiles are written in a container. They are None otherwise, or if the
+    tile was skipped.
+    """
 
     dataBandsCount = tile_job_info.nb_data_bands
     output = tile_job_info.output_file_path
@@ -1305,12 +1434,7 @@ def create_base_tile(tile_job_info: "TileJobInfo", tile_detail: "TileDetail") ->
 
     tilebands = dataBandsCount + 1
 
-    cached_ds = getattr(threadLocal, "cached_ds", None)
-    if cached_ds and cached_ds.GetDescription() == tile_job_info.src_file:
-        ds = cached_ds
-    else:
-        ds = gdal.Open(tile_job_info.src_file, gdal.GA_ReadOnly)
-        threadLocal.cached_ds = ds
+    ds = _get_source_dataset(tile_job_info)
 
     mem_drv = gdal.GetDriverByName("MEM")
     out_drv = gdal.GetDriverByName(tile_job_info.tile_driver)
@@ -1343,14 +1467,37 @@ def create_base_tile(tile_job_info: "TileJobInfo", tile_detail: "TileDetail") ->
     # Query is in 'nearest neighbour' but can be bigger in then the tile_size
     # We scale down the query to the tile_size by supplied algorithm.
 
-    if rxsize != 0 and rysize != 0 and wxsize != 0 and wysize != 0:
+    if metatile_ds is not None:
+        meta_x = tile_detail.meta_x
+        meta_y = tile_detail.meta_y
+        alpha = metatile_ds.GetRasterBand(tilebands).ReadRaster(
+            meta_x, meta_y, tile_size, tile_size
+        )
+        if tile_job_info.exclude_transparent and len(alpha) == alpha.count(b"\x00"):
+            return None, None
+        dstile.WriteRaster(
+            0,
+            0,
+            tile_size,
+            tile_size,
+            metatile_ds.ReadRaster(meta_x, meta_y, tile_size, tile_size),
+        )
+
+    # Tiles found empty by the coverage mask are left fully transparent
+    elif (
+        rxsize != 0
+        and rysize != 0
+        and wxsize != 0
+        and wysize != 0
+        and not tile_detail.empty
+    ):
         alpha = alphaband.ReadRaster(rx, ry, rxsize, rysize, wxsize, wysize)
 
         # Detect totally transparent tile and skip its creation
         if tile_job_info.exclude_transparent and len(alpha) == alpha.count(
             "\x00".encode("ascii")
         ):
-            return
+            return None, None
 
         data = ds.ReadRaster(
             rx,
@@ -1402,11 +1549,14 @@ def create_base_tile(tile_job_info: "TileJobInfo", tile_detail: "TileDetail") ->
 
     del data
 
+    encoded_tile = None
     if options.resampling != "antialias":
         # Write a copy of tile to png/jpg
-        out_drv.CreateCopy(
-            tilefilename, dstile, strict=0, options=_get_creation_options(options)
-        )
+        encoded_tile = _write_tile(out_drv, tilefilename, dstile, options)
+
+    tile_data = None
+    if options.in_memory_overviews:
+        tile_data = dstile.ReadRaster(0, 0, tile_size, tile_size)
 
     del dstile
 
@@ -1434,6 +1584,137 @@ def create_base_tile(tile_job_info: "TileJobInfo", tile_detail: "TileDetail") ->
                         ).encode("utf-8")
                     )
 
+    return tile_data, encoded_tile
+
+
+def create_base_tile_in_memory(
+    tile_job_info: "TileJobInfo",
+    tile_detail: "TileDetail",
+    metatile_ds: Optional[gdal.Dataset] = None,
+) -> Tuple[Tuple[int, int, int], Optional[bytes], Optional[bytes]]:
+    """
+    Same as create_base_tile(), but return the (tz, tx, ty) TMS key of the tile
+    along with its raw and encoded content, for use with pool.imap_unordered()
+    """
+    tz = tile_detail.tz
+    ty = GDAL2Tiles.getYTile(tile_detail.ty, tz, tile_job_info.options)
+    tile_data, encoded_tile = create_base_tile(tile_job_info, tile_detail, metatile_ds)
+    return (tz, tile_detail.tx, ty), tile_data, encoded_tile
+
+
+def read_metatile(
+    tile_job_info: "TileJobInfo", metatile_detail: "MetaTileDetail"
+) -> gdal.Dataset:
+    """
+    Read and warp the content of a metatile from the input raster at once,
+    and return it as a MEM dataset from which its tiles can be sliced
+    """
+    dataBandsCount = tile_job_info.nb_data_bands
+    tilebands = dataBandsCount + 1
+    options = tile_job_info.options
+
+    ds = _get_source_dataset(tile_job_info)
+    mem_drv = gdal.GetDriverByName("MEM")
+    alphaband = ds.GetRasterBand(1).GetMaskBand()
+
+    rx = metatile_detail.rx
+    ry = metatile_detail.ry
+    rxsize = metatile_detail.rxsize
+    rysize = metatile_detail.rysize
+    wx = metatile_detail.wx
+    wy = metatile_detail.wy
+    wxsize = metatile_detail.wxsize
+    wysize = metatile_detail.wysize
+    querysize = metatile_detail.querysize
+    size = metatile_detail.size
+
+    dsmeta = mem_drv.Create("", size, size, tilebands)
+
+    if options.verbose:
+        print(
+            "\tMetatile ReadRaster Extent: ",
+            (rx, ry, rxsize, rysize),
+            (wx, wy, wxsize, wysize),
+        )
+
+    if (
+        rxsize == 0
+        or rysize == 0
+        or wxsize == 0
+        or wysize == 0
+        or all(tile_detail.empty for tile_detail in metatile_detail.tile_details)
+    ):
+        return dsmeta
+
+    alpha = alphaband.ReadRaster(rx, ry, rxsize, rysize, wxsize, wysize)
+    data = ds.ReadRaster(
+        rx,
+        ry,
+        rxsize,
+        rysize,
+        wxsize,
+        wysize,
+        band_list=list(range(1, dataBandsCount + 1)),
+    )
+
+    if size == querysize:
+        dsquery = dsmeta
+    else:
+        dsquery = mem_drv.Create("", querysize, querysize, tilebands)
+    dsquery.WriteRaster(
+        wx, wy, wxsize, wysize, data, band_list=list(range(1, dataBandsCount + 1))
+    )
+    dsquery.WriteRaster(wx, wy, wxsize, wysize, alpha, band_list=[tilebands])
+    if dsquery is not dsmeta:
+        scale_query_to_tile(dsquery, dsmeta, options)
+        del dsquery
+
+    return dsmeta
+
+
+def create_base_tiles(
+    tile_job_info: "TileJobInfo", job: Any
+) -> List[Tuple[Tuple[int, int, int], Optional[bytes], Optional[bytes]]]:
+    """
+    Create the base tiles of a job of the list returned by generate_base_tiles(),
+    that is a TileDetail or a MetaTileDetail, and return the results of
+    create_base_tile_in_memory() for each of them
+    """
+    if isinstance(job, MetaTileDetail):
+        metatile_ds = read_metatile(tile_job_info, job)
+        return [
+            create_base_tile_in_memory(tile_job_info, tile_detail, metatile_ds)
+            for tile_detail in job.tile_details
+        ]
+    return [create_base_tile_in_memory(tile_job_info, job)]
+
+
+def iterate_base_tile_details(jobs: List[Any]):
+    """Yield the TileDetail of each base tile of a list of jobs"""
+    for job in jobs:
+        if isinstance(job, MetaTileDetail):
+            yield from job.tile_details
+        else:
+            yield job
+
+
+def _read_base_tile(base_tile_path: str, tilebands: int, tile_size: int) -> bytes:
+    """Return the raw content of a tile written on disk, with its alpha band"""
+
+    dsquerytile = gdal.Open(base_tile_path, gdal.GA_ReadOnly)
+
+    if dsquerytile.RasterCount == tilebands - 1:
+        # assume that the alpha band is missing and add it
+        tmp_ds = gdal.GetDriverByName("MEM").CreateCopy("", dsquerytile, 0)
+        tmp_ds.AddBand()
+        mask = bytearray([255] * (tile_size * tile_size))
+        tmp_ds.WriteRaster(0, 0, tile_size, tile_size, mask, band_list=[tilebands])
+        dsquerytile = tmp_ds
+    elif dsquerytile.RasterCount != tilebands:
+        raise Exception("Unexpected number of bands in base tile")
+
+    return dsquerytile.ReadRaster(0, 0, tile_size, tile_size)
+
 
 def create_overview_tile(
     base_tz: int,
@@ -1441,8 +1722,16 @@ def create_overview_tile(
     output_folder: str,
     tile_job_info: "TileJobInfo",
     options: Options,
-):
-    """Generating an overview tile from no more than 4 underlying tiles(base tiles)"""
+    base_tiles_data: Optional[dict] = None,
+) -> Tuple[Optional[bytes], Optional[bytes]]:
+    """Generating an overview tile from no more than 4 underlying tiles(base tiles)
+
+    base_tiles_data may map (tx, ty) base tiles to their raw content, as
+    returned by create_base_tile() or create_overview_tile() with
+    --in-memory-overviews. Base tiles that are not in it are read from disk.
+
+    Return a (tile_data, encoded_tile) tuple, as create_base_tile() does.
+    """
 
     overview_tz = base_tz - 1
     overview_tx = base_tiles[0][0] >> 1
@@ -1460,7 +1749,7 @@ def create_overview_tile(
     if options.resume and isfile(tilefilename):
         if options.verbose:
             print("Tile generation skipped because of --resume")
-        return
+        return None, None
 
     mem_driver = gdal.GetDriverByName("MEM")
     tile_driver = tile_job_info.tile_driver
@@ -1483,16 +1772,23 @@ def create_overview_tile(
         base_ty = base_tile[1]
         base_ty_real = GDAL2Tiles.getYTile(base_ty, base_tz, options)
 
-        base_tile_path = os.path.join(
-            output_folder,
-            str(base_tz),
-            str(base_tx),
-            "%s.%s" % (base_ty_real, tile_job_info.tile_extension),
-        )
-        if not isfile(base_tile_path):
-            continue
+        base_data = None
+        if base_tiles_data:
+            base_data = base_tiles_data.get(base_tile)
 
-        dsquerytile = gdal.Open(base_tile_path, gdal.GA_ReadOnly)
+        if base_data is None:
+            base_tile_path = os.path.join(
+                output_folder,
+                str(base_tz),
+                str(base_tx),
+                "%s.%s" % (base_ty_real, tile_job_info.tile_extension),
+            )
+            if not isfile(base_tile_path):
+                continue
+
+            base_data = _read_base_tile(
+                base_tile_path, tilebands, tile_job_info.tile_size
+            )
 
         if base_tx % 2 == 0:
             tileposx = 0
@@ -1510,29 +1806,6 @@ def create_overview_tile(
             else:
                 tileposy = 0
 
-        if dsquerytile.RasterCount == tilebands - 1:
-            # assume that the alpha band is missing and add it
-            tmp_ds = mem_driver.CreateCopy("", dsquerytile, 0)
-            tmp_ds.AddBand()
-            mask = bytearray(
-                [255] * (tile_job_info.tile_size * tile_job_info.tile_size)
-            )
-            tmp_ds.WriteRaster(
-                0,
-                0,
-                tile_job_info.tile_size,
-                tile_job_info.tile_size,
-                mask,
-                band_list=[tilebands],
-            )
-            dsquerytile = tmp_ds
-        elif dsquerytile.RasterCount != tilebands:
-            raise Exception("Unexpected number of bands in base tile")
-
-        base_data = dsquerytile.ReadRaster(
-            0, 0, tile_job_info.tile_size, tile_job_info.tile_size
-        )
-
         dsquery.WriteRaster(
             tileposx,
             tileposy,
@@ -1545,20 +1818,25 @@ def create_overview_tile(
         usable_base_tiles.append(base_tile)
 
     if not usable_base_tiles:
-        return
+        return None, None
 
     scale_query_to_tile(dsquery, dstile, options, tilefilename=tilefilename)
     # Write a copy of tile to png/jpg
+    encoded_tile = None
     if options.resampling != "antialias":
         # Write a copy of tile to png/jpg
-        out_driver.CreateCopy(
-            tilefilename, dstile, strict=0, options=_get_creation_options(options)
-        )
+        encoded_tile = _write_tile(out_driver, tilefilename, dstile, options)
         # Remove useless side car file
         aux_xml = tilefilename + ".aux.xml"
-        if gdal.VSIStatL(aux_xml) is not None:
+        if encoded_tile is None and gdal.VSIStatL(aux_xml) is not None:
             gdal.Unlink(aux_xml)
 
+    tile_data = None
+    if options.in_memory_overviews:
+        tile_data = dstile.ReadRaster(
+            0, 0, tile_job_info.tile_size, tile_job_info.tile_size
+        )
+
     if options.verbose:
         print("\tbuild from zoom", base_tz, " tiles:", *base_tiles)
 
@@ -1586,6 +1864,28 @@ def create_overview_tile(
                     ).encode("utf-8")
                 )
 
+    return tile_data, encoded_tile
+
+
+def create_overview_tile_in_memory(
+    base_tz: int,
+    job: Tuple[List[Tuple[int, int]], dict],
+    output_folder: str,
+    tile_job_info: "TileJobInfo",
+    options: Options,
+) -> Tuple[Tuple[int, int, int], Optional[bytes], Optional[bytes]]:
+    """
+    Same as create_overview_tile(), but taking a (base_tiles, base_tiles_data)
+    job and returning the (tz, tx, ty) key of the overview tile along with its
+    raw and encoded content, for use with pool.imap_unordered()
+    """
+    base_tiles, base_tiles_data = job
+    key = (base_tz - 1, base_tiles[0][0] >> 1, base_tiles[0][1] >> 1)
+    tile_data, encoded_tile = create_overview_tile(
+        base_tz, base_tiles, output_folder, tile_job_info, options, base_tiles_data
+    )
+    return key, tile_data, encoded_tile
+
 
 def group_overview_base_tiles(
     base_tz: int, output_folder: str, tile_job_info: "TileJobInfo"
@@ -1593,6 +1893,9 @@ def group_overview_base_tiles(
     """Group base tiles that belong to the same overview tile"""
 
     overview_to_bases = {}
+    dirty_ranges = None
+    if tile_job_info.dirty_tminmax is not None:
+        dirty_ranges = tile_job_info.dirty_tminmax[base_tz - 1]
     tminx, tminy, tmaxx, tmaxy = tile_job_info.tminmax[base_tz]
     for ty in range(tmaxy, tminy - 1, -1):
         overview_ty = ty >> 1
@@ -1600,6 +1903,10 @@ def group_overview_base_tiles(
             overview_tx = tx >> 1
             base_tile = (tx, ty)
             overview_tile = (overview_tx, overview_ty)
+            if dirty_ranges is not None and not is_tile_in_ranges(
+                overview_tx, overview_ty, dirty_ranges
+            ):
+                continue
 
             if overview_tile not in overview_to_bases:
                 overview_to_bases[overview_tile] = []
@@ -1607,18 +1914,91 @@ def group_overview_base_tiles(
             overview_to_bases[overview_tile].append(base_tile)
 
     # Create directories for the tiles
-    overview_tz = base_tz - 1
-    for tx in range(tminx, tmaxx + 1):
-        overview_tx = tx >> 1
-        tiledirname = os.path.join(output_folder, str(overview_tz), str(overview_tx))
-        makedirs(tiledirname)
+    if not tile_job_info.options.container:
+        overview_tz = base_tz - 1
+        for tx in range(tminx, tmaxx + 1):
+            overview_tx = tx >> 1
+            tiledirname = os.path.join(
+                output_folder, str(overview_tz), str(overview_tx)
+            )
+            makedirs(tiledirname)
 
     return list(overview_to_bases.values())
 
 
+def pop_base_tiles_data(
+    tile_store: "TileStore", base_tz: int, base_tiles: List[Tuple[int, int]]
+) -> Tuple[List[Tuple[int, int]], dict]:
+    """
+    Take the raw content of base tiles out of the tile store, and return it as
+    a job suitable for create_overview_tile_in_memory()
+    """
+    base_tiles_data = {}
+    for base_tx, base_ty in base_tiles:
+        tile_data = tile_store.pop((base_tz, base_tx, base_ty))
+        if tile_data is not None:
+            base_tiles_data[(base_tx, base_ty)] = tile_data
+    return base_tiles, base_tiles_data
+
+
+def is_tile_in_ranges(
+    tx: int, ty: int, ranges: List[Tuple[int, int, int, int]]
+) -> bool:
+    """Return whether a tile is in one of the (tminx, tminy, tmaxx, tmaxy) ranges"""
+    for tminx, tminy, tmaxx, tmaxy in ranges:
+        if tminx <= tx <= tmaxx and tminy <= ty <= tmaxy:
+            return True
+    return False
+
+
+def iterate_tiles_in_ranges(ranges: List[Tuple[int, int, int, int]]):
+    """Yield the (tx, ty) tiles of a list of possibly overlapping ranges once"""
+    seen = set()
+    for tminx, tminy, tmaxx, tmaxy in ranges:
+        for ty in range(tmaxy, tminy - 1, -1):
+            for tx in range(tminx, tmaxx + 1):
+                if (tx, ty) not in seen:
+                    seen.add((tx, ty))
+                    yield tx, ty
+
+
+def get_source_extent(filename: str) -> Optional[List[float]]:
+    """
+    Return the [xmin, ymin, xmax, ymax] georeferenced extent of a raster source
+    file, or None if it cannot be opened or is not georeferenced
+    """
+    gdal.PushErrorHandler("CPLQuietErrorHandler")
+    try:
+        ds = gdal.Open(filename)
+    except RuntimeError:
+        ds = None
+    finally:
+        gdal.PopErrorHandler()
+    if ds is None:
+        return None
+    gt = ds.GetGeoTransform(can_return_null=True)
+    if gt is None or gt[2] != 0 or gt[4] != 0:
+        return None
+    x0, x1 = gt[0], gt[0] + ds.RasterXSize * gt[1]
+    y0, y1 = gt[3], gt[3] + ds.RasterYSize * gt[5]
+    return [min(x0, x1), min(y0, y1), max(x0, x1), max(y0, y1)]
+
+
+def commit_manifest(output_folder: str) -> None:
+    """Replace the manifest of the previous run with the one of the current run"""
+    manifest_filename = os.path.join(output_folder, MANIFEST_FILENAME)
+    if isfile(manifest_filename + ".tmp"):
+        gdal.Rename(manifest_filename + ".tmp", manifest_filename)
+
+
 def count_overview_tiles(tile_job_info: "TileJobInfo") -> int:
     tile_number = 0
     for tz in range(tile_job_info.tmaxz - 1, tile_job_info.tminz - 1, -1):
+        if tile_job_info.dirty_tminmax is not None:
+            tile_number += sum(
+                1 for _ in iterate_tiles_in_ranges(tile_job_info.dirty_tminmax[tz])
+            )
+            continue
         tminx, tminy, tmaxx, tmaxy = tile_job_info.tminmax[tz]
         tile_number += (1 + abs(tmaxx - tminx)) * (1 + abs(tmaxy - tminy))
 
@@ -1742,6 +2122,70 @@ def optparse_init() -> optparse.OptionParser:
         type="choice",
         help="which tile driver to use for the tiles",
     )
+    p.add_option(
+        "--container",
+        dest="container",
+        type="choice",
+        choices=container_list,
+        help="Write the tiles in a single file of the specified format (%s), "
+        "instead of a directory" % ",".join(container_list),
+    )
+    p.add_option(
+        "--depth-first",
+        action="store_true",
+        dest="depth_first",
+        help="Generate the tiles by walking the quadtree in Z-order, each overview "
+        "tile being generated as soon as the tiles below it are done, instead "
+        "of one zoom level after the other",
+    )
+    p.add_option(
+        "--in-memory-overviews",
+        action="store_true",
+        dest="in_memory_overviews",
+        help="Build overview tiles from the raw content of the tiles of the "
+        "zoom level below kept in memory, instead of reading back the tiles "
+        "written on disk",
+    )
+    p.add_option(
+        "--tile-store-max-memory",
+        dest="tile_store_max_memory",
+        metavar="MB",
+        default=256,
+        type="int",
+        help="Maximum amount of memory in MB used by --in-memory-overviews "
+        "before spilling tiles to temporary files - default 256",
+    )
+    p.add_option(
+        "--metatile",
+        dest="metatile",
+        metavar="N",
+        default=1,
+        type="int",
+        help="Read and warp the input raster by blocks of NxN base tiles, "
+        "instead of tile by tile - default 1",
+    )
+    p.add_option(
+        "--coverage-mask",
+        action="store_true",
+        dest="coverage_mask",
+        help="Build a low resolution mask of the valid pixels of the input file "
+        "to skip the reading of fully transparent tiles",
+    )
+    p.add_option(
+        "--dirty-bbox",
+        dest="dirty_bbox",
+        metavar="XMIN,YMIN,XMAX,YMAX",
+        help="Only regenerate the tiles, and their overview tiles, intersecting "
+        "this extent expressed in the SRS of the input file",
+    )
+    p.add_option(
+        "--incremental",
+        action="store_true",
+        dest="incremental",
+        help="Only regenerate the tiles covering the source files added, "
+        "modified or removed since the previous run, as recorded in the "
+        "%s file of the output directory" % MANIFEST_FILENAME,
+    )
 
     # KML options
     g = optparse.OptionGroup(
@@ -1879,6 +2323,8 @@ def process_args(argv: List[str]) -> Tuple[str, str, Options]:
     else:
         # Directory with input filename without extension in actual directory
         output_folder = os.path.splitext(os.path.basename(input_file))[0]
+        if options.container:
+            output_folder += "." + options.container
 
     if options.webviewer == "mapml":
         options.xyz = True
@@ -1934,6 +2380,59 @@ def options_post_processing(
             "Install PIL (Python Imaging Library) and numpy.",
         )
 
+    if getattr(options, "container", None):
+        if options.profile != "mercator":
+            exit_with_error("--container=mbtiles requires the 'mercator' profile")
+        if options.resume:
+            exit_with_error("--resume is not compatible with --container")
+        if options.resampling == "antialias":
+            exit_with_error("--container is not compatible with 'antialias' resampling")
+        if output_folder.startswith("/vsi"):
+            exit_with_error("--container cannot write in a /vsi file system")
+        # Tiles can only be read back from memory, and are written to the
+        # container as soon as they are available
+        options.in_memory_overviews = True
+        options.depth_first = True
+        options.webviewer = "none"
+        options.kml = False
+
+    if getattr(options, "in_memory_overviews", False):
+        if options.resampling == "antialias":
+            exit_with_error(
+                "--in-memory-overviews is not compatible with 'antialias' resampling"
+            )
+        if options.tile_store_max_memory < 0:
+            exit_with_error("--tile-store-max-memory should be a positive value")
+
+    if getattr(options, "metatile", 1) != 1:
+        if options.metatile < 1:
+            exit_with_error("--metatile should be a positive value")
+        if options.profile == "raster":
+            exit_with_error("--metatile is not supported with the 'raster' profile")
+        if options.resampling == "antialias":
+            exit_with_error("--metatile is not compatible with 'antialias' resampling")
+
+    if getattr(options, "dirty_bbox", None) and isinstance(options.dirty_bbox, str):
+        try:
+            dirty_bbox = [float(v) for v in options.dirty_bbox.split(",")]
+        except ValueError:
+            dirty_bbox = []
+        if len(dirty_bbox) != 4:
+            exit_with_error("--dirty-bbox should be XMIN,YMIN,XMAX,YMAX")
+        if dirty_bbox[0] > dirty_bbox[2] or dirty_bbox[1] > dirty_bbox[3]:
+            exit_with_error("Invalid --dirty-bbox: XMIN > XMAX or YMIN > YMAX")
+        options.dirty_bbox = dirty_bbox
+
+    if getattr(options, "dirty_bbox", None) or getattr(options, "incremental", False):
+        if options.resume:
+            exit_with_error(
+                "--resume is not compatible with --dirty-bbox/--incremental"
+            )
+        if getattr(options, "container", None):
+            exit_with_error(
+                "--container is not compatible with --dirty-bbox/--incremental"
+            )
+
     if options.tiledriver == "WEBP":
         if gdal.GetDriverByName(options.tiledriver) is None:
             exit_with_error("WEBP driver is not available")
@@ -1967,6 +2466,10 @@ class TileDetail(object):
     wxsize = 0
     wysize = 0
     querysize = 0
+    empty = False
+    # Offset of the tile in its metatile, in pixels
+    meta_x = 0
+    meta_y = 0
 
     def __init__(self, **kwargs):
         for key in kwargs:
@@ -1983,6 +2486,39 @@ class TileDetail(object):
         return "TileDetail %s\n%s\n%s\n" % (self.tx, self.ty, self.tz)
 
 
+class MetaTileDetail(object):
+    """
+    Block of --metatile x --metatile base tiles read and warped at once from
+    the input raster, whose tiles are then sliced from it
+    """
+
+    rx = 0
+    ry = 0
+    rxsize = 0
+    rysize = 0
+    wx = 0
+    wy = 0
+    wxsize = 0
+    wysize = 0
+    querysize = 0
+    size = 0
+    tile_details = []
+
+    def __init__(self, **kwargs):
+        for key in kwargs:
+            if hasattr(self, key):
+                setattr(self, key, kwargs[key])
+
+    def __unicode__(self):
+        return "MetaTileDetail %s" % (self.tile_details)
+
+    def __str__(self):
+        return "MetaTileDetail %s" % (self.tile_details)
+
+    def __repr__(self):
+        return "MetaTileDetail %s" % (self.tile_details)
+
+
 class TileJobInfo(object):
     """
     Plain object to hold tile job configuration for a dataset
@@ -2004,6 +2540,8 @@ class TileJobInfo(object):
     is_epsg_4326 = False
     options = None
     exclude_transparent = False
+    swne = None
+    dirty_tminmax = None
 
     def __init__(self, **kwargs):
         for key in kwargs:
@@ -2020,6 +2558,243 @@ class TileJobInfo(object):
         return "TileJobInfo %s\n" % (self.src_file)
 
 
+class TileStore(object):
+    """
+    Bounded store of the raw (not encoded) content of tiles, indexed by
+    (tz, tx, ty) in TMS numbering.
+
+    It is used to build overview tiles from the tiles of the zoom level below
+    without reading back and decoding the files that were just written.
+    Tiles are kept in memory up to max_memory bytes, the oldest ones being
+    spilled to temporary files in tmp_dir beyond that.
+    """
+
+    def __init__(self, max_memory: int, tmp_dir: str) -> None:
+        self.max_memory = max_memory
+        self.tmp_dir = tmp_dir
+        self.memory_used = 0
+        self.in_memory = OrderedDict()
+        self.spilled = set()
+
+    def _spill_filename(self, key: Tuple[int, int, int]) -> str:
+        return os.path.join(self.tmp_dir, "tile_store_%d_%d_%d.raw" % key)
+
+    def __len__(self) -> int:
+        return len(self.in_memory) + len(self.spilled)
+
+    def __contains__(self, key: Tuple[int, int, int]) -> bool:
+        return key in self.in_memory or key in self.spilled
+
+    def put(self, key: Tuple[int, int, int], data: bytes) -> None:
+        self.pop(key)
+        self.in_memory[key] = data
+        self.memory_used += len(data)
+        while self.memory_used > self.max_memory and self.in_memory:
+            spilled_key, spilled_data = self.in_memory.popitem(last=False)
+            self.memory_used -= len(spilled_data)
+            with open(self._spill_filename(spilled_key), "wb") as f:
+                f.write(spilled_data)
+            self.spilled.add(spilled_key)
+
+    def pop(self, key: Tuple[int, int, int]) -> Optional[bytes]:
+        """Remove a tile from the store and return its content, or None"""
+        data = self.in_memory.pop(key, None)
+        if data is not None:
+            self.memory_used -= len(data)
+            return data
+        if key in self.spilled:
+            self.spilled.remove(key)
+            filename = self._spill_filename(key)
+            with open(filename, "rb") as f:
+                data = f.read()
+            os.unlink(filename)
+            return data
+        return None
+
+    def close(self) -> None:
+        for key in self.spilled:
+            os.unlink(self._spill_filename(key))
+        self.spilled = set()
+        self.in_memory = OrderedDict()
+        self.memory_used = 0
+
+
+class MBTilesWriter(object):
+    """
+    Write encoded tiles into a MBTiles file, committing them by batches of
+    batch_size tiles.
+
+    Identical tiles are stored once: the tiles table is a view joining the map
+    of the tiles to the images table, indexed by the MD5 of the tile content.
+    """
+
+    def __init__(self, filename: str, batch_size: int = 1000) -> None:
+        if os.path.exists(filename):
+            os.unlink(filename)
+        self.conn = sqlite3.connect(filename)
+        self.conn.execute("PRAGMA synchronous = OFF")
+        self.conn.execute("PRAGMA journal_mode = OFF")
+        self.conn.execute("CREATE TABLE metadata (name TEXT, value TEXT)")
+        self.conn.execute(
+            "CREATE TABLE map (zoom_level INTEGER, tile_column INTEGER, "
+            "tile_row INTEGER, tile_id TEXT)"
+        )
+        self.conn.execute("CREATE TABLE images (tile_data BLOB, tile_id TEXT)")
+        self.conn.execute(
+            "CREATE VIEW tiles AS SELECT map.zoom_level AS zoom_level, "
+            "map.tile_column AS tile_column, map.tile_row AS tile_row, "
+            "images.tile_data AS tile_data FROM map "
+            "JOIN images ON images.tile_id = map.tile_id"
+        )
+        self.batch_size = batch_size
+        self.pending_tiles = []
+        self.pending_images = []
+        self.tile_ids = set()
+
+    def write_tile(self, key: Tuple[int, int, int], encoded_tile: bytes) -> None:
+        """Write a tile, indexed by its (tz, tx, ty) TMS key"""
+        tile_id = hashlib.md5(encoded_tile).hexdigest()
+        if tile_id not in self.tile_ids:
+            self.tile_ids.add(tile_id)
+            self.pending_images.append((sqlite3.Binary(encoded_tile), tile_id))
+        self.pending_tiles.append(key + (tile_id,))
+        if len(self.pending_tiles) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        with self.conn:
+            self.conn.executemany(
+                "INSERT INTO images VALUES (?, ?)", self.pending_images
+            )
+            self.conn.executemany(
+                "INSERT INTO map VALUES (?, ?, ?, ?)", self.pending_tiles
+            )
+        self.pending_tiles = []
+        self.pending_images = []
+
+    def close(self, metadata: dict) -> None:
+        self.flush()
+        with self.conn:
+            self.conn.executemany(
+                "INSERT INTO metadata VALUES (?, ?)",
+                [(k, str(v)) for k, v in metadata.items()],
+            )
+            # Creating the index at the end is faster than updating it
+            # for each tile
+            self.conn.execute(
+                "CREATE UNIQUE INDEX map_index ON map "
+                "(zoom_level, tile_column, tile_row)"
+            )
+            self.conn.execute("CREATE UNIQUE INDEX images_id ON images (tile_id)")
+        self.conn.close()
+
+
+class CoverageMask(object):
+    """
+    Low resolution mask of the valid pixels of the input dataset, built once
+    from its mask bands (using their overviews when available), to detect the
+    fully transparent tiles without reading the input dataset
+    """
+
+    def __init__(
+        self,
+        input_dataset: gdal.Dataset,
+        in_srs: Optional[osr.SpatialReference],
+        out_srs: Optional[osr.SpatialReference],
+        out_gt: Tuple[float, ...],
+        options: Options,
+        max_size: int = 1024,
+    ) -> None:
+        xsize = input_dataset.RasterXSize
+        ysize = input_dataset.RasterYSize
+        self.step = max(1, int(math.ceil(max(xsize, ysize) / max_size)))
+        self.grid_xsize = int(math.ceil(xsize / self.step))
+        self.grid_ysize = int(math.ceil(ysize / self.step))
+
+        # A cell is valid if any pixel of any band is valid in it
+        self.grid = bytearray(self.grid_xsize * self.grid_ysize)
+        first_band = input_dataset.GetRasterBand(1)
+        if options.srcnodata or (first_band.GetMaskFlags() & gdal.GMF_ALL_VALID):
+            # The mask of the input dataset does not reflect the nodata value
+            # overridden with --srcnodata: only use its footprint
+            self.grid = bytearray(b"\x01") * len(self.grid)
+        else:
+            if first_band.GetMaskFlags() & gdal.GMF_PER_DATASET:
+                mask_bands = [first_band.GetMaskBand()]
+            else:
+                mask_bands = [
+                    input_dataset.GetRasterBand(i + 1).GetMaskBand()
+                    for i in range(input_dataset.RasterCount)
+                ]
+            for mask_band in mask_bands:
+                data = mask_band.ReadRaster(
+                    0,
+                    0,
+                    xsize,
+                    ysize,
+                    self.grid_xsize,
+                    self.grid_ysize,
+                    buf_type=gdal.GDT_Float32,
+                    resample_alg=gdal.GRIORA_Average,
+                )
+                for i, value in enumerate(struct.unpack("%df" % len(self.grid), data)):
+                    if value > 0:
+                        self.grid[i] = 1
+
+        self.out_gt = out_gt
+        self.inv_in_gt = gdal.InvGeoTransform(input_dataset.GetGeoTransform())
+        self.ct = None
+        if (
+            options.profile != "raster"
+            and in_srs
+            and out_srs
+            and not in_srs.IsSame(out_srs)
+        ):
+            self.ct = osr.CoordinateTransformation(out_srs, in_srs)
+
+    def is_empty(self, rx: int, ry: int, rxsize: int, rysize: int) -> bool:
+        """
+        Return whether a window of the warped input dataset has no valid pixel.
+        Errs on the side of returning False.
+        """
+        nsteps = 4
+        points = []
+        for i in range(nsteps + 1):
+            px = rx + rxsize * i / nsteps
+            py = ry + rysize * i / nsteps
+            points += [(px, ry), (px, ry + rysize), (rx, py), (rx + rxsize, py)]
+        gt = self.out_gt
+        points = [
+            (gt[0] + px * gt[1] + py * gt[2], gt[3] + px * gt[4] + py * gt[5])
+            for px, py in points
+        ]
+        if self.ct is not None:
+            try:
+                points = self.ct.TransformPoints(points)
+            except RuntimeError:
+                return False
+
+        xs = []
+        ys = []
+        inv_gt = self.inv_in_gt
+        for p in points:
+            if not math.isfinite(p[0]) or not math.isfinite(p[1]):
+                return False
+            xs.append(inv_gt[0] + p[0] * inv_gt[1] + p[1] * inv_gt[2])
+            ys.append(inv_gt[3] + p[0] * inv_gt[4] + p[1] * inv_gt[5])
+
+        # Add a margin of one cell to account for the resampling of the mask
+        x0 = max(int(math.floor(min(xs) / self.step)) - 1, 0)
+        x1 = min(int(math.floor(max(xs) / self.step)) + 1, self.grid_xsize - 1)
+        y0 = max(int(math.floor(min(ys) / self.step)) - 1, 0)
+        y1 = min(int(math.floor(max(ys) / self.step)) + 1, self.grid_ysize - 1)
+        for y in range(y0, y1 + 1):
+            offset = y * self.grid_xsize
+            if self.grid.find(1, offset + x0, offset + x1 + 1) >= 0:
+                return False
+        return True
+
+
 class Gdal2TilesError(Exception):
     pass
 
@@ -2038,6 +2813,7 @@ class GDAL2Tiles(object):
         self.geodetic = None
         self.dataBandsCount = None
         self.out_gt = None
+        self.oversample_factor = 1
         self.tileswne = None
         self.swne = None
         self.ominx = None
@@ -2052,6 +2828,10 @@ class GDAL2Tiles(object):
         self.in_srs = None
         self.in_srs_wkt = None
 
+        # Tile ranges to regenerate for each zoom level, with --dirty-bbox
+        # or --incremental
+        self.dirty_tminmax = None
+
         # Tile format
         self.tile_size = 256
         if options.tilesize:
@@ -2062,7 +2842,11 @@ class GDAL2Tiles(object):
             self.tileext = "png"
         else:
             self.tileext = "webp"
-        if options.mpi:
+        if options.mpi and options.container:
+            self.tmp_dir = tempfile.mkdtemp(
+                dir=os.path.dirname(os.path.abspath(output_folder))
+            )
+        elif options.mpi:
             makedirs(output_folder)
             self.tmp_dir = tempfile.mkdtemp(dir=output_folder)
         else:
@@ -2428,6 +3212,7 @@ class GDAL2Tiles(object):
                 # one, generate an oversample temporary VRT file, and tile from
                 # it
                 oversample_factor = 1 << (self.tmaxz - self.nativezoom)
+                self.oversample_factor = oversample_factor
                 if self.options.resampling in ("average", "antialias"):
                     resampleAlg = "average"
                 elif self.options.resampling in (
@@ -2548,7 +3333,8 @@ class GDAL2Tiles(object):
         tiles are generated during the tile processing).
         """
 
-        makedirs(self.output_folder)
+        if not self.options.container:
+            makedirs(self.output_folder)
 
         if self.options.profile == "mercator":
 
@@ -2612,6 +3398,7 @@ class GDAL2Tiles(object):
         # Generate tilemapresource.xml.
         if (
             not self.options.xyz
+            and not self.options.container
             and self.swne is not None
             and (
                 not self.options.resume
@@ -2666,6 +3453,219 @@ class GDAL2Tiles(object):
                             ).encode("utf-8")
                         )
 
+    def update_manifest(self) -> Optional[List[Tuple[float, float, float, float]]]:
+        """
+        Compare the source files of the input dataset with the ones recorded in
+        the manifest of the previous run, and write the manifest of this run in
+        a temporary file, which replaces the previous one once the tiling is done.
+
+        Return the extents, in the SRS of the input file, of the source files
+        added, modified or removed since the previous run, or None if all tiles
+        must be regenerated.
+        """
+        settings = {
+            "profile": self.options.profile,
+            "resampling": self.options.resampling,
+            "s_srs": self.options.s_srs,
+            "srcnodata": self.options.srcnodata,
+            "tile_size": self.tile_size,
+            "tile_driver": self.tiledriver,
+            "xyz": bool(self.options.xyz),
+            "zoom": [self.tminz, self.tmaxz],
+        }
+
+        sources = {}
+        input_dataset = gdal.Open(self.input_file, gdal.GA_ReadOnly)
+        is_vrt = input_dataset.GetDriver().ShortName == "VRT"
+        for filename in input_dataset.GetFileList() or []:
+            # Changes of the sources of a VRT mosaic are tracked through the
+            # sources themselves
+            if is_vrt and filename == self.input_file:
+                continue
+            stat_res = gdal.VSIStatL(filename)
+            if stat_res is None:
+                continue
+            sources[filename] = {
+                "size": stat_res.size,
+                "mtime": stat_res.mtime,
+                "extent": get_source_extent(filename),
+            }
+        input_dataset = None
+
+        manifest_filename = os.path.join(self.output_folder, MANIFEST_FILENAME)
+        previous_manifest = None
+        if isfile(manifest_filename):
+            with my_open(manifest_filename, "rb") as f:
+                try:
+                    previous_manifest = json.loads(f.read())
+                except ValueError:
+                    pass
+
+        with my_open(manifest_filename + ".tmp", "wb") as f:
+            manifest = {"settings": settings, "sources": sources}
+            f.write(json.dumps(manifest, indent=2).encode("utf-8"))
+
+        if (
+            not isinstance(previous_manifest, dict)
+            or previous_manifest.get("settings") != settings
+        ):
+            return None
+
+        extents = []
+        previous_sources = previous_manifest.get("sources", {})
+        for filename in sorted(set(previous_sources) | set(sources)):
+            previous_source = previous_sources.get(filename)
+            source = sources.get(filename)
+            if (
+                previous_source is not None
+                and source is not None
+                and previous_source["size"] == source["size"]
+                and previous_source["mtime"] == source["mtime"]
+            ):
+                continue
+            if self.options.verbose:
+                print("Source file changed since the previous run:", filename)
+            for entry in (previous_source, source):
+                if entry is None:
+                    continue
+                if entry["extent"] is None:
+                    return None
+                extents.append(tuple(entry["extent"]))
+        return extents
+
+    def input_extent_to_output_extent(
+        self, extent: Tuple[float, float, float, float]
+    ) -> Optional[Tuple[float, float, float, float]]:
+        """
+        Transform an extent from the input SRS to the output SRS, densifying its
+        edges. Return None if it cannot be transformed.
+        """
+        if (
+            self.options.profile == "raster"
+            or not self.in_srs
+            or not self.out_srs
+            or self.in_srs.IsSame(self.out_srs)
+        ):
+            return extent
+
+        xmin, ymin, xmax, ymax = extent
+        nsteps = 20
+        points = []
+        for i in range(nsteps + 1):
+            x = xmin + (xmax - xmin) * i / nsteps
+            y = ymin + (ymax - ymin) * i / nsteps
+            points += [(x, ymin), (x, ymax), (xmin, y), (xmax, y)]
+        ct = osr.CoordinateTransformation(self.in_srs, self.out_srs)
+        try:
+            transformed = ct.TransformPoints(points)
+        except RuntimeError:
+            return None
+        xs = [p[0] for p in transformed if math.isfinite(p[0]) and math.isfinite(p[1])]
+        ys = [p[1] for p in transformed if math.isfinite(p[0]) and math.isfinite(p[1])]
+        if not xs:
+            return None
+        return min(xs), min(ys), max(xs), max(ys)
+
+    def georef_extent_to_tile_range(
+        self, xmin: float, ymin: float, xmax: float, ymax: float, tz: int
+    ) -> Optional[Tuple[int, int, int, int]]:
+        """
+        Return the (tminx, tminy, tmaxx, tmaxy) range of the tiles of zoom level
+        tz intersecting an extent in the output SRS, or None if there is none
+        """
+        if self.options.profile == "mercator":
+            tminx, tminy = self.mercator.MetersToTile(xmin, ymin, tz)
+            tmaxx, tmaxy = self.mercator.MetersToTile(xmax, ymax, tz)
+        elif self.options.profile == "geodetic":
+            tminx, tminy = self.geodetic.LonLatToTile(xmin, ymin, tz)
+            tmaxx, tmaxy = self.geodetic.LonLatToTile(xmax, ymax, tz)
+        elif self.options.profile == "raster":
+            tsize = self.tsize[tz] * self.out_gt[1]  # in georeferenced units
+            tminx = int(math.floor((xmin - self.out_gt[0]) / tsize))
+            tmaxx = int(math.floor((xmax - self.out_gt[0]) / tsize))
+            if self.options.xyz:
+                # Tiles are numbered from the top of the raster
+                tminy = int(math.floor((self.out_gt[3] - ymax) / tsize))
+                tmaxy = int(math.floor((self.out_gt[3] - ymin) / tsize))
+            else:
+                tminy = int(math.floor((ymin - self.ominy) / tsize))
+                tmaxy = int(math.floor((ymax - self.ominy) / tsize))
+        else:
+            tms = tmsMap[self.options.profile]
+            tminx, tminy = tms.GeorefCoordToTileCoord(xmin, ymin, tz, self.tile_size)
+            tmaxx, tmaxy = tms.GeorefCoordToTileCoord(xmax, ymax, tz, self.tile_size)
+
+        tminx = max(tminx, self.tminmax[tz][0])
+        tminy = max(tminy, self.tminmax[tz][1])
+        tmaxx = min(tmaxx, self.tminmax[tz][2])
+        tmaxy = min(tmaxy, self.tminmax[tz][3])
+        if tminx > tmaxx or tminy > tmaxy:
+            return None
+        return tminx, tminy, tmaxx, tmaxy
+
+    def compute_dirty_tminmax(self) -> None:
+        """
+        Compute the tile ranges to regenerate with --dirty-bbox or --incremental.
+        The ranges of the overview levels are the parents of the dirty base tiles.
+        """
+        extents = []
+        if self.options.dirty_bbox:
+            extents.append(tuple(self.options.dirty_bbox))
+        if self.options.incremental:
+            manifest_extents = self.update_manifest()
+            if manifest_extents is None:
+                if self.options.verbose:
+                    print("No usable manifest of a previous run: generating all tiles")
+                return
+            extents += manifest_extents
+
+        # Pad the extents by the radius of the resampling kernel, in pixels of
+        # the (warped) input, before any oversampling
+        radius = RESAMPLING_KERNEL_RADIUS.get(self.options.resampling, 1)
+        pad_x = radius * self.oversample_factor * abs(self.out_gt[1])
+        pad_y = radius * self.oversample_factor * abs(self.out_gt[5])
+
+        base_ranges = []
+        for extent in extents:
+            out_extent = self.input_extent_to_output_extent(extent)
+            if out_extent is None:
+                continue
+            xmin, ymin, xmax, ymax = out_extent
+            tile_range = self.georef_extent_to_tile_range(
+                xmin - pad_x, ymin - pad_y, xmax + pad_x, ymax + pad_y, self.tmaxz
+            )
+            if tile_range is not None:
+                base_ranges.append(tile_range)
+
+        self.dirty_tminmax = [[] for _ in range(self.tmaxz + 1)]
+        for tz in range(self.tminz, self.tmaxz + 1):
+            shift = self.tmaxz - tz
+            tminx, tminy, tmaxx, tmaxy = self.tminmax[tz]
+            for minx, miny, maxx, maxy in base_ranges:
+                tile_range = (
+                    max(minx >> shift, tminx),
+                    max(miny >> shift, tminy),
+                    min(maxx >> shift, tmaxx),
+                    min(maxy >> shift, tmaxy),
+                )
+                if tile_range[0] <= tile_range[2] and tile_range[1] <= tile_range[3]:
+                    self.dirty_tminmax[tz].append(tile_range)
+
+            # Remove the previous version of the tiles to regenerate, so that
+            # no stale tile is left if they end up being empty
+            for tx, ty in iterate_tiles_in_ranges(self.dirty_tminmax[tz]):
+                tilefilename = os.path.join(
+                    self.output_folder,
+                    str(tz),
+                    str(tx),
+                    "%s.%s" % (GDAL2Tiles.getYTile(ty, tz, self.options), self.tileext),
+                )
+                if isfile(tilefilename):
+                    gdal.Unlink(tilefilename)
+
+        if self.options.verbose:
+            print("Tile ranges to regenerate:", self.dirty_tminmax)
+
     def generate_base_tiles(self) -> Tuple[TileJobInfo, List[TileDetail]]:
         """
         Generation of the base tiles (the lowest in the pyramid) directly from the input raster
@@ -2680,6 +3680,25 @@ class GDAL2Tiles(object):
             print("----------------------------------------")
             print("")
 
+        if self.options.dirty_bbox or self.options.incremental:
+            self.compute_dirty_tminmax()
+
+        coverage_mask = None
+        if self.options.coverage_mask:
+            input_dataset = gdal.Open(self.input_file, gdal.GA_ReadOnly)
+            if input_dataset.GetGeoTransform(can_return_null=True) is None:
+                if self.options.verbose:
+                    print("No geotransform on the input file: coverage mask ignored")
+            else:
+                coverage_mask = CoverageMask(
+                    input_dataset,
+                    self.in_srs,
+                    self.out_srs,
+                    self.out_gt,
+                    self.options,
+                )
+            input_dataset = None
+
         # Set the bounds
         tminx, tminy, tmaxx, tmaxy = self.tminmax[self.tmaxz]
 
@@ -2699,9 +3718,10 @@ class GDAL2Tiles(object):
         tz = self.tmaxz
 
         # Create directories for the tiles
-        for tx in range(tminx, tmaxx + 1):
-            tiledirname = os.path.join(self.output_folder, str(tz), str(tx))
-            makedirs(tiledirname)
+        if not self.options.container:
+            for tx in range(tminx, tmaxx + 1):
+                tiledirname = os.path.join(self.output_folder, str(tz), str(tx))
+                makedirs(tiledirname)
 
         for ty in range(tmaxy, tminy - 1, -1):
             for tx in range(tminx, tmaxx + 1):
@@ -2717,6 +3737,11 @@ class GDAL2Tiles(object):
                 if self.options.verbose:
                     print(ti, "/", tcount, tilefilename)
 
+                if self.dirty_tminmax is not None and not is_tile_in_ranges(
+                    tx, ty, self.dirty_tminmax[tz]
+                ):
+                    continue
+
                 if self.options.resume and isfile(tilefilename):
                     if self.options.verbose:
                         print("Tile generation skipped because of --resume")
@@ -2785,6 +3810,14 @@ class GDAL2Tiles(object):
                         if wysize != self.tile_size:
                             wy = self.tile_size - wysize
 
+                empty = coverage_mask is not None and coverage_mask.is_empty(
+                    rx, ry, rxsize, rysize
+                )
+                if empty and self.options.exclude_transparent:
+                    if self.options.verbose:
+                        print("\tTile skipped because of the coverage mask")
+                    continue
+
                 # Read the source raster if anything is going inside the tile as per the computed
                 # geo_query
                 tile_details.append(
@@ -2801,6 +3834,7 @@ class GDAL2Tiles(object):
                         wxsize=wxsize,
                         wysize=wysize,
                         querysize=querysize,
+                        empty=empty,
                     )
                 )
 
@@ -2821,10 +3855,77 @@ class GDAL2Tiles(object):
             is_epsg_4326=self.isepsg4326,
             options=self.options,
             exclude_transparent=self.options.exclude_transparent,
+            swne=self.swne,
+            dirty_tminmax=self.dirty_tminmax,
         )
 
+        if self.options.metatile > 1:
+            return conf, self.group_metatiles(tile_details)
+
         return conf, tile_details
 
+    def group_metatiles(self, tile_details: List[TileDetail]) -> List[MetaTileDetail]:
+        """
+        Group the base tiles by aligned blocks of --metatile x --metatile tiles,
+        each block being read and warped at once from the input raster
+        """
+        n = self.options.metatile
+        tz = self.tmaxz
+        metatiles = OrderedDict()
+        for tile_detail in tile_details:
+            ty = GDAL2Tiles.getYTile(tile_detail.ty, tz, self.options)
+            mx, my = tile_detail.tx // n, ty // n
+            # TMS rows go upwards, whereas the rows of the metatile go downwards
+            tile_detail.meta_x = (tile_detail.tx - mx * n) * self.tile_size
+            tile_detail.meta_y = (n - 1 - (ty - my * n)) * self.tile_size
+            metatiles.setdefault((mx, my), []).append(tile_detail)
+
+        size = n * self.tile_size
+        querysize = n * self.querysize
+        metatile_details = []
+        for (mx, my), details in metatiles.items():
+            if self.options.profile == "mercator":
+                bmin = self.mercator.TileBounds(mx * n, my * n, tz)
+                bmax = self.mercator.TileBounds(mx * n + n - 1, my * n + n - 1, tz)
+            elif self.options.profile == "geodetic":
+                bmin = self.geodetic.TileBounds(mx * n, my * n, tz)
+                bmax = self.geodetic.TileBounds(mx * n + n - 1, my * n + n - 1, tz)
+            else:
+                tms = tmsMap[self.options.profile]
+                bmin = tms.TileBounds(mx * n, my * n, tz, self.tile_size)
+                bmax = tms.TileBounds(
+                    mx * n + n - 1, my * n + n - 1, tz, self.tile_size
+                )
+
+            rb, wb = self.geo_query(
+                self.warped_input_dataset,
+                bmin[0],
+                bmax[3],
+                bmax[2],
+                bmin[1],
+                querysize=querysize,
+            )
+            metatile_details.append(
+                MetaTileDetail(
+                    rx=rb[0],
+                    ry=rb[1],
+                    rxsize=rb[2],
+                    rysize=rb[3],
+                    wx=wb[0],
+                    wy=wb[1],
+                    wxsize=wb[2],
+                    wysize=wb[3],
+                    querysize=querysize,
+                    size=size,
+                    tile_details=details,
+                )
+            )
+
+        if self.options.verbose:
+            print("Metatiles:", len(metatile_details))
+
+        return metatile_details
+
     def geo_query(self, ds, ulx, uly, lrx, lry, querysize=0):
         """
         For given dataset and query in cartographic coordinates returns parameters for ReadRaster()
@@ -4373,6 +5474,172 @@ def get_tile_swne(tile_job_info, options):
     return tile_swne
 
 
+def morton_code(tx: int, ty: int) -> int:
+    """Interleave the bits of tx and ty, so that sorting on it gives the Z-order"""
+    code = 0
+    bit = 0
+    while (tx >> bit) or (ty >> bit):
+        code |= ((tx >> bit) & 1) << (2 * bit)
+        code |= ((ty >> bit) & 1) << (2 * bit + 1)
+        bit += 1
+    return code
+
+
+def quadtree_tiling(
+    conf: TileJobInfo,
+    tile_details: List[TileDetail],
+    output_folder: str,
+    options: Options,
+    pool=None,
+    nb_processes: int = 1,
+) -> None:
+    """
+    Generate base and overview tiles by walking the quadtree in Z-order, so
+    that each overview tile is generated as soon as the tiles below it are
+    done, instead of waiting for the whole zoom level below to be completed.
+
+    If pool is None, tiles are generated in the current process. Otherwise
+    pool must be a multiprocessing.Pool or a concurrent.futures.Executor.
+    """
+
+    tile_store = None
+    if options.in_memory_overviews:
+        tile_store = TileStore(
+            options.tile_store_max_memory * 1024 * 1024, os.path.dirname(conf.src_file)
+        )
+
+    container_writer = None
+    if options.container == "mbtiles":
+        container_writer = MBTilesWriter(output_folder)
+
+    # Number of children of each overview tile that are going to be generated
+    # and that the overview tile must wait for
+    pending_children = {}
+    overview_base_tiles = {}
+    scheduled = scheduled_base_tiles = set(
+        (conf.tmaxz, d.tx, GDAL2Tiles.getYTile(d.ty, d.tz, options))
+        for d in iterate_base_tile_details(tile_details)
+    )
+    for base_tz in range(conf.tmaxz, conf.tminz, -1):
+        overview_keys = set()
+        for base_tiles in group_overview_base_tiles(base_tz, output_folder, conf):
+            key = (base_tz - 1, base_tiles[0][0] >> 1, base_tiles[0][1] >> 1)
+            overview_base_tiles[key] = base_tiles
+            pending_children[key] = sum(
+                1 for tx, ty in base_tiles if (base_tz, tx, ty) in scheduled
+            )
+            overview_keys.add(key)
+        scheduled = overview_keys
+
+    progress_bar = None
+    if not options.verbose and not options.quiet:
+        progress_bar = ProgressBar(len(scheduled_base_tiles) + len(overview_base_tiles))
+        progress_bar.start()
+
+    # Overview tiles whose children are all done, and that can be generated
+    ready = [key for key, count in pending_children.items() if count == 0]
+
+    def job_morton_code(job):
+        d = next(iterate_base_tile_details([job]))
+        return morton_code(d.tx, GDAL2Tiles.getYTile(d.ty, d.tz, options))
+
+    base_tile_details = iter(sorted(tile_details, key=job_morton_code))
+    create_base = partial(create_base_tiles, conf)
+    create_overview = partial(
+        create_overview_tile_in_memory,
+        output_folder=output_folder,
+        tile_job_info=conf,
+        options=options,
+    )
+
+    results = queue.Queue()
+
+    def submit(func, *args):
+        if pool is None:
+            results.put(func(*args))
+        elif hasattr(pool, "apply_async"):
+            pool.apply_async(
+                func, args, callback=results.put, error_callback=results.put
+            )
+        else:
+            pool.submit(func, *args).add_done_callback(
+                lambda f: results.put(f.exception() or f.result())
+            )
+
+    max_in_flight = 4 * nb_processes
+    in_flight = 0
+    base_tiles_exhausted = False
+    while True:
+        # Give priority to overview tiles, to release the content of the tiles
+        # below them as soon as possible
+        while ready and in_flight < max_in_flight:
+            key = ready.pop()
+            base_tz = key[0] + 1
+            base_tiles = overview_base_tiles[key]
+            if tile_store is None:
+                job = (base_tiles, None)
+            else:
+                job = pop_base_tiles_data(tile_store, base_tz, base_tiles)
+            submit(create_overview, base_tz, job)
+            in_flight += 1
+
+        while not base_tiles_exhausted and not ready and in_flight < max_in_flight:
+            tile_detail = next(base_tile_details, None)
+            if tile_detail is None:
+                base_tiles_exhausted = True
+            else:
+                submit(create_base, tile_detail)
+                in_flight += 1
+
+        if in_flight == 0:
+            break
+
+        result = results.get()
+        in_flight -= 1
+        if isinstance(result, Exception):
+            raise result
+        # Base tile jobs return a list of results, one per tile
+        if not isinstance(result, list):
+            result = [result]
+
+        for key, tile_data, encoded_tile in result:
+            if container_writer is not None and encoded_tile is not None:
+                container_writer.write_tile(key, encoded_tile)
+
+            if key[0] > conf.tminz:
+                if tile_store is not None and tile_data is not None:
+                    tile_store.put(key, tile_data)
+
+                parent_key = (key[0] - 1, key[1] >> 1, key[2] >> 1)
+                if parent_key in pending_children:
+                    pending_children[parent_key] -= 1
+                    if pending_children[parent_key] == 0:
+                        ready.append(parent_key)
+
+            if progress_bar:
+                progress_bar.log_progress()
+
+    if getattr(threadLocal, "cached_ds", None):
+        del threadLocal.cached_ds
+
+    if tile_store is not None:
+        tile_store.close()
+
+    if container_writer is not None:
+        south, west, north, east = conf.swne
+        container_writer.close(
+            {
+                "name": options.title,
+                "format": conf.tile_extension,
+                "type": "overlay",
+                "version": "1.1",
+                "bounds": "%.8f,%.8f,%.8f,%.8f" % (west, south, east, north),
+                "minzoom": conf.tminz,
+                "maxzoom": conf.tmaxz,
+            }
+        )
+
+
 def single_threaded_tiling(
     input_file: str, output_folder: str, options: Options
 ) -> None:
@@ -4387,15 +5654,30 @@ def single_threaded_tiling(
     if options.verbose:
         print("Tiles details calc complete.")
 
+    if options.depth_first:
+        quadtree_tiling(conf, tile_details, output_folder, options)
+        shutil.rmtree(os.path.dirname(conf.src_file))
+        return
+
     if not options.verbose and not options.quiet:
-        base_progress_bar = ProgressBar(len(tile_details))
+        base_progress_bar = ProgressBar(
+            sum(1 for _ in iterate_base_tile_details(tile_details))
+        )
         base_progress_bar.start()
 
-    for tile_detail in tile_details:
-        create_base_tile(conf, tile_detail)
+    tile_store = None
+    if options.in_memory_overviews:
+        tile_store = TileStore(
+            options.tile_store_max_memory * 1024 * 1024, os.path.dirname(conf.src_file)
+        )
+
+    for job in tile_details:
+        for key, tile_data, _ in create_base_tiles(conf, job):
+            if tile_store is not None and tile_data is not None and key[0] > conf.tminz:
+                tile_store.put(key, tile_data)
 
-        if not options.verbose and not options.quiet:
-            base_progress_bar.log_progress()
+            if not options.verbose and not options.quiet:
+                base_progress_bar.log_progress()
 
     if getattr(threadLocal, "cached_ds", None):
         del threadLocal.cached_ds
@@ -4412,10 +5694,24 @@ def single_threaded_tiling(
     for base_tz in range(conf.tmaxz, conf.tminz, -1):
         base_tile_groups = group_overview_base_tiles(base_tz, output_folder, conf)
         for base_tiles in base_tile_groups:
-            create_overview_tile(base_tz, base_tiles, output_folder, conf, options)
+            if tile_store is None:
+                create_overview_tile(base_tz, base_tiles, output_folder, conf, options)
+            else:
+                key, tile_data, _ = create_overview_tile_in_memory(
+                    base_tz,
+                    pop_base_tiles_data(tile_store, base_tz, base_tiles),
+                    output_folder,
+                    conf,
+                    options,
+                )
+                if tile_data is not None and key[0] > conf.tminz:
+                    tile_store.put(key, tile_data)
             if not options.verbose and not options.quiet:
                 overview_progress_bar.log_progress()
 
+    if tile_store is not None:
+        tile_store.close()
+
     shutil.rmtree(os.path.dirname(conf.src_file))
 
 
@@ -4432,18 +5728,34 @@ def multi_threaded_tiling(
     if options.verbose:
         print("Tiles details calc complete.")
 
+    if options.depth_first:
+        quadtree_tiling(conf, tile_details, output_folder, options, pool, nb_processes)
+        shutil.rmtree(os.path.dirname(conf.src_file))
+        return
+
     if not options.verbose and not options.quiet:
-        base_progress_bar = ProgressBar(len(tile_details))
+        base_progress_bar = ProgressBar(
+            sum(1 for _ in iterate_base_tile_details(tile_details))
+        )
         base_progress_bar.start()
 
     # TODO: gbataille - check the confs for which each element is an array... one useless level?
     # TODO: gbataille - assign an ID to each job for print in verbose mode "ReadRaster Extent ..."
+    tile_store = None
+    if options.in_memory_overviews:
+        tile_store = TileStore(
+            options.tile_store_max_memory * 1024 * 1024, os.path.dirname(conf.src_file)
+        )
+
     chunksize = max(1, min(128, len(tile_details) // nb_processes))
-    for _ in pool.imap_unordered(
-        partial(create_base_tile, conf), tile_details, chunksize=chunksize
+    for results in pool.imap_unordered(
+        partial(create_base_tiles, conf), tile_details, chunksize=chunksize
     ):
-        if not options.verbose and not options.quiet:
-            base_progress_bar.log_progress()
+        for key, tile_data, _ in results:
+            if tile_store is not None and tile_data is not None and key[0] > conf.tminz:
+                tile_store.put(key, tile_data)
+            if not options.verbose and not options.quiet:
+                base_progress_bar.log_progress()
 
     if not options.quiet:
         count = count_overview_tiles(conf)
@@ -4457,19 +5769,48 @@ def multi_threaded_tiling(
     for base_tz in range(conf.tmaxz, conf.tminz, -1):
         base_tile_groups = group_overview_base_tiles(base_tz, output_folder, conf)
         chunksize = max(1, min(128, len(base_tile_groups) // nb_processes))
-        for _ in pool.imap_unordered(
-            partial(
-                create_overview_tile,
-                base_tz,
-                output_folder=output_folder,
-                tile_job_info=conf,
-                options=options,
-            ),
-            base_tile_groups,
-            chunksize=chunksize,
-        ):
-            if not options.verbose and not options.quiet:
-                overview_progress_bar.log_progress()
+        if tile_store is None:
+            for _ in pool.imap_unordered(
+                partial(
+                    create_overview_tile,
+                    base_tz,
+                    output_folder=output_folder,
+                    tile_job_info=conf,
+                    options=options,
+                ),
+                base_tile_groups,
+                chunksize=chunksize,
+            ):
+                if not options.verbose and not options.quiet:
+                    overview_progress_bar.log_progress()
+            continue
+
+        # Only take out of the tile store the content needed by a batch of
+        # overview tiles at a time, to keep memory usage bounded
+        batch_size = chunksize * nb_processes * 4
+        for i in range(0, len(base_tile_groups), batch_size):
+            jobs = [
+                pop_base_tiles_data(tile_store, base_tz, base_tiles)
+                for base_tiles in base_tile_groups[i : i + batch_size]
+            ]
+            for key, tile_data, _ in pool.imap_unordered(
+                partial(
+                    create_overview_tile_in_memory,
+                    base_tz,
+                    output_folder=output_folder,
+                    tile_job_info=conf,
+                    options=options,
+                ),
+                jobs,
+                chunksize=chunksize,
+            ):
+                if tile_data is not None and key[0] > conf.tminz:
+                    tile_store.put(key, tile_data)
+                if not options.verbose and not options.quiet:
+                    overview_progress_bar.log_progress()
+
+    if tile_store is not None:
+        tile_store.close()
 
     shutil.rmtree(os.path.dirname(conf.src_file))
 
@@ -4554,6 +5895,9 @@ def submain(argv: List[str], pool=None, pool_size=0) -> int:
             with DividedCache(nb_processes), Pool(processes=nb_processes) as pool:
                 multi_threaded_tiling(input_file, output_folder, options, pool)
 
+        if options.incremental:
+            commit_manifest(output_folder)
+
     return 0
 
 
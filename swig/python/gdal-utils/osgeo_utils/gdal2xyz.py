@@ -32,7 +32,7 @@
 import sys
 import textwrap
 from numbers import Number
-from typing import Optional, Sequence, Tuple, Union
+from typing import Iterator, Optional, Sequence, Tuple, Union
 
 import numpy as np
 
@@ -47,6 +47,190 @@ from osgeo_utils.auxiliary.progress import (
 from osgeo_utils.auxiliary.util import PathOrDS, get_bands, open_ds
 
 
+def _get_nodata(
+    bands: Sequence[gdal.Band],
+    np_dt,
+    src_nodata: Optional[Union[Sequence, Number]],
+    dst_nodata: Optional[Union[Sequence, Number]],
+) -> Tuple[Optional[np.ndarray], Optional[np.ndarray]]:
+    """returns the per band src_nodata and dst_nodata arrays, or None"""
+    band_count = len(bands)
+
+    if isinstance(src_nodata, Number):
+        src_nodata = [src_nodata] * band_count
+    elif src_nodata is None:
+        src_nodata = list(band.GetNoDataValue() for band in bands)
+    if None in src_nodata:
+        src_nodata = None
+    if src_nodata is not None:
+        src_nodata = np.asarray(src_nodata, dtype=np_dt)
+
+    if isinstance(dst_nodata, Number):
+        dst_nodata = [dst_nodata] * band_count
+    if (dst_nodata is None) or (None in dst_nodata) or (src_nodata is None):
+        dst_nodata = None
+    if dst_nodata is not None:
+        dst_nodata = np.asarray(dst_nodata, dtype=np_dt)
+
+    return src_nodata, dst_nodata
+
+
+def _get_indices(
+    ds: gdal.Dataset,
+    srcwin: Optional[Sequence[int]],
+    skip: Union[int, Sequence[int]],
+) -> Tuple[np.ndarray, np.ndarray]:
+    """returns the pixel and line indices of the output points"""
+    if srcwin is None:
+        srcwin = (0, 0, ds.RasterXSize, ds.RasterYSize)
+    if isinstance(skip, Sequence):
+        x_skip, y_skip = skip
+    else:
+        x_skip = y_skip = skip
+
+    x_off, y_off, x_size, y_size = (int(v) for v in srcwin)
+    x_indices = np.arange(x_off, x_off + x_size, x_skip)
+    y_indices = np.arange(y_off, y_off + y_size, y_skip)
+    return x_indices, y_indices
+
+
+def _iter_blocks(
+    bands: Sequence[gdal.Band],
+    np_dt,
+    gt: Sequence[float],
+    x_indices: np.ndarray,
+    y_indices: np.ndarray,
+    skip_nodata: bool,
+    src_nodata: Optional[np.ndarray],
+    dst_nodata: Optional[np.ndarray],
+    block_pixels: int,
+    progress_callback: OptionalProgressCallback,
+) -> Iterator[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+    """
+    yields (geo_x, geo_y, data) for each block of lines, data dims: (bands, points)
+
+    skip_nodata - skip the points for which all the bands are src_nodata,
+        otherwise replace them with dst_nodata, unless it is None.
+    """
+    band_count = len(bands)
+    x_count = len(x_indices)
+    y_count = len(y_indices)
+    if x_count == 0:
+        return
+    x_off = int(x_indices[0])
+    x_size = int(x_indices[-1]) - x_off + 1
+    x_skip = x_indices[1] - x_indices[0] if x_count > 1 else 1
+
+    # geo_x, geo_y of the pixel centers: (gt[0] + x * gt[1] + y * gt[2], ...)
+    pixel_x = x_indices + 0.5
+    geo_x_of_x = gt[0] + pixel_x * gt[1]
+    geo_y_of_x = gt[3] + pixel_x * gt[4]
+
+    # number of lines read and emitted at once
+    block_lines = max(1, block_pixels // x_count)
+
+    for block_start in range(0, y_count, block_lines):
+        lines = y_indices[block_start : block_start + block_lines]
+        line_count = len(lines)
+        consecutive = lines[-1] - lines[0] + 1 == line_count
+
+        data = np.empty((band_count, line_count, x_count), dtype=np_dt)
+        for i_bnd, band in enumerate(bands):
+            if consecutive:
+                band_data = band.ReadAsArray(x_off, int(lines[0]), x_size, line_count)
+            else:
+                band_data = np.concatenate(
+                    [band.ReadAsArray(x_off, int(y), x_size, 1) for y in lines]
+                )
+            data[i_bnd] = band_data[:, ::x_skip]
+        data = data.reshape(band_count, line_count * x_count)
+
+        pixel_y = (lines + 0.5)[:, np.newaxis]
+        geo_x = (geo_x_of_x + pixel_y * gt[2]).ravel()
+        geo_y = (geo_y_of_x + pixel_y * gt[5]).ravel()
+
+        if src_nodata is not None and (skip_nodata or dst_nodata is not None):
+            # a pixel is nodata if all of its selected bands are nodata
+            is_nodata = np.all(data == src_nodata[:, np.newaxis], axis=0)
+            if skip_nodata:
+                is_valid = ~is_nodata
+                geo_x = geo_x[is_valid]
+                geo_y = geo_y[is_valid]
+                data = data[:, is_valid]
+            else:
+                data[:, is_nodata] = dst_nodata[:, np.newaxis]
+
+        yield geo_x, geo_y, data
+
+        if progress_callback:
+            progress_callback((block_start + line_count) / y_count)
+
+
+def gdal2xyz_chunks(
+    srcfile: PathOrDS,
+    srcwin: Optional[Sequence[int]] = None,
+    skip: Union[int, Sequence[int]] = 1,
+    band_nums: Optional[Sequence[int]] = None,
+    skip_nodata: bool = True,
+    src_nodata: Optional[Union[Sequence, Number]] = None,
+    dst_nodata: Optional[Union[Sequence, Number]] = None,
+    chunk_size: int = 65536,
+    progress_callback: OptionalProgressCallback = None,
+) -> Iterator[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+    """
+    translates a raster file (or dataset) into chunks of xyz numpy arrays
+
+    yields (geo_x, geo_y, data) tuples of chunk_size points (the last one may be smaller),
+    in the order of gdal2xyz, where data dims are: (bands, points).
+    Only one chunk at a time is held in memory.
+
+    chunk_size - the number of points of each chunk
+    skip_nodata - Exclude the points with nodata value (as determined by srcnodata)
+    the other arguments are as in gdal2xyz
+    """
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be positive")
+
+    progress_callback = get_progress_callback(progress_callback)
+
+    # Open source file.
+    ds = open_ds(srcfile)
+    if ds is None:
+        raise Exception(f"Could not open {srcfile}.")
+
+    bands = get_bands(ds, band_nums)
+    _dt, np_dt = GDALTypeCodeAndNumericTypeCodeFromDataSet(ds)
+    src_nodata, dst_nodata = _get_nodata(bands, np_dt, src_nodata, dst_nodata)
+    x_indices, y_indices = _get_indices(ds, srcwin, skip)
+
+    blocks = _iter_blocks(
+        bands,
+        np_dt,
+        ds.GetGeoTransform(),
+        x_indices,
+        y_indices,
+        skip_nodata,
+        src_nodata,
+        dst_nodata,
+        chunk_size,
+        progress_callback,
+    )
+
+    # regroup the blocks, whose sizes vary, into chunks of chunk_size points
+    pending = []
+    pending_count = 0
+    for block in blocks:
+        pending.append(block)
+        pending_count += len(block[0])
+        while pending_count >= chunk_size:
+            geo_x, geo_y, data = (np.concatenate(a, axis=-1) for a in zip(*pending))
+            yield geo_x[:chunk_size], geo_y[:chunk_size], data[:, :chunk_size]
+            pending = [(geo_x[chunk_size:], geo_y[chunk_size:], data[:, chunk_size:])]
+            pending_count -= chunk_size
+    if pending_count:
+        yield tuple(np.concatenate(a, axis=-1) for a in zip(*pending))
+
+
 def gdal2xyz(
     srcfile: PathOrDS,
     dstfile: PathLikeOrStr = None,
@@ -60,6 +244,7 @@ def gdal2xyz(
     return_np_arrays: bool = False,
     pre_allocate_np_arrays: bool = True,
     progress_callback: OptionalProgressCallback = ...,
+    block_pixels: int = 65536,
 ) -> Optional[Tuple]:
     """
     translates a raster file (or dataset) into xyz format
@@ -78,9 +263,11 @@ def gdal2xyz(
     srcfile - The source dataset filename or dataset object
     dstfile - The output dataset filename; for dstfile=None - if return_np_arrays=False then output will be printed to stdout
     return_np_arrays - return numpy arrays of the result, otherwise returns None
+        (see gdal2xyz_chunks for getting the arrays chunk by chunk)
     pre_allocate_np_arrays - pre-allocated result arrays.
-        Should be faster unless skip_nodata and the input is very sparse thus most data points will be skipped.
+        Should use less memory unless skip_nodata and the input is very sparse thus most data points will be skipped.
     progress_callback - progress callback function. use None for quiet or Ellipsis for using the default callback
+    block_pixels - approximate number of output points read, converted and written at once
     """
 
     result = None
@@ -97,10 +284,6 @@ def gdal2xyz(
 
     gt = ds.GetGeoTransform()
 
-    # Collect information on all the source files.
-    if srcwin is None:
-        srcwin = (0, 0, ds.RasterXSize, ds.RasterYSize)
-
     dt, np_dt = GDALTypeCodeAndNumericTypeCodeFromDataSet(ds)
 
     # Open the output file.
@@ -127,105 +310,74 @@ def gdal2xyz(
             frmt = "%.10g" + delim + "%.10g" + delim + "%s"
         else:
             frmt = "%.3f" + delim + "%.3f" + delim + "%s"
+        line_format = frmt.replace("%s", band_format)
 
-    if isinstance(src_nodata, Number):
-        src_nodata = [src_nodata] * band_count
-    elif src_nodata is None:
-        src_nodata = list(band.GetNoDataValue() for band in bands)
-    if None in src_nodata:
-        src_nodata = None
-    if src_nodata is not None:
-        src_nodata = np.asarray(src_nodata, dtype=np_dt)
-
-    if isinstance(dst_nodata, Number):
-        dst_nodata = [dst_nodata] * band_count
-    if (dst_nodata is None) or (None in dst_nodata) or (src_nodata is None):
-        dst_nodata = None
-    if dst_nodata is not None:
-        dst_nodata = np.asarray(dst_nodata, dtype=np_dt)
+    src_nodata, dst_nodata = _get_nodata(bands, np_dt, src_nodata, dst_nodata)
 
     skip_nodata = skip_nodata and (src_nodata is not None)
     replace_nodata = (not skip_nodata) and (dst_nodata is not None)
-    process_nodata = skip_nodata or replace_nodata
-
-    if isinstance(skip, Sequence):
-        x_skip, y_skip = skip
-    else:
-        x_skip = y_skip = skip
-
-    x_off, y_off, x_size, y_size = srcwin
-    bands_count = len(bands)
 
-    nXBlocks = (x_size - x_off) // x_skip
-    nYBlocks = (y_size - y_off) // y_skip
-    progress_end = nXBlocks * nYBlocks
-    progress_curr = 0
-    progress_prev = -1
-    progress_parts = 100
+    x_indices, y_indices = _get_indices(ds, srcwin, skip)
 
     if return_np_arrays:
-        size = progress_end if pre_allocate_np_arrays else 0
-        all_geo_x = np.empty(size)
-        all_geo_y = np.empty(size)
-        all_data = np.empty((size, band_count), dtype=np_dt)
+        if pre_allocate_np_arrays:
+            size = len(x_indices) * len(y_indices)
+            all_geo_x = np.empty(size)
+            all_geo_y = np.empty(size)
+            all_data = np.empty((band_count, size), dtype=np_dt)
+        else:
+            all_geo_x = []
+            all_geo_y = []
+            all_data = []
 
-    # Loop emitting data.
+    # Loop emitting data, one block of lines at a time.
     idx = 0
-    for y in range(y_off, y_off + y_size, y_skip):
-
-        size = bands_count if pre_allocate_np_arrays else 0
-        data = np.empty((size, x_size), dtype=np_dt)  # dims: (bands_count, x_size)
-        for i_bnd, band in enumerate(bands):
-            band_data = band.ReadAsArray(x_off, y, x_size, 1)  # read one band line
+    for geo_x, geo_y, data in _iter_blocks(
+        bands,
+        np_dt,
+        gt,
+        x_indices,
+        y_indices,
+        skip_nodata,
+        src_nodata,
+        dst_nodata,
+        block_pixels,
+        progress_callback,
+    ):
+        count = len(geo_x)
+        if dst_fh and count:
+            values = np.empty((count, 2 + band_count))
+            values[:, 0] = geo_x
+            values[:, 1] = geo_y
+            values[:, 2:] = data.transpose()
+            dst_fh.write((line_format * count) % tuple(values.ravel().tolist()))
+        if return_np_arrays:
             if pre_allocate_np_arrays:
-                data[i_bnd] = band_data[0]
+                all_geo_x[idx : idx + count] = geo_x
+                all_geo_y[idx : idx + count] = geo_y
+                all_data[:, idx : idx + count] = data
             else:
-                data = np.append(data, band_data, axis=0)
-
-        for x_i in range(0, x_size, x_skip):
-
-            progress_curr += 1
-            if progress_callback:
-                progress_frac = progress_curr / progress_end
-                progress = int(progress_frac * progress_parts)
-                if progress > progress_prev:
-                    progress_prev = progress
-                    progress_callback(progress_frac)
-
-            x_i_data = data[:, x_i]  # single pixel, dims: (bands)
-            if process_nodata and np.array_equal(src_nodata, x_i_data):
-                if skip_nodata:
-                    continue
-                elif replace_nodata:
-                    x_i_data = dst_nodata
-
-            x = x_i + x_off
-
-            geo_x = gt[0] + (x + 0.5) * gt[1] + (y + 0.5) * gt[2]
-            geo_y = gt[3] + (x + 0.5) * gt[4] + (y + 0.5) * gt[5]
-
-            if dst_fh:
-                band_str = band_format % tuple(x_i_data)
-                line = frmt % (float(geo_x), float(geo_y), band_str)
-                dst_fh.write(line)
-            if return_np_arrays:
-                if pre_allocate_np_arrays:
-                    all_geo_x[idx] = geo_x
-                    all_geo_y[idx] = geo_y
-                    all_data[idx] = x_i_data
-                else:
-                    all_geo_x = np.append(all_geo_x, geo_x)
-                    all_geo_y = np.append(all_geo_y, geo_y)
-                    all_data = np.append(all_data, [x_i_data], axis=0)
-            idx += 1
+                all_geo_x.append(geo_x)
+                all_geo_y.append(geo_y)
+                all_data.append(data)
+        idx += count
+
+    if dstfile is not None:
+        dst_fh.close()
 
     if return_np_arrays:
         nodata = None if skip_nodata else dst_nodata if replace_nodata else src_nodata
-        if idx != progress_curr:
+        if pre_allocate_np_arrays:
             all_geo_x = all_geo_x[:idx]
             all_geo_y = all_geo_y[:idx]
-            all_data = all_data[:idx, :]
-        result = all_geo_x, all_geo_y, all_data.transpose(), nodata
+            all_data = all_data[:, :idx]
+        else:
+            all_geo_x = np.concatenate(all_geo_x or [np.empty(0)])
+            all_geo_y = np.concatenate(all_geo_y or [np.empty(0)])
+            all_data = np.concatenate(
+                all_data or [np.empty((band_count, 0), dtype=np_dt)], axis=1
+            )
+        result = all_geo_x, all_geo_y, all_data, nodata
 
     return result
 
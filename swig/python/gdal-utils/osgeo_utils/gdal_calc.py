@@ -32,12 +32,16 @@
 # ******************************************************************************
 
 import argparse
+import ast
 import glob
+import math
 import os
 import os.path
 import string
 import sys
 import textwrap
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from numbers import Number
 from typing import Dict, Optional, Sequence, Tuple, Union
 
@@ -52,6 +56,11 @@ from osgeo_utils.auxiliary.gdal_argparse import GDALArgumentParser, GDALScript
 from osgeo_utils.auxiliary.rectangle import GeoRectangle
 from osgeo_utils.auxiliary.util import GetOutputDriverFor, open_ds
 
+try:
+    import numexpr
+except ImportError:
+    numexpr = None
+
 GDALDataType = int
 
 # create alphabetic list (lowercase + uppercase) for storing input layers
@@ -78,6 +87,182 @@ DefaultNDVLookup = {
 # tuple of available output datatypes names
 GDALDataTypeNames = tuple(gdal.GetDataTypeName(dt) for dt in DefaultNDVLookup.keys())
 
+# tuple of the evaluation engines of the calculations
+CalcEngines = ("numpy", "numexpr")
+
+# functions of numpy also supported by numexpr
+NumexprFunctions = (
+    "where",
+    "sin",
+    "cos",
+    "tan",
+    "arcsin",
+    "arccos",
+    "arctan",
+    "arctan2",
+    "sinh",
+    "cosh",
+    "tanh",
+    "arcsinh",
+    "arccosh",
+    "arctanh",
+    "log",
+    "log10",
+    "log1p",
+    "exp",
+    "expm1",
+    "sqrt",
+    "abs",
+)
+
+# AST nodes of the expressions that numexpr can evaluate
+NumexprNodes = (
+    ast.Expression,
+    ast.BinOp,
+    ast.UnaryOp,
+    ast.Compare,
+    ast.Name,
+    ast.Load,
+    ast.Constant,
+    ast.Call,
+    ast.Add,
+    ast.Sub,
+    ast.Mult,
+    ast.Div,
+    ast.Pow,
+    ast.Mod,
+    ast.BitAnd,
+    ast.BitOr,
+    ast.Invert,
+    ast.USub,
+    ast.UAdd,
+    ast.Eq,
+    ast.NotEq,
+    ast.Lt,
+    ast.LtE,
+    ast.Gt,
+    ast.GtE,
+)
+
+
+class CompiledCalc:
+    """
+    Calculation parsed and compiled once, and evaluated on each block.
+
+    With the numexpr engine, calculations made only of arithmetic, comparisons
+    and elementwise functions of the input arrays are evaluated by numexpr,
+    which avoids the numpy temporary arrays. Other calculations are evaluated
+    with numpy.
+    """
+
+    def __init__(self, calc: str, engine: str = "numpy", alphas: Sequence[str] = ()):
+        self.calc = calc
+        try:
+            tree = ast.parse(calc.strip(), mode="eval")
+        except SyntaxError:
+            print(f"evaluation of calculation {calc} failed")
+            raise
+        self.code = compile(tree, "<calc>", "eval")
+        self.use_numexpr = engine == "numexpr" and self.is_numexpr_compatible(
+            tree, alphas
+        )
+
+    @staticmethod
+    def is_numexpr_compatible(tree: ast.AST, alphas: Sequence[str]) -> bool:
+        if not any(
+            isinstance(node, ast.Name) and node.id in alphas for node in ast.walk(tree)
+        ):
+            return False
+        for node in ast.walk(tree):
+            if not isinstance(node, NumexprNodes):
+                return False
+            if isinstance(node, ast.Constant) and not isinstance(
+                node.value, (int, float)
+            ):
+                return False
+            if isinstance(node, ast.Call) and (
+                not isinstance(node.func, ast.Name)
+                or node.func.id not in NumexprFunctions
+                or node.keywords
+            ):
+                return False
+            if (
+                isinstance(node, ast.Name)
+                and node.id not in alphas
+                and node.id not in NumexprFunctions
+            ):
+                return False
+        return True
+
+    def evaluate(self, global_namespace: Dict, local_namespace: Dict):
+        try:
+            if self.use_numexpr:
+                return numexpr.evaluate(
+                    self.calc, local_dict=local_namespace, global_dict={}
+                )
+            return eval(self.code, global_namespace, local_namespace)
+        except Exception:
+            print(f"evaluation of calculation {self.calc} failed")
+            raise
+
+
+def set_nodata(
+    array: numpy.ndarray, mask: numpy.ndarray, nodata: Number
+) -> numpy.ndarray:
+    """
+    Set the cells of the array where mask is True to the nodata value, in place
+    if the data type of the array can hold this value, and otherwise in a copy
+    promoted to a data type that can hold it
+    """
+    dtype = array.dtype
+    is_integer = not math.isnan(nodata) and float(nodata).is_integer()
+    if dtype.kind in "iu":
+        info = numpy.iinfo(dtype)
+        fits = is_integer and info.min <= nodata <= info.max
+    elif dtype.kind == "b":
+        fits = nodata in (0, 1)
+    elif dtype.kind == "f":
+        fits = not math.isfinite(nodata) or (
+            abs(nodata) <= float(numpy.finfo(dtype).max)
+            and float(dtype.type(nodata)) == float(nodata)
+        )
+    else:
+        fits = True
+    if not fits:
+        if is_integer and dtype.kind in "iub":
+            nodata = int(nodata)
+            array = array.astype(
+                numpy.promote_types(dtype, numpy.min_scalar_type(nodata))
+            )
+        else:
+            array = array.astype(numpy.float64)
+    elif not array.flags.writeable:
+        array = array.copy()
+    numpy.putmask(array, mask, nodata)
+    return array
+
+
+def get_chunk_size(
+    block_size: Sequence[int], dimensions: Sequence[int], chunk_size: float
+) -> Tuple[int, int]:
+    """
+    Return the size of the chunks processed at once: whole blocks of the input,
+    of about chunk_size megapixels, grown along the lines first
+    """
+    target = max(1, int(chunk_size * 1000000))
+    block_xsize, block_ysize = block_size
+    xsize, ysize = dimensions
+    nx = max(
+        1, min(target // (block_xsize * block_ysize), math.ceil(xsize / block_xsize))
+    )
+    chunk_xsize = min(block_xsize * nx, xsize)
+    ny = max(
+        1, min(target // (chunk_xsize * block_ysize), math.ceil(ysize / block_ysize))
+    )
+    chunk_ysize = min(block_ysize * ny, ysize)
+    return chunk_xsize, chunk_ysize
+
+
 """ Perform raster calculations with numpy syntax.
 Use any basic arithmetic supported by numpy arrays such as +-* along with logical
 operators such as >. Note that all files must have the same dimensions, but no projection checking is performed.
@@ -121,6 +306,10 @@ def Calc(
     user_namespace: Optional[Dict] = None,
     debug: bool = False,
     quiet: bool = False,
+    chunk_size: Optional[float] = None,
+    engine: str = "numpy",
+    threads: Optional[int] = None,
+    masked: bool = False,
     **input_files,
 ):
 
@@ -153,6 +342,13 @@ def Calc(
     if user_namespace:
         global_namespace.update(user_namespace)
 
+    if engine not in CalcEngines:
+        raise Exception(f"Unknown engine {engine}, must be one of {CalcEngines}")
+    if engine == "numexpr" and numexpr is None:
+        raise Exception("The numexpr engine requires the numexpr module")
+    if engine == "numexpr" and masked:
+        raise Exception("The numexpr engine does not support masked arrays")
+
     if not calc:
         raise Exception("No calculation provided.")
     elif not outfile and format.upper() != "MEM":
@@ -479,10 +675,11 @@ def Calc(
 
     # use the block size of the first layer to read efficiently
     myBlockSize = myFiles[0].GetRasterBand(myBands[0]).GetBlockSize()
+    if chunk_size:
+        myBlockSize = get_chunk_size(myBlockSize, DimensionsCheck, chunk_size)
     # find total x and y blocks to be read
     nXBlocks = (int)((DimensionsCheck[0] + myBlockSize[0] - 1) / myBlockSize[0])
     nYBlocks = (int)((DimensionsCheck[1] + myBlockSize[1] - 1) / myBlockSize[1])
-    myBufSize = myBlockSize[0] * myBlockSize[1]
 
     if debug:
         print(f"using blocksize {myBlockSize[0]} x {myBlockSize[1]}")
@@ -492,168 +689,242 @@ def Calc(
     ProgressMk = -1
     ProgressEnd = nXBlocks * nYBlocks * allBandsCount
 
+    # parse and compile the calculations once
+    compiled_calc = [CompiledCalc(c, engine, myAlphaList) for c in calc]
+    if debug:
+        for c in compiled_calc:
+            if c.use_numexpr:
+                print(f"calculation {c.calc} evaluated with numexpr")
+
+    def compute_block(this_calc, local_namespace, myNDVs, nXValid, nYValid):
+        myResult = this_calc.evaluate(global_namespace, local_namespace)
+
+        # With masked arrays, the calculation decides which cells are nodata
+        if isinstance(myResult, numpy.ma.MaskedArray):
+            myNDVs = numpy.ma.getmaskarray(myResult)
+            myResult = myResult.data
+
+        if not isinstance(myResult, numpy.ndarray):
+            myResult = numpy.full((nYValid, nXValid), myResult)
+
+        # Propagate nodata values, keeping the data type of the result
+        # unless it cannot hold the output nodata value
+        if myNDVs is not None and myOutNDV is not None and myNDVs.any():
+            myResult = set_nodata(myResult, myNDVs, myOutNDV)
+        return myResult
+
+    def write_block(bandNo, myX, myY, myResult):
+        myOutB = myOut.GetRasterBand(bandNo)
+        if gdal_array.BandWriteArray(myOutB, myResult, xoff=myX, yoff=myY) != 0:
+            raise Exception("Block writing failed")
+        myOutB = None  # write to band
+
+    # with several threads, blocks are read and written in order by this
+    # thread, while they are computed by the pool
+    executor = None
+    pending_blocks = deque()
+    if threads and threads > 1:
+        executor = ThreadPoolExecutor(max_workers=threads)
+        if debug:
+            print(f"computing blocks with {threads} threads")
+
+    def write_pending_block():
+        bandNo, myX, myY, future = pending_blocks.popleft()
+        write_block(bandNo, myX, myY, future.result())
+
     ################################################################
     # start looping through each band in allBandsCount
     ################################################################
 
-    for bandNo in range(1, allBandsCount + 1):
-
-        ################################################################
-        # start looping through blocks of data
-        ################################################################
-
-        # store these numbers in variables that may change later
-        nXValid = myBlockSize[0]
-        nYValid = myBlockSize[1]
-
-        count_file_per_alpha = {}
-        largest_datatype_per_alpha = {}
-        for i, Alpha in enumerate(myAlphaList):
-            if Alpha in myAlphaFileLists:
-                # populate lettered arrays with values
-                if allBandsIndex is not None and allBandsIndex == i:
-                    myBandNo = bandNo
-                else:
-                    myBandNo = myBands[i]
-                band = myFiles[i].GetRasterBand(myBandNo)
-                if Alpha not in count_file_per_alpha:
-                    count_file_per_alpha[Alpha] = 1
-                    largest_datatype_per_alpha[Alpha] = band.DataType
-                else:
-                    count_file_per_alpha[Alpha] += 1
-                    if hasattr(gdal, "DataTypeUnion"):
-                        largest_datatype_per_alpha[Alpha] = gdal.DataTypeUnion(
-                            largest_datatype_per_alpha[Alpha], band.DataType
-                        )
-
-        # loop through X-lines
-        for X in range(0, nXBlocks):
-
-            # in case the blocks don't fit perfectly
-            # change the block size of the final piece
-            if X == nXBlocks - 1:
-                nXValid = DimensionsCheck[0] - X * myBlockSize[0]
+    try:
+        for bandNo in range(1, allBandsCount + 1):
 
-            # find X offset
-            myX = X * myBlockSize[0]
+            ################################################################
+            # start looping through blocks of data
+            ################################################################
 
-            # reset buffer size for start of Y loop
+            # store these numbers in variables that may change later
+            nXValid = myBlockSize[0]
             nYValid = myBlockSize[1]
-            myBufSize = nXValid * nYValid
-
-            # loop through Y lines
-            for Y in range(0, nYBlocks):
-                ProgressCt += 1
-                if 10 * ProgressCt / ProgressEnd % 10 != ProgressMk and not quiet:
-                    ProgressMk = 10 * ProgressCt / ProgressEnd % 10
-                    print("%d.." % (10 * ProgressMk), end=" ")
-
-                # change the block size of the final piece
-                if Y == nYBlocks - 1:
-                    nYValid = DimensionsCheck[1] - Y * myBlockSize[1]
-                    myBufSize = nXValid * nYValid
-
-                # find Y offset
-                myY = Y * myBlockSize[1]
-
-                # create empty buffer to mark where nodata occurs
-                myNDVs = None
-
-                # make local namespace for calculation
-                local_namespace = {}
-
-                # Create destination numpy arrays for each alpha
-                numpy_arrays = {}
-                counter_per_alpha = {}
-                for Alpha in count_file_per_alpha:
-                    dtype = gdal_array.GDALTypeCodeToNumericTypeCode(
-                        largest_datatype_per_alpha[Alpha]
-                    )
-                    if count_file_per_alpha[Alpha] == 1:
-                        numpy_arrays[Alpha] = numpy.empty(
-                            (nYValid, nXValid), dtype=dtype
-                        )
-                    else:
-                        numpy_arrays[Alpha] = numpy.empty(
-                            (count_file_per_alpha[Alpha], nYValid, nXValid), dtype=dtype
-                        )
-                    counter_per_alpha[Alpha] = 0
-
-                # fetch data for each input layer
-                for i, Alpha in enumerate(myAlphaList):
 
+            count_file_per_alpha = {}
+            largest_datatype_per_alpha = {}
+            for i, Alpha in enumerate(myAlphaList):
+                if Alpha in myAlphaFileLists:
                     # populate lettered arrays with values
                     if allBandsIndex is not None and allBandsIndex == i:
                         myBandNo = bandNo
                     else:
                         myBandNo = myBands[i]
+                    band = myFiles[i].GetRasterBand(myBandNo)
+                    if Alpha not in count_file_per_alpha:
+                        count_file_per_alpha[Alpha] = 1
+                        largest_datatype_per_alpha[Alpha] = band.DataType
+                    else:
+                        count_file_per_alpha[Alpha] += 1
+                        if hasattr(gdal, "DataTypeUnion"):
+                            largest_datatype_per_alpha[Alpha] = gdal.DataTypeUnion(
+                                largest_datatype_per_alpha[Alpha], band.DataType
+                            )
 
-                    if Alpha in myAlphaFileLists:
+            # loop through X-lines
+            for X in range(0, nXBlocks):
+
+                # in case the blocks don't fit perfectly
+                # change the block size of the final piece
+                if X == nXBlocks - 1:
+                    nXValid = DimensionsCheck[0] - X * myBlockSize[0]
+
+                # find X offset
+                myX = X * myBlockSize[0]
+
+                # reset buffer size for start of Y loop
+                nYValid = myBlockSize[1]
+
+                # loop through Y lines
+                for Y in range(0, nYBlocks):
+                    ProgressCt += 1
+                    if 10 * ProgressCt / ProgressEnd % 10 != ProgressMk and not quiet:
+                        ProgressMk = 10 * ProgressCt / ProgressEnd % 10
+                        print("%d.." % (10 * ProgressMk), end=" ")
+
+                    # change the block size of the final piece
+                    if Y == nYBlocks - 1:
+                        nYValid = DimensionsCheck[1] - Y * myBlockSize[1]
+
+                    # find Y offset
+                    myY = Y * myBlockSize[1]
+
+                    # boolean buffer to mark where nodata occurs
+                    myNDVs = None
+
+                    # make local namespace for calculation
+                    local_namespace = {}
+
+                    # Create destination numpy arrays for each alpha
+                    numpy_arrays = {}
+                    numpy_masks = {}
+                    counter_per_alpha = {}
+                    for Alpha in count_file_per_alpha:
+                        dtype = gdal_array.GDALTypeCodeToNumericTypeCode(
+                            largest_datatype_per_alpha[Alpha]
+                        )
                         if count_file_per_alpha[Alpha] == 1:
-                            buf_obj = numpy_arrays[Alpha]
+                            shape = (nYValid, nXValid)
+                        else:
+                            shape = (count_file_per_alpha[Alpha], nYValid, nXValid)
+                        numpy_arrays[Alpha] = numpy.empty(shape, dtype=dtype)
+                        if masked:
+                            numpy_masks[Alpha] = numpy.zeros(shape, dtype=bool)
+                        counter_per_alpha[Alpha] = 0
+
+                    # fetch data for each input layer
+                    for i, Alpha in enumerate(myAlphaList):
+
+                        # populate lettered arrays with values
+                        if allBandsIndex is not None and allBandsIndex == i:
+                            myBandNo = bandNo
+                        else:
+                            myBandNo = myBands[i]
+
+                        myMask = None
+                        if Alpha in myAlphaFileLists:
+                            if count_file_per_alpha[Alpha] == 1:
+                                buf_obj = numpy_arrays[Alpha]
+                                if masked:
+                                    myMask = numpy_masks[Alpha]
+                            else:
+                                buf_obj = numpy_arrays[Alpha][counter_per_alpha[Alpha]]
+                                if masked:
+                                    myMask = numpy_masks[Alpha][
+                                        counter_per_alpha[Alpha]
+                                    ]
+                            myval = gdal_array.BandReadAsArray(
+                                myFiles[i].GetRasterBand(myBandNo),
+                                xoff=myX,
+                                yoff=myY,
+                                win_xsize=nXValid,
+                                win_ysize=nYValid,
+                                buf_obj=buf_obj,
+                            )
+                            counter_per_alpha[Alpha] += 1
+                        else:
+                            myval = gdal_array.BandReadAsArray(
+                                myFiles[i].GetRasterBand(myBandNo),
+                                xoff=myX,
+                                yoff=myY,
+                                win_xsize=nXValid,
+                                win_ysize=nYValid,
+                            )
+                        if myval is None:
+                            raise Exception(
+                                f"Input block reading failed from filename {filename[i]}"
+                            )
+
+                        # fill in nodata values
+                        if myNDV[i] is not None:
+                            # myNDVs is a boolean buffer.
+                            # a cell is True if there is NDV in any of the corresponding cells in input raster bands.
+                            isNDV = myval == myNDV[i]
+                            if myNDVs is None:
+                                # this is the first band that has NDV set
+                                myNDVs = isNDV.copy() if masked else isNDV
+                            else:
+                                numpy.logical_or(myNDVs, isNDV, out=myNDVs)
+                            if myMask is not None:
+                                myMask[...] = isNDV
+                            elif masked:
+                                myMask = isNDV
+
+                        # add an array of values for this block to the eval namespace
+                        if Alpha not in myAlphaFileLists:
+                            if masked:
+                                local_namespace[Alpha] = numpy.ma.MaskedArray(
+                                    myval,
+                                    mask=numpy.ma.nomask if myMask is None else myMask,
+                                )
+                            else:
+                                local_namespace[Alpha] = myval
+                        myval = None
+
+                    for lst in myAlphaFileLists:
+                        if masked:
+                            local_namespace[lst] = numpy.ma.MaskedArray(
+                                numpy_arrays[lst], mask=numpy_masks[lst]
+                            )
                         else:
-                            buf_obj = numpy_arrays[Alpha][counter_per_alpha[Alpha]]
-                        myval = gdal_array.BandReadAsArray(
-                            myFiles[i].GetRasterBand(myBandNo),
-                            xoff=myX,
-                            yoff=myY,
-                            win_xsize=nXValid,
-                            win_ysize=nYValid,
-                            buf_obj=buf_obj,
+                            local_namespace[lst] = numpy_arrays[lst]
+
+                    # try the calculation on the array blocks
+                    # and write data block to the output file
+                    this_calc = compiled_calc[bandNo - 1 if len(calc) > 1 else 0]
+                    if executor is None:
+                        myResult = compute_block(
+                            this_calc, local_namespace, myNDVs, nXValid, nYValid
                         )
-                        counter_per_alpha[Alpha] += 1
+                        write_block(bandNo, myX, myY, myResult)
                     else:
-                        myval = gdal_array.BandReadAsArray(
-                            myFiles[i].GetRasterBand(myBandNo),
-                            xoff=myX,
-                            yoff=myY,
-                            win_xsize=nXValid,
-                            win_ysize=nYValid,
+                        future = executor.submit(
+                            compute_block,
+                            this_calc,
+                            local_namespace,
+                            myNDVs,
+                            nXValid,
+                            nYValid,
                         )
-                    if myval is None:
-                        raise Exception(
-                            f"Input block reading failed from filename {filename[i]}"
-                        )
-
-                    # fill in nodata values
-                    if myNDV[i] is not None:
-                        # myNDVs is a boolean buffer.
-                        # a cell equals to 1 if there is NDV in any of the corresponding cells in input raster bands.
-                        if myNDVs is None:
-                            # this is the first band that has NDV set. we initializes myNDVs to a zero buffer
-                            # as we didn't see any NDV value yet.
-                            myNDVs = numpy.zeros(myBufSize)
-                            myNDVs.shape = (nYValid, nXValid)
-                        myNDVs = 1 * numpy.logical_or(myNDVs == 1, myval == myNDV[i])
-
-                    # add an array of values for this block to the eval namespace
-                    if Alpha not in myAlphaFileLists:
-                        local_namespace[Alpha] = myval
-                    myval = None
-
-                for lst in myAlphaFileLists:
-                    local_namespace[lst] = numpy_arrays[lst]
-
-                # try the calculation on the array blocks
-                this_calc = calc[bandNo - 1 if len(calc) > 1 else 0]
-                try:
-                    myResult = eval(this_calc, global_namespace, local_namespace)
-                except Exception:
-                    print(f"evaluation of calculation {this_calc} failed")
-                    raise
-
-                # Propagate nodata values (set nodata cells to zero
-                # then add nodata value to these cells).
-                if myNDVs is not None and myOutNDV is not None:
-                    myResult = ((1 * (myNDVs == 0)) * myResult) + (myOutNDV * myNDVs)
-                elif not isinstance(myResult, numpy.ndarray):
-                    myResult = numpy.ones((nYValid, nXValid)) * myResult
-
-                # write data block to the output file
-                myOutB = myOut.GetRasterBand(bandNo)
-                if gdal_array.BandWriteArray(myOutB, myResult, xoff=myX, yoff=myY) != 0:
-                    raise Exception("Block writing failed")
-                myOutB = None  # write to band
+                        pending_blocks.append((bandNo, myX, myY, future))
+                        # bound the number of blocks in memory
+                        while len(pending_blocks) > 2 * threads:
+                            write_pending_block()
+
+        while pending_blocks:
+            write_pending_block()
+    finally:
+        if executor is not None:
+            # on error, do not compute the blocks still queued
+            for _, _, _, future in pending_blocks:
+                future.cancel()
+            executor.shutdown(wait=True)
 
     # remove temp files
     for idx, tempFile in enumerate(myTempFileNames):
@@ -849,6 +1120,41 @@ class GDALCalc(GDALScript):
             "--color-table", type=str, dest="color_table", help="color table file name"
         )
 
+        parser.add_argument(
+            "--chunk-size",
+            dest="chunk_size",
+            type=float,
+            metavar="megapixels",
+            help="process the rasters by chunks of about this number of megapixels, "
+            "made of whole blocks of the first input (default: one block)",
+        )
+
+        parser.add_argument(
+            "--masked",
+            dest="masked",
+            action="store_true",
+            help="pass the inputs to the calculation as numpy masked arrays, "
+            "whose nodata values are masked. The cells masked in the result "
+            "are set to the output nodata value",
+        )
+
+        parser.add_argument(
+            "--threads",
+            dest="threads",
+            type=int,
+            metavar="n",
+            help="number of threads computing the blocks (default: 1)",
+        )
+
+        parser.add_argument(
+            "--engine",
+            dest="engine",
+            choices=CalcEngines,
+            default="numpy",
+            help="engine evaluating the calculations. numexpr avoids the temporary "
+            "arrays of numpy for calculations it supports (default: numpy)",
+        )
+
         group = parser.add_mutually_exclusive_group()
         group.add_argument(
             "--extent",
@@ -33,12 +33,19 @@
 import math
 import sys
 import time
+from collections import OrderedDict
 
 from osgeo import gdal
+from osgeo_utils.auxiliary.rtree import RTree
 from osgeo_utils.auxiliary.util import GetOutputDriverFor
 
 progress = gdal.TermProgress_nocb
 
+# approximate number of pixels of the windows of blocks of -blocks
+MERGE_WINDOW_MAX_PIXELS = 1024 * 1024
+# maximum number of source files kept open with -blocks
+MERGE_MAX_OPEN_DATASETS = 64
+
 __version__ = "$id$"[5:-1]
 
 
@@ -292,6 +299,48 @@ class file_info(object):
         Returns 1 on success (or if nothing needs to be copied), and zero one
         failure.
         """
+        windows = self.get_copy_windows(t_fh)
+        if windows is None:
+            return 1
+        (sw_xoff, sw_yoff, sw_xsize, sw_ysize), (
+            tw_xoff,
+            tw_yoff,
+            tw_xsize,
+            tw_ysize,
+        ) = windows
+
+        # Open the source file, and copy the selected region.
+        s_fh = gdal.Open(self.filename)
+
+        return raster_copy(
+            s_fh,
+            sw_xoff,
+            sw_yoff,
+            sw_xsize,
+            sw_ysize,
+            s_band,
+            t_fh,
+            tw_xoff,
+            tw_yoff,
+            tw_xsize,
+            tw_ysize,
+            t_band,
+            nodata_arg,
+            verbose,
+        )
+
+    def get_copy_windows(self, t_fh):
+        """
+        Compute the windows of this file and of the target file where this file
+        is copied.
+
+        t_fh -- gdal.Dataset object for the file into which some or all
+        of this file may be copied.
+
+        Returns a (source window, target window) pair of (xoff, yoff, xsize,
+        ysize) tuples in pixel coordinates, or None if nothing needs to be
+        copied.
+        """
         t_geotransform = t_fh.GetGeoTransform()
         t_ulx = t_geotransform[0]
         t_uly = t_geotransform[3]
@@ -310,11 +359,11 @@ class file_info(object):
 
         # do they even intersect?
         if tgw_ulx >= tgw_lrx:
-            return 1
+            return None
         if t_geotransform[5] < 0 and tgw_uly <= tgw_lry:
-            return 1
+            return None
         if t_geotransform[5] > 0 and tgw_uly >= tgw_lry:
-            return 1
+            return None
 
         # compute target window in pixel coordinates.
         tw_xoff = int((tgw_ulx - t_geotransform[0]) / t_geotransform[1] + 0.1)
@@ -327,7 +376,7 @@ class file_info(object):
         )
 
         if tw_xsize < 1 or tw_ysize < 1:
-            return 1
+            return None
 
         # Compute source window in pixel coordinates.
         sw_xoff = int((tgw_ulx - self.geotransform[0]) / self.geotransform[1] + 0.1)
@@ -340,29 +389,182 @@ class file_info(object):
         )
 
         if sw_xsize < 1 or sw_ysize < 1:
-            return 1
+            return None
 
-        # Open the source file, and copy the selected region.
-        s_fh = gdal.Open(self.filename)
-
-        return raster_copy(
-            s_fh,
-            sw_xoff,
-            sw_yoff,
-            sw_xsize,
-            sw_ysize,
-            s_band,
-            t_fh,
+        return (sw_xoff, sw_yoff, sw_xsize, sw_ysize), (
             tw_xoff,
             tw_yoff,
             tw_xsize,
             tw_ysize,
-            t_band,
-            nodata_arg,
-            verbose,
         )
 
 
+# =============================================================================
+
+
+def get_block_windows(t_fh, max_pixels=None):
+    """
+    Return the (xoff, yoff, xsize, ysize) windows, made of whole blocks of the
+    first band of the target file and of about max_pixels pixels, that cover
+    the target file, row by row.
+    """
+    if max_pixels is None:
+        max_pixels = MERGE_WINDOW_MAX_PIXELS
+    xsize = t_fh.RasterXSize
+    ysize = t_fh.RasterYSize
+    block_xsize, block_ysize = t_fh.GetRasterBand(1).GetBlockSize()
+    x_blocks = max(
+        1,
+        min(
+            math.ceil(xsize / block_xsize),
+            int(math.sqrt(max_pixels / (block_xsize * block_ysize))),
+        ),
+    )
+    win_xsize = min(xsize, block_xsize * x_blocks)
+    win_ysize = min(
+        ysize, block_ysize * max(1, max_pixels // (win_xsize * block_ysize))
+    )
+    for yoff in range(0, ysize, win_ysize):
+        for xoff in range(0, xsize, win_xsize):
+            yield xoff, yoff, min(win_xsize, xsize - xoff), min(win_ysize, ysize - yoff)
+
+
+def merge_by_blocks(
+    t_fh, file_infos, band_pairs, nodata=None, init_values=None, quiet=0, verbose=0
+):
+    """
+    Copy the source files into the target file, window of blocks by window of
+    blocks of the target file.
+
+    The source files overlapping each window are found with a spatial index
+    of their footprints, and composited in memory, in their order, before the
+    window is written once. Only a few source files are kept open at a time.
+
+    t_fh -- gdal.Dataset object of the target file.
+    file_infos -- list of file_info objects of the source files.
+    band_pairs -- for each file_info, list of the (source band, target band)
+    pairs to copy.
+    nodata -- pixel value of the source files to ignore.
+    init_values -- initial value of each target band, or None to start from
+    the content of the target file.
+    """
+    import numpy as np
+
+    from osgeo import gdal_array
+
+    entries = []
+    for i, fi in enumerate(file_infos):
+        windows = fi.get_copy_windows(t_fh)
+        if windows is not None:
+            _, (tw_xoff, tw_yoff, tw_xsize, tw_ysize) = windows
+            bbox = (tw_xoff, tw_yoff, tw_xoff + tw_xsize, tw_yoff + tw_ysize)
+            entries.append((bbox, (i, windows)))
+    index = RTree(entries)
+
+    datasets = OrderedDict()  # most recently used source datasets
+
+    def open_source(i):
+        s_fh = datasets.pop(i, None)
+        if s_fh is None:
+            if verbose != 0:
+                print("Opening " + file_infos[i].filename)
+            s_fh = gdal.Open(file_infos[i].filename)
+            if len(datasets) >= MERGE_MAX_OPEN_DATASETS:
+                datasets.popitem(last=False)
+        datasets[i] = s_fh
+        return s_fh
+
+    windows = list(get_block_windows(t_fh))
+    for window_n, (xoff, yoff, xsize, ysize) in enumerate(windows):
+        arrays = {}
+        if init_values is not None:
+            for t_band_n in range(1, t_fh.RasterCount + 1):
+                arrays[t_band_n] = np.full(
+                    (ysize, xsize),
+                    init_values[t_band_n - 1],
+                    dtype=gdal_array.GDALTypeCodeToNumericTypeCode(
+                        t_fh.GetRasterBand(t_band_n).DataType
+                    ),
+                )
+        for i, (sw, tw) in index.query(xoff, yoff, xoff + xsize, yoff + ysize):
+            # intersection of the target window of the file with this window
+            x0 = max(xoff, tw[0])
+            y0 = max(yoff, tw[1])
+            x1 = min(xoff + xsize, tw[0] + tw[2])
+            y1 = min(yoff + ysize, tw[1] + tw[3])
+            if x1 <= x0 or y1 <= y0:
+                continue
+            x_ratio = sw[2] / tw[2]
+            y_ratio = sw[3] / tw[3]
+            s_window = dict(
+                xoff=sw[0] + (x0 - tw[0]) * x_ratio,
+                yoff=sw[1] + (y0 - tw[1]) * y_ratio,
+                win_xsize=(x1 - x0) * x_ratio,
+                win_ysize=(y1 - y0) * y_ratio,
+                buf_xsize=x1 - x0,
+                buf_ysize=y1 - y0,
+            )
+            if verbose != 0:
+                print(
+                    "Copy %f,%f,%f,%f to %d,%d,%d,%d."
+                    % (
+                        s_window["xoff"],
+                        s_window["yoff"],
+                        s_window["win_xsize"],
+                        s_window["win_ysize"],
+                        x0,
+                        y0,
+                        x1 - x0,
+                        y1 - y0,
+                    )
+                )
+
+            s_fh = open_source(i)
+            for s_band_n, t_band_n in band_pairs[i]:
+                t_band = t_fh.GetRasterBand(t_band_n)
+                if t_band_n not in arrays:
+                    # read the target once per window, and only if needed
+                    arrays[t_band_n] = t_band.ReadAsArray(xoff, yoff, xsize, ysize)
+                s_band = s_fh.GetRasterBand(s_band_n)
+                data = s_band.ReadAsArray(buf_type=t_band.DataType, **s_window)
+
+                # same logic as raster_copy()
+                if s_band.DataType == t_band.DataType:
+                    s_data = data
+                else:
+                    s_data = None
+                valid = None
+                if nodata is not None:
+                    if s_data is None:
+                        s_data = s_band.ReadAsArray(**s_window)
+                    if not np.isnan(nodata):
+                        valid = np.not_equal(s_data, nodata)
+                    else:
+                        valid = ~np.isnan(s_data)
+                elif s_band.GetMaskFlags() != gdal.GMF_ALL_VALID:
+                    valid = np.not_equal(
+                        s_band.GetMaskBand().ReadAsArray(**s_window), 0
+                    )
+                elif s_band.GetColorInterpretation() == gdal.GCI_AlphaBand:
+                    if s_data is None:
+                        s_data = s_band.ReadAsArray(**s_window)
+                    valid = np.not_equal(s_data, 0)
+
+                t_data = arrays[t_band_n][y0 - yoff : y1 - yoff, x0 - xoff : x1 - xoff]
+                if valid is None:
+                    t_data[...] = data
+                else:
+                    np.copyto(t_data, data, where=valid)
+
+        for t_band_n, array in arrays.items():
+            t_fh.GetRasterBand(t_band_n).WriteArray(array, xoff, yoff)
+
+        if quiet == 0 and verbose == 0:
+            progress((window_n + 1) / float(len(windows)))
+
+    return 0
+
+
 # =============================================================================
 def Usage():
     print("Usage: gdal_merge.py [-o out_filename] [-of out_format] [-co NAME=VALUE]*")
@@ -371,7 +573,7 @@ def Usage():
     )
     print('                     [-ul_lr ulx uly lrx lry] [-init "value [value...]"]')
     print("                     [-n nodata_value] [-a_nodata output_nodata_value]")
-    print("                     [-ot datatype] [-createonly] input_files")
+    print("                     [-ot datatype] [-createonly] [-blocks] input_files")
     print("                     [--help-general]")
     print("")
     return 2
@@ -394,6 +596,7 @@ def gdal_merge(argv=None):
     pre_init = []
     band_type = None
     createonly = 0
+    blocks = 0
     bTargetAlignedPixels = False
     start_time = time.time()
 
@@ -421,6 +624,9 @@ def gdal_merge(argv=None):
         elif arg == "-createonly":
             createonly = 1
 
+        elif arg == "-blocks":
+            blocks = 1
+
         elif arg == "-separate":
             separate = 1
 
@@ -581,13 +787,16 @@ def gdal_merge(argv=None):
             t_fh.GetRasterBand(i + 1).SetNoDataValue(a_nodata)
 
     # Do we need to pre-initialize the whole mosaic file to some value?
+    init_values = None
     if pre_init is not None:
         if t_fh.RasterCount <= len(pre_init):
-            for i in range(t_fh.RasterCount):
-                t_fh.GetRasterBand(i + 1).Fill(pre_init[i])
+            init_values = pre_init[: t_fh.RasterCount]
         elif len(pre_init) == 1:
-            for i in range(t_fh.RasterCount):
-                t_fh.GetRasterBand(i + 1).Fill(pre_init[0])
+            init_values = pre_init * t_fh.RasterCount
+    # with -blocks, the windows are initialized in memory
+    if init_values is not None and (blocks == 0 or createonly != 0):
+        for i in range(t_fh.RasterCount):
+            t_fh.GetRasterBand(i + 1).Fill(init_values[i])
 
     # Copy data from source files into output file.
     t_band = 1
@@ -596,8 +805,22 @@ def gdal_merge(argv=None):
         progress(0.0)
     fi_processed = 0
 
+    if blocks != 0 and createonly == 0:
+        band_pairs = []
+        for fi in file_infos:
+            if separate == 0:
+                band_pairs.append([(band, band) for band in range(1, bands + 1)])
+            else:
+                band_pairs.append(
+                    [(band, t_band + band - 1) for band in range(1, fi.bands + 1)]
+                )
+                t_band = t_band + fi.bands
+        merge_by_blocks(
+            t_fh, file_infos, band_pairs, nodata, init_values, quiet, verbose
+        )
+
     for fi in file_infos:
-        if createonly != 0:
+        if createonly != 0 or blocks != 0:
             continue
 
         if verbose != 0:
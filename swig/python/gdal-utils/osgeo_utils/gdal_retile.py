@@ -32,8 +32,12 @@ from __future__ import print_function
 
 import os
 import sys
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
 
 from osgeo import gdal, ogr, osr
+from osgeo_utils.auxiliary.rtree import RTree
 
 progress = gdal.TermProgress_nocb
 
@@ -70,33 +74,33 @@ class AffineTransformDecorator(object):
 
 
 class DataSetCache(object):
-    """A class for caching source tiles"""
+    """A class for caching source tiles, closing the least recently used ones"""
 
-    def __init__(self):
-        self.cacheSize = 8
-        self.queue = []
-        self.dict = {}
+    def __init__(self, cacheSize=8):
+        self.cacheSize = cacheSize
+        self.dict = OrderedDict()
+        self.hits = 0
+        self.misses = 0
 
     def get(self, name):
 
-        if name in self.dict:
-            return self.dict[name]
+        result = self.dict.get(name)
+        if result is not None:
+            self.hits += 1
+            self.dict.move_to_end(name)
+            return result
+        self.misses += 1
         result = gdal.Open(name)
         if result is None:
             print("Error opening: %s" % NameError)
             return 1
-        if len(self.queue) == self.cacheSize:
-            toRemove = self.queue.pop(0)
-            del self.dict[toRemove]
-        self.queue.append(name)
+        if len(self.dict) == self.cacheSize:
+            self.dict.popitem(last=False)
         self.dict[name] = result
         return result
 
     def __del__(self):
-        for dataset in self.dict.values():
-            del dataset
-        del self.queue
-        del self.dict
+        self.dict.clear()
 
 
 class tile_info(object):
@@ -141,6 +145,8 @@ class mosaic_info(object):
         self.TempDriver = gdal.GetDriverByName("MEM")
         self.filename = filename
         self.cache = DataSetCache()
+        self.caches = [self.cache]
+        self.threadCaches = threading.local()
         self.ogrTileIndexDS = inputDS
 
         self.ogrTileIndexDS.GetLayer().ResetReading()
@@ -168,6 +174,17 @@ class mosaic_info(object):
                 iband + 1
             ).GetRasterColorInterpretation()
 
+        # footprints of the source tiles, in the order of the tile index
+        tiles = []
+        self.ogrTileIndexDS.GetLayer().ResetReading()
+        while True:
+            feature = self.ogrTileIndexDS.GetLayer().GetNextFeature()
+            if feature is None:
+                break
+            env = feature.GetGeometryRef().GetEnvelope()
+            tiles.append(((env[0], env[2], env[1], env[3]), feature.GetField(0)))
+        self.tileIndex = RTree(tiles)
+
         extent = self.ogrTileIndexDS.GetLayer().GetExtent()
         self.ulx = extent[0]
         self.uly = extent[3]
@@ -181,41 +198,31 @@ class mosaic_info(object):
         del self.cache
         del self.ogrTileIndexDS
 
-    def getDataSet(self, minx, miny, maxx, maxy):
+    def getCache(self):
+        """
+        Return the cache of source tiles of the current thread, as datasets
+        cannot be used by several threads at once
+        """
+        if threading.current_thread() is threading.main_thread():
+            return self.cache
+        cache = getattr(self.threadCaches, "cache", None)
+        if cache is None:
+            cache = DataSetCache()
+            self.threadCaches.cache = cache
+            self.caches.append(cache)
+        return cache
+
+    def getCacheStatistics(self):
+        """Return the numbers of hits and misses of the caches of source tiles"""
+        caches = list(self.caches)
+        return sum(c.hits for c in caches), sum(c.misses for c in caches)
 
-        self.ogrTileIndexDS.GetLayer().ResetReading()
-        self.ogrTileIndexDS.GetLayer().SetSpatialFilterRect(minx, miny, maxx, maxy)
-        features = []
-        envelope = None
-        while True:
-            feature = self.ogrTileIndexDS.GetLayer().GetNextFeature()
-            if feature is None:
-                break
-            features.append(feature)
-            if envelope is None:
-                envelope = feature.GetGeometryRef().GetEnvelope()
-            else:
-                featureEnv = feature.GetGeometryRef().GetEnvelope()
-                envelope = (
-                    min(featureEnv[0], envelope[0]),
-                    max(featureEnv[1], envelope[1]),
-                    min(featureEnv[2], envelope[2]),
-                    max(featureEnv[3], envelope[3]),
-                )
+    def getDataSet(self, minx, miny, maxx, maxy):
 
-        if envelope is None:
+        tileNames = self.tileIndex.query(minx, miny, maxx, maxy)
+        if not tileNames:
             return None
 
-        # enlarge to query rect if necessary
-        envelope = (
-            min(minx, envelope[0]),
-            max(maxx, envelope[1]),
-            min(miny, envelope[2]),
-            max(maxy, envelope[3]),
-        )
-
-        self.ogrTileIndexDS.GetLayer().SetSpatialFilter(None)
-
         # merge tiles
 
         resultSizeX = int((maxx - minx) / self.scaleX + 0.5)
@@ -232,9 +239,9 @@ class mosaic_info(object):
                 t_band.Fill(self.nodata)
                 t_band.SetNoDataValue(self.nodata)
 
-        for feature in features:
-            featureName = feature.GetField(0)
-            sourceDS = self.cache.get(featureName)
+        cache = self.getCache()
+        for featureName in tileNames:
+            sourceDS = cache.get(featureName)
             dec = AffineTransformDecorator(sourceDS.GetGeoTransform())
 
             dec.lrx = dec.ulx + sourceDS.RasterXSize * dec.scaleX
@@ -317,6 +324,163 @@ class mosaic_info(object):
         print("UL:(%f,%f)   LR:(%f,%f)" % (self.ulx, self.uly, self.lrx, self.lry))
 
 
+class streamed_mosaic_info(object):
+    """
+    A class holding in memory the rows of the tiles of a pyramid level that
+    are still needed to build the next level, with the interface of
+    mosaic_info
+    """
+
+    def __init__(self, filename, ti, ulx, uly, scaleX, scaleY, bands, band_type):
+        """
+        Initialize streamed_mosaic_info
+
+        filename -- Name of the file of the mosaic of the base level.
+        ti -- tile_info of the tiles of this level.
+
+        """
+        import numpy
+
+        from osgeo import gdal_array
+
+        self.TempDriver = gdal.GetDriverByName("MEM")
+        self.filename = filename
+        self.xsize = ti.width
+        self.ysize = ti.height
+        self.ulx = ulx
+        self.uly = uly
+        self.scaleX = scaleX
+        self.scaleY = scaleY
+        self.lrx = ulx + self.xsize * scaleX
+        self.lry = uly + self.ysize * scaleY
+        self.bands = bands
+        self.band_type = band_type
+        # properties of the tiles, read from the first one
+        self.firstTileName = None
+        self.projection = None
+        self.nodata = None
+        self.ct = None
+        self.ci = None
+
+        self.dtype = gdal_array.GDALTypeCodeToNumericTypeCode(band_type)
+        # rows [rowOffset, rowOffset + number of rows) of the level, and
+        # whether they are covered by a tile
+        self.rowOffset = 0
+        self.rows = numpy.zeros((bands, 0, self.xsize), dtype=self.dtype)
+        self.covered = numpy.zeros((0, self.xsize), dtype=bool)
+        self.lock = threading.Lock()
+
+    def addTile(self, offsetX, offsetY, tilename, tileDS=None):
+        """Add the content of a tile, or of the tile file if tileDS is None"""
+        import numpy
+
+        if tileDS is None:
+            tileDS = gdal.Open(tilename)
+            if tileDS is None:
+                return
+        data = numpy.stack(
+            [
+                tileDS.GetRasterBand(iband + 1).ReadAsArray()
+                for iband in range(self.bands)
+            ]
+        )
+
+        with self.lock:
+            if self.firstTileName is None:
+                self.firstTileName = tilename
+            # skip the rows that are not needed anymore
+            skip = max(0, self.rowOffset - offsetY)
+            data = data[:, skip:, :]
+            offsetY += skip
+            start = offsetY - self.rowOffset
+            end = start + data.shape[1]
+            if end > self.rows.shape[1]:
+                rows = numpy.zeros((self.bands, end, self.xsize), dtype=self.dtype)
+                rows[:, : self.rows.shape[1]] = self.rows
+                self.rows = rows
+                covered = numpy.zeros((end, self.xsize), dtype=bool)
+                covered[: self.covered.shape[0]] = self.covered
+                self.covered = covered
+            self.rows[:, start:end, offsetX : offsetX + data.shape[2]] = data
+            self.covered[start:end, offsetX : offsetX + data.shape[2]] = True
+
+    def dropRows(self, rowEnd):
+        """Forget the rows before rowEnd"""
+        with self.lock:
+            count = rowEnd - self.rowOffset
+            if count > 0:
+                self.rows = self.rows[:, count:].copy()
+                self.covered = self.covered[count:].copy()
+                self.rowOffset = rowEnd
+
+    def readTileProperties(self):
+        """Read the properties of the tiles from the first tile file"""
+        fhTile = gdal.Open(self.firstTileName)
+        self.projection = fhTile.GetProjection()
+        self.nodata = fhTile.GetRasterBand(1).GetNoDataValue()
+        ct = fhTile.GetRasterBand(1).GetRasterColorTable()
+        if ct is not None:
+            self.ct = ct.Clone()
+        else:
+            self.ct = None
+        self.ci = [
+            fhTile.GetRasterBand(iband + 1).GetRasterColorInterpretation()
+            for iband in range(self.bands)
+        ]
+
+    def getDataSet(self, minx, miny, maxx, maxy):
+        import numpy
+
+        xoff = int(round((minx - self.ulx) / self.scaleX))
+        yoff = int(round((maxy - self.uly) / self.scaleY))
+        resultSizeX = int((maxx - minx) / self.scaleX + 0.5)
+        resultSizeY = int((miny - maxy) / self.scaleY + 0.5)
+
+        with self.lock:
+            x0 = max(xoff, 0)
+            x1 = min(xoff + resultSizeX, self.xsize)
+            y0 = max(yoff, self.rowOffset) - self.rowOffset
+            y1 = min(yoff + resultSizeY - self.rowOffset, self.rows.shape[1])
+            if x1 <= x0 or y1 <= y0:
+                return None
+            covered = self.covered[y0:y1, x0:x1]
+            if not covered.any():
+                return None
+            if self.ci is None:
+                self.readTileProperties()
+            fill = numpy.array(0 if self.nodata is None else self.nodata)
+            data = numpy.where(
+                covered, self.rows[:, y0:y1, x0:x1], fill.astype(self.dtype)
+            )
+            y0 += self.rowOffset
+
+        resultDS = self.TempDriver.Create(
+            "TEMP", resultSizeX, resultSizeY, self.bands, self.band_type, []
+        )
+        resultDS.SetGeoTransform([minx, self.scaleX, 0, maxy, 0, self.scaleY])
+
+        for bandNr in range(1, self.bands + 1):
+            t_band = resultDS.GetRasterBand(bandNr)
+            if self.nodata is not None:
+                t_band.Fill(self.nodata)
+                t_band.SetNoDataValue(self.nodata)
+            if self.ct is not None:
+                t_band.SetRasterColorTable(self.ct)
+            t_band.SetRasterColorInterpretation(self.ci[bandNr - 1])
+            t_band.WriteArray(data[bandNr - 1], x0 - xoff, y0 - yoff)
+
+        return resultDS
+
+    def closeDataSet(self, memDS):
+        del memDS
+
+    def report(self):
+        print("Filename: " + self.filename)
+        print("File Size: %dx%dx%d" % (self.xsize, self.ysize, self.bands))
+        print("Pixel Size: %f x %f" % (self.scaleX, self.scaleY))
+        print("UL:(%f,%f)   LR:(%f,%f)" % (self.ulx, self.uly, self.lrx, self.lry))
+
+
 def getTileIndexFromFiles(g):
     if g.Verbose:
         print("Building internal Index for %d tile(s) ..." % len(g.Names), end=" ")
@@ -350,10 +514,11 @@ def getTargetDir(g, level=-1):
     return g.TargetDir + str(level) + os.sep
 
 
-def tileImage(g, minfo, ti):
+def tileImage(g, minfo, ti, pyramidLevel=None):
     """
 
-    Tile image in mosaicinfo minfo  based on tileinfo ti
+    Tile image in mosaicinfo minfo  based on tileinfo ti, streaming the rows
+    of tiles to the pyramid_level pyramidLevel if it is not None
 
     returns list of created tiles
 
@@ -376,6 +541,9 @@ def tileImage(g, minfo, ti):
         processed = 0
         total = len(xRange) * len(yRange)
 
+    executor = ThreadPoolExecutor(g.Threads) if g.Threads > 1 else None
+    jobs = deque()
+
     for yIndex in yRange:
         for xIndex in xRange:
             offsetY = (yIndex - 1) * (ti.tileHeight - ti.overlap)
@@ -393,14 +561,34 @@ def tileImage(g, minfo, ti):
                 height = ti.height - offsetY
 
             feature_only = g.Resume and os.path.exists(tilename)
-            createTile(
-                g, minfo, offsetX, offsetY, width, height, tilename, OGRDS, feature_only
+            submitTile(
+                g,
+                executor,
+                jobs,
+                createTile,
+                minfo,
+                offsetX,
+                offsetY,
+                width,
+                height,
+                tilename,
+                OGRDS,
+                feature_only,
+                None if pyramidLevel is None else pyramidLevel.levelMosaicInfo,
             )
 
             if not g.Quiet and not g.Verbose:
                 processed += 1
                 progress(processed / float(total))
 
+        if pyramidLevel is not None:
+            drainTiles(jobs)
+            pyramidLevel.buildRows(offsetY + height, yIndex == ti.countTilesY)
+
+    waitTiles(executor, jobs)
+    if g.Verbose:
+        reportCacheStatistics(minfo)
+
     if g.TileIndexName is not None:
         if g.UseDirForEachRow and not g.PyramidOnly:
             shapeName = getTargetDir(g, 0) + g.TileIndexName
@@ -487,7 +675,16 @@ def _renameDataset(g, oldName, newName):
 
 
 def createPyramidTile(
-    g, levelMosaicInfo, offsetX, offsetY, width, height, tileName, OGRDS, feature_only
+    g,
+    levelMosaicInfo,
+    offsetX,
+    offsetY,
+    width,
+    height,
+    tileName,
+    OGRDS,
+    feature_only,
+    nextLevelMosaicInfo=None,
 ):
 
     temp_tilename = _createTempFileName(tileName)
@@ -511,6 +708,8 @@ def createPyramidTile(
         addFeature(g.TileIndexFieldName, OGRDS, tileName, points[0], points[1])
 
     if feature_only:
+        if nextLevelMosaicInfo is not None:
+            nextLevelMosaicInfo.addTile(offsetX, offsetY, tileName)
         return
 
     s_fh = levelMosaicInfo.getDataSet(
@@ -558,6 +757,9 @@ def createPyramidTile(
 
     levelMosaicInfo.closeDataSet(s_fh)
 
+    if nextLevelMosaicInfo is not None:
+        nextLevelMosaicInfo.addTile(offsetX, offsetY, tileName, t_fh)
+
     if g.MemDriver is None:
         t_fh.FlushCache()
     else:
@@ -584,7 +786,16 @@ def createPyramidTile(
 
 
 def createTile(
-    g, minfo, offsetX, offsetY, width, height, tilename, OGRDS, feature_only
+    g,
+    minfo,
+    offsetX,
+    offsetY,
+    width,
+    height,
+    tilename,
+    OGRDS,
+    feature_only,
+    nextLevelMosaicInfo=None,
 ):
     """
 
@@ -617,6 +828,8 @@ def createTile(
         addFeature(g.TileIndexFieldName, OGRDS, tilename, points[0], points[1])
 
     if feature_only:
+        if nextLevelMosaicInfo is not None:
+            nextLevelMosaicInfo.addTile(offsetX, offsetY, tilename)
         return
 
     s_fh = minfo.getDataSet(
@@ -659,6 +872,9 @@ def createTile(
 
     minfo.closeDataSet(s_fh)
 
+    if nextLevelMosaicInfo is not None:
+        nextLevelMosaicInfo.addTile(offsetX, offsetY, tilename, t_fh)
+
     if g.MemDriver is None:
         t_fh.FlushCache()
     else:
@@ -684,6 +900,87 @@ def createTile(
         )
 
 
+def submitTile(
+    g,
+    executor,
+    jobs,
+    createFunc,
+    minfo,
+    offsetX,
+    offsetY,
+    width,
+    height,
+    tilename,
+    OGRDS,
+    feature_only,
+    nextLevelMosaicInfo=None,
+):
+    """
+
+    Create a tile with createFunc (createTile or createPyramidTile), in a
+    worker thread of executor if it is not None. The feature of the tile is
+    always added to the tile index by the calling thread. Waits for the
+    oldest tiles of jobs so that at most 2 * g.Threads tiles are pending.
+
+    """
+    if executor is None:
+        createFunc(
+            g,
+            minfo,
+            offsetX,
+            offsetY,
+            width,
+            height,
+            tilename,
+            OGRDS,
+            feature_only,
+            nextLevelMosaicInfo,
+        )
+        return
+
+    if OGRDS is not None:
+        createFunc(g, minfo, offsetX, offsetY, width, height, tilename, OGRDS, True)
+    if feature_only and nextLevelMosaicInfo is None:
+        return
+
+    jobs.append(
+        executor.submit(
+            createFunc,
+            g,
+            minfo,
+            offsetX,
+            offsetY,
+            width,
+            height,
+            tilename,
+            None,
+            feature_only,
+            nextLevelMosaicInfo,
+        )
+    )
+    while len(jobs) > 2 * g.Threads:
+        jobs.popleft().result()
+
+
+def drainTiles(jobs):
+    """Wait for the pending tiles"""
+    while jobs:
+        jobs.popleft().result()
+
+
+def waitTiles(executor, jobs):
+    """Wait for the pending tiles, and stop the worker threads"""
+    if executor is None:
+        return
+    drainTiles(jobs)
+    executor.shutdown()
+
+
+def reportCacheStatistics(minfo):
+    hits, misses = minfo.getCacheStatistics()
+    print("Source tile cache: %d hits, %d misses" % (hits, misses))
+
+
 def createTileIndex(Verbose, dsName, fieldName, srs, driverName):
     OGRDriver = ogr.GetDriverByName(driverName)
     if OGRDriver is None:
@@ -771,59 +1068,190 @@ def buildPyramid(g, minfo, createdTileIndexDS, tileWidth, tileHeight, overlap):
 
 
 def buildPyramidLevel(g, levelMosaicInfo, levelOutputTileInfo, level):
-    yRange = list(range(1, levelOutputTileInfo.countTilesY + 1))
-    xRange = list(range(1, levelOutputTileInfo.countTilesX + 1))
+    pyramidLevel = pyramid_level(g, levelMosaicInfo, levelOutputTileInfo, level)
+    pyramidLevel.buildRows(levelMosaicInfo.ysize, True)
+    return pyramidLevel.finish()
 
-    OGRDS = createTileIndex(
-        g.Verbose,
-        "TileResult_" + str(level),
-        g.TileIndexFieldName,
-        g.Source_SRS,
-        g.TileIndexDriverTyp,
-    )
 
-    for yIndex in yRange:
-        for xIndex in xRange:
-            offsetY = (yIndex - 1) * (
-                levelOutputTileInfo.tileHeight - levelOutputTileInfo.overlap
-            )
-            offsetX = (xIndex - 1) * (
-                levelOutputTileInfo.tileWidth - levelOutputTileInfo.overlap
-            )
-            height = levelOutputTileInfo.tileHeight
-            width = levelOutputTileInfo.tileWidth
+class pyramid_level(object):
+    """A class building the tiles of a pyramid level, row of tiles by row of tiles"""
 
-            if offsetX + width > levelOutputTileInfo.width:
-                width = levelOutputTileInfo.width - offsetX
-            if offsetY + height > levelOutputTileInfo.height:
-                height = levelOutputTileInfo.height - offsetY
+    def __init__(self, g, levelMosaicInfo, levelOutputTileInfo, level, nextLevel=None):
+        """
+        Initialize pyramid_level
 
-            tilename = getTileName(
-                g, levelMosaicInfo, levelOutputTileInfo, xIndex, yIndex, level
-            )
+        levelMosaicInfo -- mosaic_info or streamed_mosaic_info of the level below.
+        levelOutputTileInfo -- tile_info of this level.
+        nextLevel -- pyramid_level of the level above, to stream the tiles of
+        this level to.
 
-            feature_only = g.Resume and os.path.exists(tilename)
-            createPyramidTile(
-                g,
-                levelMosaicInfo,
-                offsetX,
-                offsetY,
-                width,
-                height,
-                tilename,
-                OGRDS,
-                feature_only,
-            )
+        """
+        self.g = g
+        self.levelMosaicInfo = levelMosaicInfo
+        self.levelOutputTileInfo = levelOutputTileInfo
+        self.level = level
+        self.nextLevel = nextLevel
+        self.nextYIndex = 1
+        self.lastRowIndx = -1
+
+        self.OGRDS = createTileIndex(
+            g.Verbose,
+            "TileResult_" + str(level),
+            g.TileIndexFieldName,
+            g.Source_SRS,
+            g.TileIndexDriverTyp,
+        )
 
-    if g.TileIndexName is not None:
-        shapeName = getTargetDir(g, level) + g.TileIndexName
-        copyTileIndexToDisk(g, OGRDS, shapeName)
+        self.executor = ThreadPoolExecutor(g.Threads) if g.Threads > 1 else None
+        self.jobs = deque()
 
-    if g.CsvFileName is not None:
-        csvName = getTargetDir(g, level) + g.CsvFileName
-        copyTileIndexToCSV(g, OGRDS, csvName)
+    def getRowExtent(self, yIndex):
+        """Return the offset and height of a row of tiles"""
+        ti = self.levelOutputTileInfo
+        offsetY = (yIndex - 1) * (ti.tileHeight - ti.overlap)
+        height = ti.tileHeight
+        if offsetY + height > ti.height:
+            height = ti.height - offsetY
+        return offsetY, height
 
-    return OGRDS
+    def buildRows(self, availableRows, complete):
+        """
+        Build the rows of tiles made of the first availableRows rows of the
+        level below, or all of the remaining ones if complete is True
+        """
+        g = self.g
+        ti = self.levelOutputTileInfo
+        # the rows of tiles of the levels are interleaved
+        savedLastRowIndx = g.LastRowIndx
+        while self.nextYIndex <= ti.countTilesY:
+            yIndex = self.nextYIndex
+            offsetY, height = self.getRowExtent(yIndex)
+            if not complete and 2 * (offsetY + height) > availableRows:
+                break
+
+            g.LastRowIndx = self.lastRowIndx
+            for xIndex in range(1, ti.countTilesX + 1):
+                offsetX = (xIndex - 1) * (ti.tileWidth - ti.overlap)
+                width = ti.tileWidth
+                if offsetX + width > ti.width:
+                    width = ti.width - offsetX
+
+                tilename = getTileName(
+                    g, self.levelMosaicInfo, ti, xIndex, yIndex, self.level
+                )
+
+                feature_only = g.Resume and os.path.exists(tilename)
+                submitTile(
+                    g,
+                    self.executor,
+                    self.jobs,
+                    createPyramidTile,
+                    self.levelMosaicInfo,
+                    offsetX,
+                    offsetY,
+                    width,
+                    height,
+                    tilename,
+                    self.OGRDS,
+                    feature_only,
+                    None if self.nextLevel is None else self.nextLevel.levelMosaicInfo,
+                )
+            self.lastRowIndx = g.LastRowIndx
+            self.nextYIndex += 1
+
+            if self.nextLevel is not None or isinstance(
+                self.levelMosaicInfo, streamed_mosaic_info
+            ):
+                drainTiles(self.jobs)
+            if isinstance(self.levelMosaicInfo, streamed_mosaic_info):
+                # the rows of the level below before the next row of tiles
+                # are not needed anymore
+                self.levelMosaicInfo.dropRows(2 * self.getRowExtent(self.nextYIndex)[0])
+            if self.nextLevel is not None:
+                self.nextLevel.buildRows(
+                    offsetY + height, self.nextYIndex > ti.countTilesY
+                )
+        g.LastRowIndx = savedLastRowIndx
+
+    def finish(self):
+        """Wait for the tiles, write the tile index, and return it"""
+        g = self.g
+        waitTiles(self.executor, self.jobs)
+        if g.Verbose and isinstance(self.levelMosaicInfo, mosaic_info):
+            reportCacheStatistics(self.levelMosaicInfo)
+
+        if g.TileIndexName is not None:
+            shapeName = getTargetDir(g, self.level) + g.TileIndexName
+            copyTileIndexToDisk(g, self.OGRDS, shapeName)
+
+        if g.CsvFileName is not None:
+            csvName = getTargetDir(g, self.level) + g.CsvFileName
+            copyTileIndexToCSV(g, self.OGRDS, csvName)
+
+        return self.OGRDS
+
+
+def streamPyramid(g, minfo, ti):
+    """
+
+    Build the tiles of the base level (unless g.PyramidOnly is set) and of the
+    pyramid levels in one pass, each level being built from the tiles of the
+    level below still in memory
+
+    """
+    if g.BandType is None:
+        bt = minfo.band_type
+    else:
+        bt = g.BandType
+
+    if g.PyramidOnly:
+        levelMosaicInfo = minfo
+    else:
+        levelMosaicInfo = streamed_mosaic_info(
+            minfo.filename,
+            ti,
+            minfo.ulx,
+            minfo.uly,
+            minfo.scaleX,
+            minfo.scaleY,
+            minfo.bands,
+            bt,
+        )
+
+    pyramidLevels = []
+    for level in range(1, g.Levels + 1):
+        levelOutputTileInfo = tile_info(
+            int(levelMosaicInfo.xsize / 2),
+            int(levelMosaicInfo.ysize / 2),
+            g.TileWidth,
+            g.TileHeight,
+            g.Overlap,
+        )
+        pyramidLevel = pyramid_level(g, levelMosaicInfo, levelOutputTileInfo, level)
+        if pyramidLevels:
+            pyramidLevels[-1].nextLevel = pyramidLevel
+        pyramidLevels.append(pyramidLevel)
+        if level == g.Levels:
+            break
+        levelMosaicInfo = streamed_mosaic_info(
+            minfo.filename,
+            levelOutputTileInfo,
+            levelMosaicInfo.ulx,
+            levelMosaicInfo.uly,
+            levelMosaicInfo.scaleX * 2,
+            levelMosaicInfo.scaleY * 2,
+            levelMosaicInfo.bands,
+            bt,
+        )
+
+    if g.PyramidOnly:
+        pyramidLevels[0].buildRows(minfo.ysize, True)
+    else:
+        dsCreatedTileIndex = tileImage(g, minfo, ti, pyramidLevels[0])
+        dsCreatedTileIndex.Destroy()
+
+    for pyramidLevel in pyramidLevels:
+        pyramidLevel.finish()
 
 
 def getTileName(g, minfo, ti, xIndex, yIndex, level=-1):
@@ -890,7 +1318,8 @@ def Usage():
     print("        [ -csv fileName [-csvDelim delimiter]]")
     print("        [-s_srs srs_def]  [-pyramidOnly] -levels numberoflevels")
     print("        [-r {near/bilinear/cubic/cubicspline/lanczos}]")
-    print("        [-useDirForEachRow] [-resume]")
+    print("        [-useDirForEachRow] [-resume] [-threads numberofthreads]")
+    print("        [-streamPyramid]")
     print("        -targetDir TileDirectory input_files")
     return 2
 
@@ -1002,6 +1431,14 @@ def main(args=None, g=None):
             g.UseDirForEachRow = True
         elif arg == "-resume":
             g.Resume = True
+        elif arg == "-streamPyramid":
+            g.StreamPyramid = True
+        elif arg == "-threads":
+            i += 1
+            g.Threads = int(argv[i])
+            if g.Threads < 1:
+                print("Invalid number of threads : %d" % g.Threads)
+                return 1
         elif arg[:1] == "-":
             print("Unrecognized command option: %s" % arg)
             return Usage()
@@ -1071,14 +1508,20 @@ def main(args=None, g=None):
         minfo.report()
         ti.report()
 
-    if not g.PyramidOnly:
-        dsCreatedTileIndex = tileImage(g, minfo, ti)
+    if g.StreamPyramid and g.Levels > 0:
+        streamPyramid(g, minfo, ti)
         tileIndexDS.Destroy()
     else:
-        dsCreatedTileIndex = tileIndexDS
+        if not g.PyramidOnly:
+            dsCreatedTileIndex = tileImage(g, minfo, ti)
+            tileIndexDS.Destroy()
+        else:
+            dsCreatedTileIndex = tileIndexDS
 
-    if g.Levels > 0:
-        buildPyramid(g, minfo, dsCreatedTileIndex, g.TileWidth, g.TileHeight, g.Overlap)
+        if g.Levels > 0:
+            buildPyramid(
+                g, minfo, dsCreatedTileIndex, g.TileWidth, g.TileHeight, g.Overlap
+            )
 
     if g.Verbose:
         print("FINISHED")
@@ -1112,6 +1555,8 @@ class RetileGlobals:
         "LastRowIndx",
         "UseDirForEachRow",
         "Resume",
+        "Threads",
+        "StreamPyramid",
     ]
 
     def __init__(self):
@@ -1142,6 +1587,8 @@ class RetileGlobals:
         self.LastRowIndx = -1
         self.UseDirForEachRow = False
         self.Resume = False
+        self.Threads = 1
+        self.StreamPyramid = False
 
 
 if __name__ == "__main__":
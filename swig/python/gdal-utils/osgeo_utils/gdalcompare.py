@@ -33,6 +33,9 @@ import filecmp
 import math
 import os
 import sys
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 
 from osgeo import gdal, osr
 
@@ -67,23 +70,204 @@ def compare_metadata(golden_md, new_md, ident, options=None):
     return found_diff
 
 
-#######################################################
-# Review and report on the actual image pixels that differ.
-def compare_image_pixels(golden_band, new_band, ident, options=None):
-    # pylint: disable=unused-argument
+# Maximum number of pixels of the windows in which the bands are compared.
+COMPARE_WINDOW_MAX_PIXELS = 1024 * 1024
 
-    diff_count = 0
-    max_diff = 0
 
-    for line in range(golden_band.YSize):
-        golden_line = golden_band.ReadAsArray(0, line, golden_band.XSize, 1)[0]
-        new_line = new_band.ReadAsArray(0, line, golden_band.XSize, 1)[0]
-        diff_line = golden_line.astype(float) - new_line.astype(float)
-        max_diff = max(max_diff, abs(diff_line).max())
-        diff_count += len(diff_line.nonzero()[0])
+def get_option(options, key, default=None):
+    """Return the value of a KEY=VALUE option, or default"""
+    if options is not None:
+        for option in options:
+            if option.startswith(key + "="):
+                return option[len(key) + 1 :]
+    return default
 
+
+def get_compare_windows(band, max_pixels=None):
+    """Yield block aligned (xoff, yoff, xsize, ysize) windows covering band"""
+    if max_pixels is None:
+        max_pixels = COMPARE_WINDOW_MAX_PIXELS
+    block_xsize, block_ysize = band.GetBlockSize()
+    xsize, ysize = band.XSize, band.YSize
+
+    blocks_per_window = max(1, max_pixels // (block_xsize * block_ysize))
+    blocks_per_row = (xsize + block_xsize - 1) // block_xsize
+    if blocks_per_window >= blocks_per_row:
+        win_xsize = xsize
+        win_ysize = block_ysize * (blocks_per_window // blocks_per_row)
+    else:
+        win_xsize = block_xsize * blocks_per_window
+        win_ysize = block_ysize
+
+    for yoff in range(0, ysize, win_ysize):
+        for xoff in range(0, xsize, win_xsize):
+            yield xoff, yoff, min(win_xsize, xsize - xoff), min(win_ysize, ysize - yoff)
+
+
+def compare_window(golden_band, new_band, xoff, yoff, xsize, ysize):
+    """
+    Compare the pixels of a window of two bands, in their own data types.
+
+    Returns (diff_count, max_diff, bbox) where bbox is the
+    (min_pixel, min_line, max_pixel, max_line) of the differing pixels,
+    or None if there are none.
+    """
+    import numpy as np
+
+    golden = golden_band.ReadAsArray(xoff, yoff, xsize, ysize)
+    new = new_band.ReadAsArray(xoff, yoff, xsize, ysize)
+    differ = golden != new
+    if np.issubdtype(golden.dtype, np.inexact) or np.issubdtype(new.dtype, np.inexact):
+        # pixels that are NaN on both sides are equal
+        differ &= ~(np.isnan(golden) & np.isnan(new))
+    lines, pixels = np.nonzero(differ)
+    diff_count = len(pixels)
+    if diff_count == 0:
+        return 0, 0, None
+
+    diff_type = np.result_type(golden.dtype, new.dtype, np.float64)
+    diff = np.abs(
+        golden[lines, pixels].astype(diff_type) - new[lines, pixels].astype(diff_type)
+    )
+    # NaN are counted as differing pixels, but not in the maximum difference
+    diff = diff[~np.isnan(diff)]
+    max_diff = float(diff.max()) if len(diff) else 0
+    bbox = (
+        xoff + int(pixels.min()),
+        yoff + int(lines.min()),
+        xoff + int(pixels.max()),
+        yoff + int(lines.max()),
+    )
+    return diff_count, max_diff, bbox
+
+
+def get_band_opener(band):
+    """
+    Return a function opening band from a new handle of its dataset, for use
+    from another thread, or None if the band cannot be reopened.
+    """
+    ds = band.GetDataset()
+    if ds is None or not ds.GetDescription() or band.GetBand() < 1:
+        return None
+    filename = ds.GetDescription()
+    band_num = band.GetBand()
+
+    def open_band():
+        new_ds = gdal.Open(filename)
+        if new_ds is None or band_num > new_ds.RasterCount:
+            return None, None
+        new_band = new_ds.GetRasterBand(band_num)
+        if (new_band.XSize, new_band.YSize, new_band.DataType) != (
+            band.XSize,
+            band.YSize,
+            band.DataType,
+        ):
+            return None, None
+        return new_ds, new_band
+
+    # make sure that the same band is found again
+    if open_band()[1] is None:
+        return None
+    return open_band
+
+
+def get_pixel_diffs(golden_band, new_band, options=None):
+    """
+    Compare the pixels of two bands, window by window.
+
+    Options:
+    NUM_THREADS=n -- compare the windows in n threads, each reading the
+      bands from its own handles of the datasets.
+    MAX_DIFF_PIXELS=n -- stop once at least n differing pixels are found.
+
+    Returns (diff_count, max_diff, bbox, stopped), where bbox is the
+    (min_pixel, min_line, max_pixel, max_line) of the differing pixels,
+    or None if there are none, and stopped is True if the comparison was
+    stopped by MAX_DIFF_PIXELS.
+    """
+    threads = int(get_option(options, "NUM_THREADS", 1))
+    max_diff_pixels = int(get_option(options, "MAX_DIFF_PIXELS", 0))
+
+    diff_count = 0
+    max_diff = 0
+    bbox = None
+
+    def add_window_diffs(window_diffs):
+        nonlocal diff_count, max_diff, bbox
+        window_count, window_max_diff, window_bbox = window_diffs
+        if window_count:
+            diff_count += window_count
+            max_diff = max(max_diff, window_max_diff)
+            if bbox is None:
+                bbox = window_bbox
+            else:
+                bbox = (
+                    min(bbox[0], window_bbox[0]),
+                    min(bbox[1], window_bbox[1]),
+                    max(bbox[2], window_bbox[2]),
+                    max(bbox[3], window_bbox[3]),
+                )
+        return max_diff_pixels > 0 and diff_count >= max_diff_pixels
+
+    stopped = False
+    windows = get_compare_windows(golden_band)
+    openers = None
+    if threads > 1:
+        openers = (get_band_opener(golden_band), get_band_opener(new_band))
+        if None in openers:
+            openers = None
+
+    if openers is None:
+        for window in windows:
+            if add_window_diffs(compare_window(golden_band, new_band, *window)):
+                stopped = True
+                break
+    else:
+        local = threading.local()
+
+        def compare_window_in_thread(window):
+            # GDAL dataset handles must not be shared between threads
+            if not hasattr(local, "bands"):
+                local.bands = tuple(opener() for opener in openers)
+            (_, thread_golden_band), (_, thread_new_band) = local.bands
+            return compare_window(thread_golden_band, thread_new_band, *window)
+
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            jobs = deque()
+            for window in windows:
+                jobs.append(executor.submit(compare_window_in_thread, window))
+                while len(jobs) > 2 * threads or (jobs and jobs[0].done()):
+                    stopped = add_window_diffs(jobs.popleft().result()) or stopped
+                if stopped:
+                    break
+            while jobs:
+                stopped = add_window_diffs(jobs.popleft().result()) or stopped
+
+    return diff_count, max_diff, bbox, stopped
+
+
+def print_pixel_diffs(diff_count, max_diff, bbox, stopped):
     print("  Pixels Differing: " + str(diff_count))
     print("  Maximum Pixel Difference: " + str(max_diff))
+    if bbox is not None:
+        print(
+            "  Differences Bounding Box: pixels %d to %d, lines %d to %d"
+            % (bbox[0], bbox[2], bbox[1], bbox[3])
+        )
+    if stopped:
+        print("  Comparison stopped, the counts are partial.")
+
+
+#######################################################
+# Review and report on the actual image pixels that differ.
+def compare_image_pixels(golden_band, new_band, ident, options=None):
+    # pylint: disable=unused-argument
+
+    diff_count, max_diff, bbox, stopped = get_pixel_diffs(
+        golden_band, new_band, options
+    )
+    print_pixel_diffs(diff_count, max_diff, bbox, stopped)
+    return diff_count
 
 
 #######################################################
@@ -127,12 +311,17 @@ def compare_band(golden_band, new_band, ident, options=None):
         )
         found_diff += 1
 
-    if golden_band.Checksum() != new_band.Checksum():
+    # Compare the pixels first, and only compute the checksums to report
+    # a difference
+    diff_count, max_diff, bbox, stopped = get_pixel_diffs(
+        golden_band, new_band, options
+    )
+    if diff_count:
         print("Band %s checksum difference:" % ident)
         print("  Golden: " + str(golden_band.Checksum()))
         print("  New:    " + str(new_band.Checksum()))
         found_diff += 1
-        compare_image_pixels(golden_band, new_band, ident, options)
+        print_pixel_diffs(diff_count, max_diff, bbox, stopped)
 
     # Check overviews
     if golden_band.GetOverviewCount() != new_band.GetOverviewCount():
@@ -295,7 +484,10 @@ def compare_sds(golden_db, new_db, options=None):
 
 
 def find_diff(
-    golden_file: PathLikeOrStr, new_file: PathLikeOrStr, check_sds: bool = False
+    golden_file: PathLikeOrStr,
+    new_file: PathLikeOrStr,
+    check_sds: bool = False,
+    options=None,
 ):
     # Compare Files
     found_diff = 0
@@ -313,10 +505,10 @@ def find_diff(
     # compare as GDAL Datasets.
     golden_db = gdal.Open(golden_file)
     new_db = gdal.Open(new_file)
-    found_diff += compare_db(golden_db, new_db)
+    found_diff += compare_db(golden_db, new_db, options)
 
     if check_sds:
-        found_diff += compare_sds(golden_db, new_db)
+        found_diff += compare_sds(golden_db, new_db, options)
 
     return found_diff
 
@@ -325,7 +517,10 @@ def find_diff(
 
 
 def Usage():
-    print("Usage: gdalcompare.py [-sds] <golden_file> <new_file>")
+    print(
+        "Usage: gdalcompare.py [-sds] [-threads n] [-max_diff_pixels n]\n"
+        "                      <golden_file> <new_file>"
+    )
     return 2
 
 
@@ -348,6 +543,7 @@ def main(argv=sys.argv):
     golden_file = None
     new_file = None
     check_sds = 0
+    options = []
 
     i = 1
     while i < len(argv):
@@ -355,6 +551,14 @@ def main(argv=sys.argv):
         if argv[i] == "-sds":
             check_sds = 1
 
+        elif argv[i] == "-threads" and i < len(argv) - 1:
+            i = i + 1
+            options.append("NUM_THREADS=%d" % int(argv[i]))
+
+        elif argv[i] == "-max_diff_pixels" and i < len(argv) - 1:
+            i = i + 1
+            options.append("MAX_DIFF_PIXELS=%d" % int(argv[i]))
+
         elif golden_file is None:
             golden_file = argv[i]
 
@@ -368,7 +572,7 @@ def main(argv=sys.argv):
         i = i + 1
         # next argument
 
-    found_diff = find_diff(golden_file, new_file, check_sds)
+    found_diff = find_diff(golden_file, new_file, check_sds, options)
     print("Differences Found: " + str(found_diff))
     sys.exit(found_diff)
 
@@ -31,8 +31,11 @@
 
 import os
 import sys
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 
 from osgeo import gdal, ogr, osr
+from osgeo_utils.auxiliary.rtree import RTree
 
 ###############################################################################
 
@@ -47,7 +50,8 @@ Usage: ogr_layer_algebra.py Union|Intersection|SymDifference|Identity|Update|Cli
                             [-opt NAME=VALUE]*
                             [-f format_name] [-dsco NAME=VALUE]* [-lco NAME=VALUE]*
                             [-input_fields NONE|ALL|fld1,fl2,...fldN] [-method_fields NONE|ALL|fld1,fl2,...fldN]
-                            [-nlt geom_type] [-a_srs srs_def]"""
+                            [-nlt geom_type] [-a_srs srs_def]
+                            [-threads {ALL_CPUS|number}]"""
     )
     return 2
 
@@ -158,6 +162,366 @@ def CreateLayer(
     return output_lyr
 
 
+###############################################################################
+# Overlay engine used with -threads for the operations that process each
+# input feature against the method features that it intersects. The method
+# layer is read once into an in-memory R-tree, and chunks of input features
+# are processed by worker threads. The result features are written in the
+# same order as the OGRLayer methods do.
+
+OVERLAY_OPERATIONS = ("Intersection", "Identity", "Clip", "Erase")
+OVERLAY_CHUNK_SIZE = 256
+OVERLAY_TRANSACTION_SIZE = 100000
+
+
+def GetOption(opt, name, default=None):
+    for val in opt:
+        if val.lower().find(name.lower() + "=") == 0:
+            return val[len(name) + 1 :]
+    return default
+
+
+def TestBoolOption(opt, name, default):
+    # same rule as CPLTestBool()
+    return GetOption(opt, name, default).upper() not in ("NO", "FALSE", "OFF", "0")
+
+
+def CopyFieldDefn(src_fld_defn, name):
+    """Return a copy of a field definition with another name, as the
+    OGRFieldDefn copy constructor does"""
+    fld_defn = ogr.FieldDefn(name, src_fld_defn.GetType())
+    fld_defn.SetAlternativeName(src_fld_defn.GetAlternativeName())
+    fld_defn.SetSubType(src_fld_defn.GetSubType())
+    fld_defn.SetJustify(src_fld_defn.GetJustify())
+    fld_defn.SetWidth(src_fld_defn.GetWidth())
+    fld_defn.SetPrecision(src_fld_defn.GetPrecision())
+    fld_defn.SetDefault(src_fld_defn.GetDefault())
+    fld_defn.SetNullable(src_fld_defn.IsNullable())
+    fld_defn.SetUnique(src_fld_defn.IsUnique())
+    fld_defn.SetDomainName(src_fld_defn.GetDomainName())
+    return fld_defn
+
+
+def SetResultSchema(output_lyr, input_lyr, method_lyr, combined, opt):
+    """Return the maps from the input and method fields to the output fields,
+    creating the output fields if the output layer has none (as the OGRLayer
+    methods do), or None in case of error"""
+    input_defn = input_lyr.GetLayerDefn()
+    method_defn = method_lyr.GetLayerDefn() if combined else None
+    output_defn = output_lyr.GetLayerDefn()
+    input_prefix = GetOption(opt, "INPUT_PREFIX")
+    method_prefix = GetOption(opt, "METHOD_PREFIX")
+    skip_failures = TestBoolOption(opt, "SKIP_FAILURES", "NO")
+
+    input_names = [
+        input_defn.GetFieldDefn(idx).GetName()
+        for idx in range(input_defn.GetFieldCount())
+    ]
+    method_names = []
+    if method_defn is not None:
+        method_names = [
+            method_defn.GetFieldDefn(idx).GetName()
+            for idx in range(method_defn.GetFieldCount())
+        ]
+
+    if output_defn.GetFieldCount() > 0:
+        # The schema of the output layer is already defined
+        input_map = [
+            output_defn.GetFieldIndex((input_prefix or "") + name)
+            for name in input_names
+        ]
+        method_map = None
+        if method_defn is not None:
+            method_map = [
+                output_defn.GetFieldIndex((method_prefix or "") + name)
+                for name in method_names
+            ]
+        return input_map, method_map
+
+    def create_fields(defn, names, prefix, other_names, default_prefix, first_idx):
+        field_map = []
+        for idx, name in enumerate(names):
+            if prefix is not None:
+                name = prefix + name
+            elif (
+                input_prefix is None and method_prefix is None and (name in other_names)
+            ):
+                name = default_prefix + name
+            fld_defn = CopyFieldDefn(defn.GetFieldDefn(idx), name)
+            if output_lyr.CreateField(fld_defn) != 0 and not skip_failures:
+                return None
+            field_map.append(first_idx + idx)
+        return field_map
+
+    input_map = create_fields(
+        input_defn, input_names, input_prefix, method_names, "input_", 0
+    )
+    if input_map is None:
+        return None
+    method_map = None
+    if method_defn is not None:
+        method_map = create_fields(
+            method_defn,
+            method_names,
+            method_prefix,
+            input_names,
+            "method_",
+            len(input_names),
+        )
+        if method_map is None:
+            return None
+    return input_map, method_map
+
+
+def OverlayFeature(op_str, x_geom, candidates, params):
+    """Return the list of (method feature or None, result geometry) resulting
+    from the overlay of an input geometry with the method features whose
+    bounding box intersects it, or None in case of error"""
+    skip_failures = params["skip_failures"]
+
+    prepared_geom = None
+    if params["use_prepared_geometries"]:
+        prepared_geom = x_geom.CreatePreparedGeometry()
+    if prepared_geom is not None:
+        intersects = prepared_geom.Intersects
+    else:
+        intersects = x_geom.Intersects
+    candidates = [(y, y_geom) for y, y_geom in candidates if intersects(y_geom)]
+
+    def is_lower_dimension(z_geom, y_geom):
+        return (
+            not params["keep_lower_dimension_geometries"]
+            and x_geom.GetDimension() == y_geom.GetDimension()
+            and z_geom.GetDimension() < x_geom.GetDimension()
+        )
+
+    results = []
+    if op_str == "Intersection":
+        for y, y_geom in candidates:
+            if (
+                prepared_geom is not None
+                and params["pretest_containment"]
+                and prepared_geom.Contains(y_geom)
+            ):
+                results.append((y, y_geom.Clone()))
+                continue
+            z_geom = x_geom.Intersection(y_geom)
+            if z_geom is None:
+                if not skip_failures:
+                    return None
+                continue
+            if z_geom.IsEmpty() or is_lower_dimension(z_geom, y_geom):
+                continue
+            results.append((y, z_geom))
+
+    elif op_str == "Identity":
+        diff_geom = x_geom.Clone()
+        for y, y_geom in candidates:
+            z_geom = x_geom.Intersection(y_geom)
+            if z_geom is None:
+                if not skip_failures:
+                    return None
+                continue
+            if z_geom.IsEmpty() or is_lower_dimension(z_geom, y_geom):
+                continue
+            results.append((y, z_geom))
+            new_diff_geom = diff_geom.Difference(y_geom)
+            if new_diff_geom is None:
+                if not skip_failures:
+                    return None
+            else:
+                diff_geom = new_diff_geom
+        if not diff_geom.IsEmpty():
+            results.append((None, diff_geom))
+
+    elif op_str == "Clip":
+        union_geom = None
+        for _, y_geom in candidates:
+            if union_geom is None:
+                union_geom = y_geom.Clone()
+            else:
+                new_union_geom = union_geom.Union(y_geom)
+                if new_union_geom is None:
+                    if not skip_failures:
+                        return None
+                else:
+                    union_geom = new_union_geom
+        if union_geom is not None:
+            z_geom = x_geom.Intersection(union_geom)
+            if z_geom is None:
+                if not skip_failures:
+                    return None
+            elif not z_geom.IsEmpty():
+                results.append((None, z_geom))
+
+    elif op_str == "Erase":
+        diff_geom = x_geom.Clone()
+        for _, y_geom in candidates:
+            new_diff_geom = diff_geom.Difference(y_geom)
+            if new_diff_geom is None:
+                if not skip_failures:
+                    return None
+            else:
+                diff_geom = new_diff_geom
+                if diff_geom.IsEmpty():
+                    break
+        if not diff_geom.IsEmpty():
+            results.append((None, diff_geom))
+
+    return results
+
+
+def OverlayChunk(op_str, chunk, rtree, params):
+    """Overlay a chunk of input features, and return the list of
+    (input feature, results) pairs, or None in case of error"""
+    chunk_results = []
+    for x in chunk:
+        x_geom = x.GetGeometryRef()
+        if x_geom is None:
+            continue
+        min_x, max_x, min_y, max_y = x_geom.GetEnvelope()
+        candidates = rtree.query(min_x, min_y, max_x, max_y)
+        if not candidates and op_str in ("Intersection", "Clip"):
+            continue
+        results = OverlayFeature(op_str, x_geom, candidates, params)
+        if results is None:
+            return None
+        chunk_results.append((x, results))
+    return chunk_results
+
+
+def PromoteToMulti(geom):
+    geom_type = ogr.GT_Flatten(geom.GetGeometryType())
+    if geom_type == ogr.wkbPolygon:
+        return ogr.ForceToMultiPolygon(geom)
+    if geom_type == ogr.wkbLineString:
+        return ogr.ForceToMultiLineString(geom)
+    return geom
+
+
+def Overlay(op_str, input_lyr, method_lyr, output_lyr, opt, num_threads, callback=None):
+    """Equivalent of input_lyr.Intersection/Identity/Clip/Erase(method_lyr,
+    output_lyr, options=opt), that uses num_threads worker threads.
+    Returns 0 on success"""
+    params = {
+        "skip_failures": TestBoolOption(opt, "SKIP_FAILURES", "NO"),
+        "use_prepared_geometries": TestBoolOption(
+            opt, "USE_PREPARED_GEOMETRIES", "YES"
+        ),
+        "pretest_containment": TestBoolOption(opt, "PRETEST_CONTAINMENT", "NO"),
+        "keep_lower_dimension_geometries": TestBoolOption(
+            opt, "KEEP_LOWER_DIMENSION_GEOMETRIES", "YES"
+        )
+        and output_lyr.GetGeomType() == ogr.wkbUnknown,
+    }
+    promote_to_multi = TestBoolOption(opt, "PROMOTE_TO_MULTI", "NO")
+    skip_failures = params["skip_failures"]
+
+    field_maps = SetResultSchema(
+        output_lyr,
+        input_lyr,
+        method_lyr,
+        op_str in ("Intersection", "Identity"),
+        opt,
+    )
+    if field_maps is None:
+        return 1
+    input_map, method_map = field_maps
+    output_defn = output_lyr.GetLayerDefn()
+
+    items = []
+    for y in method_lyr:
+        y_geom = y.GetGeometryRef()
+        if y_geom is not None and not y_geom.IsEmpty():
+            min_x, max_x, min_y, max_y = y_geom.GetEnvelope()
+            items.append(((min_x, min_y, max_x, max_y), (y, y_geom)))
+    rtree = RTree(items)
+    items = None
+
+    use_transactions = output_lyr.TestCapability(ogr.OLCTransactions)
+    written_in_transaction = 0
+    if use_transactions:
+        output_lyr.StartTransaction()
+
+    def write(chunk_results):
+        nonlocal written_in_transaction
+        for x, results in chunk_results:
+            for y, z_geom in results:
+                z = ogr.Feature(output_defn)
+                z.SetFromWithMap(x, 1, input_map)
+                if y is not None:
+                    z.SetFromWithMap(y, 1, method_map)
+                if promote_to_multi:
+                    z_geom = PromoteToMulti(z_geom)
+                z.SetGeometryDirectly(z_geom)
+                if output_lyr.CreateFeature(z) != 0 and not skip_failures:
+                    return False
+                if use_transactions:
+                    written_in_transaction += 1
+                    if written_in_transaction == OVERLAY_TRANSACTION_SIZE:
+                        output_lyr.CommitTransaction()
+                        output_lyr.StartTransaction()
+                        written_in_transaction = 0
+        return True
+
+    feature_count = input_lyr.GetFeatureCount(force=0)
+    processed_count = 0
+    ret = 0
+    with ThreadPoolExecutor(max_workers=num_threads) as executor:
+        # Results are consumed in submission order, with a bounded number of
+        # chunks in flight
+        pending = deque()
+
+        def consume():
+            nonlocal processed_count
+            future, chunk_size = pending.popleft()
+            chunk_results = future.result()
+            if chunk_results is None or not write(chunk_results):
+                return False
+            processed_count += chunk_size
+            if callback and feature_count > 0:
+                if not callback(min(1.0, processed_count / feature_count), "", None):
+                    print("User terminated")
+                    return False
+            return True
+
+        chunk = []
+        input_lyr.ResetReading()
+        for x in input_lyr:
+            chunk.append(x)
+            if len(chunk) == OVERLAY_CHUNK_SIZE:
+                pending.append(
+                    (
+                        executor.submit(OverlayChunk, op_str, chunk, rtree, params),
+                        len(chunk),
+                    )
+                )
+                chunk = []
+                if len(pending) >= 2 * num_threads and not consume():
+                    ret = 1
+                    break
+        if ret == 0 and chunk:
+            pending.append(
+                (
+                    executor.submit(OverlayChunk, op_str, chunk, rtree, params),
+                    len(chunk),
+                )
+            )
+        while ret == 0 and pending:
+            if not consume():
+                ret = 1
+        for future, _ in pending:
+            future.cancel()
+
+    if use_transactions:
+        output_lyr.CommitTransaction()
+
+    if ret == 0 and callback:
+        callback(1.0, "", None)
+
+    return ret
+
+
 ###############################################################################
 
 
@@ -185,6 +549,7 @@ def main(argv=sys.argv):
     geom_type = ogr.wkbUnknown
     srs_name = None
     srs = None
+    num_threads = None
 
     argv = ogr.GeneralCmdLineProcessor(argv)
     if argv is None:
@@ -299,6 +664,13 @@ def main(argv=sys.argv):
             i = i + 1
             srs_name = argv[i]
 
+        elif arg == "-threads" and i + 1 < len(argv):
+            i = i + 1
+            if EQUAL(argv[i], "ALL_CPUS"):
+                num_threads = os.cpu_count() or 1
+            else:
+                num_threads = int(argv[i])
+
         elif EQUAL(arg, "Union"):
             op_str = "Union"
 
@@ -530,11 +902,26 @@ def main(argv=sys.argv):
                 if output_lyr is None:
                     return 1
 
-    op = getattr(input_lyr, op_str)
-    if not quiet:
-        ret = op(method_lyr, output_lyr, options=opt, callback=gdal.TermProgress_nocb)
+    if num_threads is not None and op_str in OVERLAY_OPERATIONS:
+        ret = Overlay(
+            op_str,
+            input_lyr,
+            method_lyr,
+            output_lyr,
+            opt,
+            max(1, num_threads),
+            callback=None if quiet else gdal.TermProgress_nocb,
+        )
     else:
-        ret = op(method_lyr, output_lyr, options=opt)
+        if num_threads is not None:
+            print("Warning: -threads is ignored for the %s operation" % op_str)
+        op = getattr(input_lyr, op_str)
+        if not quiet:
+            ret = op(
+                method_lyr, output_lyr, options=opt, callback=gdal.TermProgress_nocb
+            )
+        else:
+            ret = op(method_lyr, output_lyr, options=opt)
 
     input_ds = None
     method_ds = None
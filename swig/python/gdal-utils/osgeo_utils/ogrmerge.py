@@ -33,7 +33,10 @@
 import glob
 import os
 import os.path
+import shutil
 import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import Optional, Sequence
 
 from osgeo import gdal, ogr, osr
@@ -48,7 +51,7 @@ def Usage():
     print("            [-src_geom_type geom_type_name[,geom_type_name]*]")
     print("            [-dsco NAME=VALUE]* [-lco NAME=VALUE]*")
     print("            [-s_srs srs_def] [-t_srs srs_def | -a_srs srs_def]")
-    print("            [-progress] [-skipfailures] [--help-general]")
+    print("            [-threads n] [-progress] [-skipfailures] [--help-general]")
     print("")
     print("Options specific to -single:")
     print("            [-field_strategy FirstLayer|Union|Intersection]")
@@ -183,6 +186,7 @@ def process(argv, progress=None, progress_arg=None):
     t_srs = None
     dsco = []
     lco = []
+    num_threads = 1
     # WARNING: if adding a new option, make sure to update _gpkg_ogrmerge()
     # optimized code path, or use the general case.
 
@@ -223,6 +227,9 @@ def process(argv, progress=None, progress_arg=None):
         elif arg == "-t_srs" and i + 1 < len(argv):
             i = i + 1
             t_srs = argv[i]
+        elif arg == "-threads" and i + 1 < len(argv):
+            i = i + 1
+            num_threads = int(argv[i])
         elif arg == "-nln" and i + 1 < len(argv):
             i = i + 1
             layer_name_template = argv[i]
@@ -284,6 +291,7 @@ def process(argv, progress=None, progress_arg=None):
         t_srs=t_srs,
         dsco=dsco,
         lco=lco,
+        num_threads=num_threads,
         progress_callback=progress,
         progress_arg=progress_arg,
     )
@@ -472,10 +480,70 @@ def _gpkg_get_srs_id(ds, lyr):
     return srs_id
 
 
+#############################################################################
+# Convert the non-geopackage sources to temporary geopackages, in parallel,
+# so that they can be merged with the optimized geopackage code path.
+# Returns a dictionary mapping source names to staged file names, or None
+# in case of error.
+
+
+def _gpkg_stage_sources(
+    src_datasets, staging_dir, num_threads, skip_failures, progress_callback
+):
+
+    to_stage = [
+        src_dsname
+        for src_dsname in dict.fromkeys(src_datasets)
+        if not src_dsname.lower().endswith(".gpkg")
+    ]
+
+    def stage(idx, src_dsname):
+        staged_filename = os.path.join(staging_dir, "%d.gpkg" % idx)
+        # The spatial index is created after the merge in the target dataset
+        try:
+            ds = gdal.VectorTranslate(
+                staged_filename,
+                src_dsname,
+                format="GPKG",
+                layerCreationOptions=["SPATIAL_INDEX=NO"],
+                skipFailures=skip_failures,
+            )
+        except RuntimeError as e:
+            print("ERROR: %s" % str(e))
+            ds = None
+        if ds is None:
+            return None
+        ds = None
+        return staged_filename
+
+    staged_datasets = {}
+    with ThreadPoolExecutor(max_workers=num_threads) as executor:
+        futures = {
+            executor.submit(stage, idx, src_dsname): src_dsname
+            for idx, src_dsname in enumerate(to_stage)
+        }
+        for count, future in enumerate(as_completed(futures)):
+            src_dsname = futures[future]
+            staged_filename = future.result()
+            if staged_filename is None:
+                print("ERROR: Cannot convert %s to GeoPackage" % src_dsname)
+                if not skip_failures:
+                    for other in futures:
+                        other.cancel()
+                    return None
+            else:
+                staged_datasets[src_dsname] = staged_filename
+            if progress_callback:
+                progress_callback((count + 1) / len(futures))
+
+    return staged_datasets
+
+
 #############################################################################
 # Optimized implementation of general case for geopackage output, that can be used only:
 # - in non-single mode
-# - when all sources are geopackages
+# - when all sources are geopackages, or have been staged as geopackages
+#   by _gpkg_stage_sources()
 # - for a newly created dataset
 
 
@@ -493,8 +561,10 @@ def _gpkg_ogrmerge(
     lco: Optional[Sequence[str]] = None,
     progress_callback: Optional = None,
     progress_arg: Optional = None,
+    staged_datasets: Optional[dict] = None,
 ):
 
+    staged_datasets = staged_datasets or {}
     driver_name = "GPKG"
     drv = gdal.GetDriverByName(driver_name)
     if drv is None:
@@ -534,11 +604,28 @@ def _gpkg_ogrmerge(
     estimated_final_size = 0
     if progress_callback:
         estimated_final_size = _gpkg_get_estimated_final_size(
-            src_datasets, src_geom_types, can_reuse_spatial_index
+            [
+                staged_datasets.get(x, x)
+                for x in src_datasets
+                if x in staged_datasets or x.lower().endswith(".gpkg")
+            ],
+            src_geom_types,
+            can_reuse_spatial_index,
         )
 
+    # Spatial indices that must be (re)created are only built once all the
+    # layers have been copied
+    spatial_indices_to_create = []
+
     for src_ds_idx, src_dsname in enumerate(src_datasets):
-        src_ds = ogr.Open(src_dsname)
+        if src_dsname in staged_datasets:
+            src_filename = staged_datasets[src_dsname]
+        elif src_dsname.lower().endswith(".gpkg"):
+            src_filename = src_dsname
+        else:
+            # Staging failed and was skipped
+            continue
+        src_ds = ogr.Open(src_filename)
         if src_ds is None:
             print("ERROR: Cannot open %s" % src_dsname)
             if skip_failures:
@@ -682,7 +769,7 @@ def _gpkg_ogrmerge(
                     )
 
             dst_ds.ExecuteSQL(
-                "ATTACH DATABASE '%s' AS source_db" % _quote_literal(src_dsname)
+                "ATTACH DATABASE '%s' AS source_db" % _quote_literal(src_filename)
             )
 
             threaded_progress = None
@@ -797,26 +884,25 @@ def _gpkg_ogrmerge(
                 dst_ds.ExecuteSQL(sql)
 
             if recreateSpatialIndex:
-                # print("Recreating spatial index")
-                dst_ds.ReleaseResultSet(
-                    dst_ds.ExecuteSQL(
-                        "SELECT DisableSpatialIndex('%s', '%s')"
-                        % (
-                            _quote_literal(lyr.GetName()),
-                            _quote_literal(lyr.GetGeometryColumn()),
-                        )
-                    )
-                )
-                dst_ds.ReleaseResultSet(
-                    dst_ds.ExecuteSQL(
-                        "SELECT CreateSpatialIndex('%s', '%s')"
-                        % (
-                            _quote_literal(lyr.GetName()),
-                            _quote_literal(lyr.GetGeometryColumn()),
-                        )
-                    )
+                spatial_indices_to_create.append(
+                    (lyr.GetName(), lyr.GetGeometryColumn())
                 )
 
+    for table_name, column_name in spatial_indices_to_create:
+        # print("Recreating spatial index")
+        dst_ds.ReleaseResultSet(
+            dst_ds.ExecuteSQL(
+                "SELECT DisableSpatialIndex('%s', '%s')"
+                % (_quote_literal(table_name), _quote_literal(column_name))
+            )
+        )
+        dst_ds.ReleaseResultSet(
+            dst_ds.ExecuteSQL(
+                "SELECT CreateSpatialIndex('%s', '%s')"
+                % (_quote_literal(table_name), _quote_literal(column_name))
+            )
+        )
+
     if progress_callback:
         progress_callback(1.0, "", progress_arg)
 
@@ -843,6 +929,7 @@ def ogrmerge(
     t_srs: Optional[str] = None,
     dsco: Optional[Sequence[str]] = None,
     lco: Optional[Sequence[str]] = None,
+    num_threads: int = 1,
     progress_callback: Optional = None,
     progress_arg: Optional = None,
 ):
@@ -907,6 +994,15 @@ def ogrmerge(
                             # shouldn't happen for now...
                             print("Code is not ready for multi-geometry column GPKG")
                             return False
+                elif num_threads > 1:
+                    # Can be staged as a geopackage if it has at most one
+                    # geometry column per layer
+                    src_ds = ogr.Open(src_dsname)
+                    if src_ds is None:
+                        return False
+                    for src_lyr in src_ds:
+                        if src_lyr.GetLayerDefn().GetGeomFieldCount() > 1:
+                            return False
                 else:
                     return False
             return True
@@ -920,21 +1016,54 @@ def ogrmerge(
                     compat_of_gpkg_optim = False
 
         if compat_of_gpkg_optim:
-            return _gpkg_ogrmerge(
-                src_datasets,
-                dst_filename,
-                driver_name,
-                layer_name_template,
-                skip_failures,
-                src_geom_types,
-                a_srs,
-                s_srs,
-                t_srs,
-                dsco,
-                lco,
-                progress_callback,
-                progress_arg,
-            )
+            staged_datasets = {}
+            staging_dir = None
+            gpkg_progress_callback = progress_callback
+            try:
+                if num_threads > 1 and not all(
+                    x.lower().endswith(".gpkg") for x in src_datasets
+                ):
+                    # First half of the progress for the staging, second
+                    # half for the merge
+                    staging_progress_callback = None
+                    if progress_callback:
+
+                        def staging_progress_callback(pct):
+                            progress_callback(0.5 * pct, "", progress_arg)
+
+                        def gpkg_progress_callback(pct, msg, arg):
+                            progress_callback(0.5 + 0.5 * pct, msg, arg)
+
+                    staging_dir = tempfile.mkdtemp(prefix="ogrmerge_")
+                    staged_datasets = _gpkg_stage_sources(
+                        src_datasets,
+                        staging_dir,
+                        num_threads,
+                        skip_failures,
+                        staging_progress_callback,
+                    )
+                    if staged_datasets is None:
+                        return 1
+
+                return _gpkg_ogrmerge(
+                    src_datasets,
+                    dst_filename,
+                    driver_name,
+                    layer_name_template,
+                    skip_failures,
+                    src_geom_types,
+                    a_srs,
+                    s_srs,
+                    t_srs,
+                    dsco,
+                    lco,
+                    gpkg_progress_callback,
+                    progress_arg,
+                    staged_datasets,
+                )
+            finally:
+                if staging_dir:
+                    shutil.rmtree(staging_dir, ignore_errors=True)
 
     vrt_filename = None
     if not EQUAL(driver_name, "VRT"):
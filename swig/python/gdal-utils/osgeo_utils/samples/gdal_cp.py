@@ -32,6 +32,9 @@ import fnmatch
 import os
 import stat
 import sys
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 
 from osgeo import gdal
 
@@ -44,8 +47,23 @@ def needsVSICurl(filename):
     )
 
 
+# Virtual file systems on which VSISync() transfers large files by chunks in
+# parallel (ranged downloads and multipart uploads)
+CHUNKED_TRANSFER_PREFIXES = ("/vsis3/", "/vsigs/", "/vsiaz/", "/vsiadls/")
+
+# Files at least this large are transferred by chunks in -j mode (the default
+# chunk size of VSISync())
+LARGE_FILE_SIZE = 8 * 1024 * 1024
+
+
 def Usage():
-    print("Usage: gdal_cp [-progress] [-r] [-skipfailures] source_file target_file")
+    print(
+        "Usage: gdal_cp [-progress] [-r] [-skipfailures] [-j n] source_file target_file"
+    )
+    print("")
+    print("-j n: copy up to n files concurrently, listing the source directory")
+    print("      once. Large files from or to /vsis3/, /vsigs/, /vsiaz/ or")
+    print("      /vsiadls/ are transferred by chunks in n threads.")
     return 2
 
 
@@ -61,7 +79,33 @@ class ScaledProgress(object):
         )
 
 
-def gdal_cp_single(srcfile, targetfile, progress):
+class SharedProgress(object):
+    """Progress of concurrent copies, as the fraction of their total size"""
+
+    def __init__(self, total_size, UnderlyingProgress):
+        self.total_size = total_size
+        self.done_size = 0
+        self.UnderlyingProgress = UnderlyingProgress
+        self.lock = threading.Lock()
+
+    def GetFileProgress(self, size):
+        """Return the progress callback of the copy of a file of this size"""
+        file_done_size = 0
+
+        def Progress(dfComplete, message, user_data):
+            nonlocal file_done_size
+            with self.lock:
+                new_done_size = int(dfComplete * size)
+                self.done_size += new_done_size - file_done_size
+                file_done_size = new_done_size
+                return self.UnderlyingProgress(
+                    self.done_size * 1.0 / self.total_size, message, user_data
+                )
+
+        return Progress
+
+
+def gdal_cp_single(srcfile, targetfile, progress, num_threads=None):
     if targetfile.endswith("/"):
         stat_res = gdal.VSIStatL(targetfile)
     else:
@@ -76,6 +120,18 @@ def gdal_cp_single(srcfile, targetfile, progress):
         else:
             targetfile = targetfile + "/" + tail
 
+    if num_threads is not None and (
+        srcfile.startswith(CHUNKED_TRANSFER_PREFIXES)
+        or targetfile.startswith(CHUNKED_TRANSFER_PREFIXES)
+    ):
+        stat_res = gdal.VSIStatL(srcfile)
+        if stat_res is None:
+            print("Cannot open %s" % srcfile)
+            return -1
+        return gdal_cp_copy_file(
+            srcfile, targetfile, stat_res.size, progress, num_threads
+        )
+
     fin = gdal.VSIFOpenL(srcfile, "rb")
     if fin is None:
         print("Cannot open %s" % srcfile)
@@ -118,6 +174,154 @@ def gdal_cp_recurse(srcdir, targetdir, progress, skip_failure):
     return 0
 
 
+def is_chunked_transfer(srcfile, targetfile, size, num_threads):
+    return (
+        num_threads > 1
+        and size >= LARGE_FILE_SIZE
+        and (
+            srcfile.startswith(CHUNKED_TRANSFER_PREFIXES)
+            or targetfile.startswith(CHUNKED_TRANSFER_PREFIXES)
+        )
+    )
+
+
+def gdal_cp_copy_file(srcfile, targetfile, size, progress, num_threads):
+    if is_chunked_transfer(srcfile, targetfile, size, num_threads):
+        ok = gdal.Sync(
+            srcfile,
+            targetfile,
+            options=["SYNC_STRATEGY=OVERWRITE", "NUM_THREADS=%d" % num_threads],
+            callback=progress,
+        )
+        return 0 if ok else -1
+
+    return gdal.CopyFile(srcfile, targetfile, nSourceSize=size, callback=progress)
+
+
+def gdal_cp_parallel(copies, progress, skip_failure, num_threads, max_copies=None):
+    """Copy the (srcfile, targetfile, size) files of copies in num_threads
+    threads, running at most max_copies (num_threads by default) copies at
+    once"""
+
+    if max_copies is None:
+        max_copies = num_threads
+
+    if progress is not None:
+        shared_progress = SharedProgress(
+            max(1, sum(size for _, _, size in copies)), progress
+        )
+        progress(0.0, "", None)
+
+    # large files are transferred one at a time after the others, by chunks in
+    # num_threads threads, so that no more than num_threads transfers run at
+    # once. Serialized copies (max_copies of 1) are all done in order.
+    large_copies = []
+    if max_copies > 1:
+        large_copies = [
+            copy for copy in copies if is_chunked_transfer(*copy, num_threads)
+        ]
+        copies = [
+            copy for copy in copies if not is_chunked_transfer(*copy, num_threads)
+        ]
+    copy_threads = max(1, num_threads // max_copies)
+
+    failed = False
+
+    def check(ret):
+        nonlocal failed
+        if ret == -2 or (ret == -1 and not skip_failure):
+            failed = True
+
+    with ThreadPoolExecutor(max_workers=max_copies) as executor:
+        pending = deque()
+        for srcfile, targetfile, size in copies:
+            if failed:
+                break
+            file_progress = None
+            if progress is not None:
+                file_progress = shared_progress.GetFileProgress(size)
+            pending.append(
+                executor.submit(
+                    gdal_cp_copy_file,
+                    srcfile,
+                    targetfile,
+                    size,
+                    file_progress,
+                    copy_threads,
+                )
+            )
+            if len(pending) >= 2 * max_copies:
+                check(pending.popleft().result())
+
+        while pending:
+            check(pending.popleft().result())
+
+    for srcfile, targetfile, size in large_copies:
+        if failed:
+            break
+        file_progress = None
+        if progress is not None:
+            file_progress = shared_progress.GetFileProgress(size)
+        check(gdal_cp_copy_file(srcfile, targetfile, size, file_progress, num_threads))
+
+    return -1 if failed else 0
+
+
+def gdal_cp_list_dir(srcdir, recurse):
+    """Return the (name, is_dir, size) entries of srcdir, with the names
+    relative to srcdir, from a single listing, or None"""
+
+    d = gdal.OpenDir(srcdir, -1 if recurse else 0)
+    if d is None:
+        return None
+
+    entries = []
+    while True:
+        entry = gdal.GetNextDirEntry(d)
+        if entry is None:
+            break
+        if entry.modeKnown and entry.sizeKnown:
+            is_dir = stat.S_ISDIR(entry.mode)
+            size = entry.size
+        else:
+            statBuf = gdal.VSIStatL(srcdir + "/" + entry.name)
+            if statBuf is None:
+                continue
+            is_dir = statBuf.IsDirectory()
+            size = statBuf.size
+        entries.append((entry.name, is_dir, 0 if is_dir else size))
+    gdal.CloseDir(d)
+
+    return entries
+
+
+def gdal_cp_recurse_parallel(srcdir, targetdir, progress, skip_failure, num_threads):
+
+    if srcdir[-1] == "/":
+        srcdir = srcdir[0 : len(srcdir) - 1]
+    entries = gdal_cp_list_dir(srcdir, True)
+    if entries is None:
+        print("%s is not a directory" % srcdir)
+        return -1
+
+    if gdal.VSIStatL(targetdir) is None:
+        gdal.Mkdir(targetdir, int("0755", 8))
+
+    # create the target directories, including the ones of object storages
+    # that are only implied by the names of the files
+    created_dirs = set([""])
+    copies = []
+    for name, is_dir, size in entries:
+        subdir = name if is_dir else name[0 : max(0, name.rfind("/"))]
+        if subdir not in created_dirs:
+            gdal.MkdirRecursive(targetdir + "/" + subdir, int("0755", 8))
+            created_dirs.add(subdir)
+        if not is_dir:
+            copies.append((srcdir + "/" + name, targetdir + "/" + name, size))
+
+    return gdal_cp_parallel(copies, progress, skip_failure, num_threads)
+
+
 def gdal_cp_pattern_match(srcdir, pattern, targetfile, progress, skip_failure):
 
     if srcdir == "":
@@ -180,21 +384,70 @@ def gdal_cp_pattern_match(srcdir, pattern, targetfile, progress, skip_failure):
     return 0
 
 
+def gdal_cp_pattern_match_parallel(
+    srcdir, pattern, targetfile, progress, skip_failure, num_threads
+):
+
+    if srcdir == "":
+        srcdir = "."
+
+    entries = gdal_cp_list_dir(srcdir, False)
+    if entries is None:
+        print("Cannot read directory %s" % srcdir)
+        return -1
+
+    targetdir = None
+    if targetfile.endswith("/"):
+        targetdir = targetfile[0:-1]
+    else:
+        stat_res = gdal.VSIStatL(targetfile + "/")
+        if stat_res is not None and stat.S_ISDIR(stat_res.mode):
+            targetdir = targetfile
+
+    copies = []
+    for filename, is_dir, size in entries:
+        if is_dir:
+            continue
+        if srcdir != ".":
+            srcfile = srcdir + "/" + filename
+        else:
+            srcfile = filename
+        if fnmatch.fnmatch(srcfile, pattern):
+            if targetdir is not None:
+                copies.append((srcfile, targetdir + "/" + filename, size))
+            else:
+                copies.append((srcfile, targetfile, size))
+
+    if progress is not None and sum(size for _, _, size in copies) == 0:
+        return -1
+
+    # all the files are copied to the same target file: one after the other,
+    # like without -j
+    max_copies = num_threads if targetdir is not None else 1
+
+    return gdal_cp_parallel(copies, progress, skip_failure, num_threads, max_copies)
+
+
 def gdal_cp(argv, progress=None):
     srcfile = None
     targetfile = None
     recurse = False
     skip_failure = False
+    num_threads = None
 
     argv = gdal.GeneralCmdLineProcessor(argv)
     if argv is None:
         return -1
 
-    for i in range(1, len(argv)):
+    i = 1
+    while i < len(argv):
         if argv[i] == "-progress":
             progress = gdal.TermProgress_nocb
         elif argv[i] == "-r":
             recurse = True
+        elif argv[i] == "-j" and i + 1 < len(argv):
+            i = i + 1
+            num_threads = max(1, int(argv[i]))
         elif len(argv[i]) >= 5 and argv[i][0:5] == "-skip":
             skip_failure = True
         elif argv[i][0] == "-":
@@ -207,6 +460,7 @@ def gdal_cp(argv, progress=None):
         else:
             print("Unexpected option : %s" % argv[i])
             return Usage()
+        i = i + 1
 
     if srcfile is None or targetfile is None:
         return Usage()
@@ -245,14 +499,22 @@ def gdal_cp(argv, progress=None):
             if gdal.VSIStatL(targetfile) is None:
                 gdal.Mkdir(targetfile, int("0755", 8))
 
+        if num_threads is not None:
+            return gdal_cp_recurse_parallel(
+                srcfile, targetfile, progress, skip_failure, num_threads
+            )
         return gdal_cp_recurse(srcfile, targetfile, progress, skip_failure)
 
     (srcdir, pattern) = os.path.split(srcfile)
     if not srcdir.startswith("/vsi") and ("*" in pattern or "?" in pattern):
+        if num_threads is not None:
+            return gdal_cp_pattern_match_parallel(
+                srcdir, pattern, targetfile, progress, skip_failure, num_threads
+            )
         return gdal_cp_pattern_match(
             srcdir, pattern, targetfile, progress, skip_failure
         )
-    return gdal_cp_single(srcfile, targetfile, progress)
+    return gdal_cp_single(srcfile, targetfile, progress, num_threads)
 
 
 def main(argv=sys.argv):
@@ -57,9 +57,10 @@ def istgz(filename):
     )
 
 
-def display_file(fout, dirname, prefix, filename, longformat, check_open=False):
+def display_file(
+    fout, dirname, prefix, filename, longformat, check_open=False, statBuf=None
+):
 
-    statBuf = None
     filename_displayed = prefix + filename
 
     if dirname.endswith("/"):
@@ -68,7 +69,8 @@ def display_file(fout, dirname, prefix, filename, longformat, check_open=False):
         dirname_with_slash = dirname + "/"
 
     version_num = int(gdal.VersionInfo("VERSION_NUM"))
-    if longformat:
+    # statBuf may already be known from the directory listing
+    if statBuf is None and longformat:
         if version_num >= 1900:
             statBuf = gdal.VSIStatL(
                 dirname_with_slash + filename,
@@ -76,7 +78,7 @@ def display_file(fout, dirname, prefix, filename, longformat, check_open=False):
                 | gdal.VSI_STAT_NATURE_FLAG
                 | gdal.VSI_STAT_SIZE_FLAG,
             )
-    else:
+    elif statBuf is None:
         if version_num >= 1900:
             statBuf = gdal.VSIStatL(
                 dirname_with_slash + filename,
@@ -126,6 +128,17 @@ def display_file(fout, dirname, prefix, filename, longformat, check_open=False):
     fout.write(line)
 
 
+def display_single_file(fout, dirname, longformat):
+
+    (dirname, filename) = os.path.split(dirname)
+    if dirname == "":
+        dirname = "."
+        prefix = ""
+    else:
+        prefix = dirname + "/"
+    display_file(fout, dirname, prefix, filename, longformat, True)
+
+
 def readDir(
     fout,
     dirname,
@@ -153,41 +166,55 @@ def readDir(
         dirname = "/vsitar/" + dirname
         prefix = "/vsitar/" + prefix
 
-    lst = gdal.ReadDir(dirname)
-    if lst is None:
+    # A single listing, recursive if needed, which gives the nature, size and
+    # modification time of the entries without stat'ing them one by one.
+    # Recursive listings of object storages are done in bulk.
+    d = gdal.OpenDir(dirname, depth - 1 if recurse else 0)
+    if d is None:
         if first:
-            original_dirname = dirname
-            (dirname, filename) = os.path.split(dirname)
-            if gdal.ReadDir(dirname) is None:
-                sys.stderr.write("Cannot open %s\n" % original_dirname)
-                return
-            if dirname == "":
-                dirname = "."
-                prefix = ""
-            else:
-                prefix = dirname + "/"
-            display_file(fout, dirname, prefix, filename, longformat, True)
-    else:
-        for filename in lst:
-            if filename == "." or filename == "..":
-                continue
-
-            display_file(fout, dirname, prefix, filename, longformat)
-
-            if recurse:
-                new_prefix = prefix + filename
-                if not new_prefix.endswith("/"):
-                    new_prefix += "/"
-                readDir(
-                    fout,
-                    dirname + "/" + filename,
-                    new_prefix,
-                    longformat,
-                    recurse,
-                    depth - 1,
-                    recurseInZip,
-                    recurseInTGZ,
-                )
+            display_single_file(fout, dirname, longformat)
+        return
+
+    empty = True
+    while True:
+        entry = gdal.GetNextDirEntry(d)
+        if entry is None:
+            break
+        empty = False
+
+        statBuf = None
+        if entry.modeKnown and (
+            not longformat or (entry.sizeKnown and entry.mtimeKnown)
+        ):
+            statBuf = entry
+        display_file(fout, dirname, prefix, entry.name, longformat, False, statBuf)
+
+        # archives are listed as directories of their own
+        if (
+            recurse
+            and not entry.IsDirectory()
+            and (
+                (recurseInZip and iszip(entry.name))
+                or (recurseInTGZ and istgz(entry.name))
+            )
+        ):
+            readDir(
+                fout,
+                dirname + "/" + entry.name,
+                prefix + entry.name + "/",
+                longformat,
+                recurse,
+                depth - 1 - entry.name.count("/"),
+                recurseInZip,
+                recurseInTGZ,
+            )
+
+    gdal.CloseDir(d)
+
+    # an empty directory is displayed itself, as gdal.ReadDir() returns None
+    # for it
+    if empty and first:
+        display_single_file(fout, dirname, longformat)
 
 
 def Usage():
@@ -34,6 +34,11 @@ import sys
 import numpy as np
 
 from osgeo import gdal
+from osgeo_utils.auxiliary.block_processing import (
+    get_block_windows,
+    get_num_workers,
+    process_blocks,
+)
 
 gdal.TermProgress = gdal.TermProgress_nocb
 
@@ -65,7 +70,7 @@ def Usage():
     print(
         """
 Usage: gdal_lut.py src_file [-srcband] [dst_file] [-dstband] -lutfile filename
-                   [-of format] [-co name=value]*
+                   [-of format] [-co name=value]* [-threads {ALL_CPUS|number}]
 
 If dst_file is not specified, the result will be applied back to src_file.
 The text file specified with -lutfile should have one line per LUT entry
@@ -82,6 +87,9 @@ would map input pixel values 0,1,2,3,4,5 to 0,5,11,12,12,13 respectively.
 Values not mapped by the lut file (for instance values 6-255 in the above
 case) will be left unaltered.  Sixteen bit (UInt16) output values are
 supported as well as luts of more than 256 input values.
+
+The raster is processed by windows of whole blocks, which are looked up
+in -threads worker threads (default 1).
 """
     )
     return 2
@@ -95,6 +103,7 @@ def main(argv=sys.argv):
     dst_band_n = 1
     lut_filename = None
     create_options = []
+    num_threads = 1
 
     gdal.AllRegister()
     argv = gdal.GeneralCmdLineProcessor(argv)
@@ -126,6 +135,10 @@ def main(argv=sys.argv):
             i = i + 1
             dst_band_n = int(argv[i])
 
+        elif arg == "-threads":
+            i = i + 1
+            num_threads = get_num_workers(argv[i])
+
         elif src_filename is None:
             src_filename = argv[i]
 
@@ -216,16 +229,25 @@ def main(argv=sys.argv):
     dst_band = dst_ds.GetRasterBand(dst_band_n)
 
     # ----------------------------------------------------------------------------
-    # Do the processing one scanline at a time.
+    # Do the processing one window of blocks at a time.
 
-    gdal.TermProgress(0.0)
-    for iY in range(src_ds.RasterYSize):
-        src_data = src_band.ReadAsArray(0, iY, src_ds.RasterXSize, 1)
+    def read(window):
+        return src_band.ReadAsArray(*window.window)
 
-        dst_data = np.take(lookup, src_data)
-        dst_band.WriteArray(dst_data, 0, iY)
+    def process(src_data):
+        return np.take(lookup, src_data)
 
-        gdal.TermProgress((iY + 1.0) / src_ds.RasterYSize)
+    def write(window, dst_data):
+        dst_band.WriteArray(dst_data, window.xoff, window.yoff)
+
+    process_blocks(
+        get_block_windows(src_band),
+        read,
+        process,
+        write,
+        num_workers=num_threads,
+        progress_callback=gdal.TermProgress,
+    )
 
     src_ds = None
     dst_ds = None
@@ -80,6 +80,57 @@ CoordinateTransformationOrSRS = Optional[
 ]
 
 
+def read_nearest_by_blocks(
+    bands: Sequence[gdal.Band],
+    pixels: np.ndarray,
+    lines: np.ndarray,
+    results: np.ndarray,
+):
+    """
+    Sets results[:, i] to the value of the pixel containing (pixels[i], lines[i]),
+    as a nearest neighbour 1x1 RasterIO() at (pixel - 0.5, line - 0.5) would,
+    but with a single read of each source block that contains some of the points.
+    The results of the points that are outside the raster are left unchanged.
+    """
+    xsize, ysize = bands[0].XSize, bands[0].YSize
+    block_xsize, block_ysize = bands[0].GetBlockSize()
+
+    pixels = np.asarray(pixels, dtype=np.float64)
+    lines = np.asarray(lines, dtype=np.float64)
+    # RasterIO() rejects the windows whose truncated offset is out of the raster
+    with np.errstate(invalid="ignore"):
+        inside = (pixels > -1) & (pixels < xsize) & (lines > -1) & (lines < ysize)
+    point_idx = np.flatnonzero(inside)
+    if not len(point_idx):
+        return
+    # same rounding as the nearest neighbour resampling of RasterIO()
+    eps = 1e-10
+    cols = np.clip(np.floor(pixels[point_idx] + eps), 0, xsize - 1).astype(np.int64)
+    rows = np.clip(np.floor(lines[point_idx] + eps), 0, ysize - 1).astype(np.int64)
+
+    # group the points by the block that contains them
+    blocks_per_row = (xsize + block_xsize - 1) // block_xsize
+    block_ids = (rows // block_ysize) * blocks_per_row + cols // block_xsize
+    order = np.argsort(block_ids, kind="stable")
+    block_ids = block_ids[order]
+    starts = np.flatnonzero(np.diff(block_ids, prepend=-1))
+    ends = np.append(starts[1:], len(block_ids))
+
+    for start, end in zip(starts, ends):
+        block_id = int(block_ids[start])
+        xoff = (block_id % blocks_per_row) * block_xsize
+        yoff = (block_id // blocks_per_row) * block_ysize
+        win_xsize = min(block_xsize, xsize - xoff)
+        win_ysize = min(block_ysize, ysize - yoff)
+        group = order[start:end]
+        block_rows = rows[group] - yoff
+        block_cols = cols[group] - xoff
+        for bnd_idx, band in enumerate(bands):
+            block = band.ReadAsArray(xoff, yoff, win_xsize, win_ysize)
+            if block is not None:
+                results[bnd_idx, point_idx[group]] = block[block_rows, block_cols]
+
+
 def gdallocationinfo(
     filename_or_ds: PathOrDS,
     x: ArrayOrScalarLike,
@@ -192,29 +243,32 @@ def gdallocationinfo(
     else:
         lines_q = y * line_fact
 
-    buf_xsize = buf_ysize = 1
-    buf_type, typecode = GDALTypeCodeAndNumericTypeCodeFromDataSet(ds)
-    buf_obj = np.empty([buf_ysize, buf_xsize], dtype=typecode)
-
-    for idx, (pixel, line) in enumerate(zip(pixels_q, lines_q)):
-        for bnd_idx, band in enumerate(bands):
-            if (
-                BandRasterIONumPy(
-                    band,
-                    0,
-                    pixel - 0.5,
-                    line - 0.5,
-                    1,
-                    1,
-                    buf_obj,
-                    buf_type,
-                    resample_alg,
-                    None,
-                    None,
-                )
-                == 0
-            ):
-                results[bnd_idx][idx] = buf_obj[0][0]
+    if resample_alg == gdalconst.GRIORA_NearestNeighbour:
+        read_nearest_by_blocks(bands, pixels_q, lines_q, results)
+    else:
+        buf_xsize = buf_ysize = 1
+        buf_type, typecode = GDALTypeCodeAndNumericTypeCodeFromDataSet(ds)
+        buf_obj = np.empty([buf_ysize, buf_xsize], dtype=typecode)
+
+        for idx, (pixel, line) in enumerate(zip(pixels_q, lines_q)):
+            for bnd_idx, band in enumerate(bands):
+                if (
+                    BandRasterIONumPy(
+                        band,
+                        0,
+                        pixel - 0.5,
+                        line - 0.5,
+                        1,
+                        1,
+                        buf_obj,
+                        buf_type,
+                        resample_alg,
+                        None,
+                        None,
+                    )
+                    == 0
+                ):
+                    results[bnd_idx][idx] = buf_obj[0][0]
 
     is_scaled, scales, offsets = get_scales_and_offsets(bands)
     if is_scaled:
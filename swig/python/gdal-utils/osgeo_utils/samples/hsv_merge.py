@@ -36,6 +36,11 @@ import sys
 import numpy
 
 from osgeo import gdal
+from osgeo_utils.auxiliary.block_processing import (
+    get_block_windows,
+    get_num_workers,
+    process_blocks,
+)
 
 # =============================================================================
 # rgb_to_hsv()
@@ -109,13 +114,82 @@ def hsv_to_rgb(hsv):
     return rgb
 
 
+# =============================================================================
+# hsv_merge_block()
+#
+# rgb comes in as a [r,g,b] array of shape (3, ysize, xsize) with values in
+# the range [0,255], and hill as a (ysize, xsize) greyscale array. Returns the
+# (3, ysize, xsize) Byte array of the color values using the greyscale values
+# as intensity. Gives the same result as rgb_to_hsv() followed by
+# hsv_to_rgb(), but with in-place computations.
+
+
+def hsv_merge_block(rgb, hill, hill_nodata=None):
+
+    r = rgb[0]
+    g = rgb[1]
+    b = rgb[2]
+
+    # rgb to hsv
+    maxc = numpy.maximum(r, numpy.maximum(g, b)).astype(numpy.float64)
+    delta = maxc - numpy.minimum(r, numpy.minimum(g, b))
+    s = delta / numpy.maximum(maxc, 1.0)
+    # reset zeros to ones to avoid divide by zeros later.
+    delta[delta == 0] = 1.0
+
+    rc = maxc - r
+    rc /= delta
+    gc = maxc - g
+    gc /= delta
+    bc = maxc - b
+    bc /= delta
+
+    h = 4.0 + gc
+    h -= rc
+    numpy.copyto(h, (2.0 + rc) - bc, where=maxc == g)
+    numpy.copyto(h, bc - gc, where=maxc == r)
+    h /= 6.0
+    # h is in [-1/6, 5/6]: equivalent of numpy.mod(h, 1.0)
+    numpy.add(h, 1.0, out=h, where=h < 0)
+
+    # if there's nodata on the hillband, use the v value from the color
+    # dataset instead of the hillshade value.
+    if hill_nodata is not None:
+        v = numpy.where(hill == hill_nodata, maxc, hill)
+    else:
+        v = hill.astype(numpy.float64)
+
+    # hsv to rgb
+    h *= 6.0
+    i = h.astype(int)
+    f = h
+    f -= i
+    p = 1.0 - s
+    p *= v
+    q = s * f
+    numpy.subtract(1.0, q, out=q)
+    q *= v
+    t = 1.0 - f
+    t *= s
+    numpy.subtract(1.0, t, out=t)
+    t *= v
+
+    dst_color = numpy.empty((3,) + h.shape, dtype=numpy.uint8)
+    dst_color[0] = i.choose(v, q, p, p, t, v)
+    dst_color[1] = i.choose(t, v, v, q, p, p)
+    dst_color[2] = i.choose(p, p, t, v, v, q)
+
+    return dst_color
+
+
 # =============================================================================
 # Usage()
 
 
 def Usage():
     print(
-        """Usage: hsv_merge.py [-q] [-of format] src_color src_greyscale dst_color
+        """Usage: hsv_merge.py [-q] [-of format] [-threads {ALL_CPUS|number}]
+                    src_color src_greyscale dst_color
 
 where src_color is a RGB or RGBA dataset,
       src_greyscale is a greyscale dataset (e.g. the result of gdaldem hillshade)
@@ -136,6 +210,7 @@ def main(argv=sys.argv):
     src_greyscale_filename = None
     dst_color_filename = None
     quiet = False
+    num_threads = 1
 
     # Parse command line arguments.
     i = 1
@@ -149,6 +224,10 @@ def main(argv=sys.argv):
         elif arg == "-q" or arg == "-quiet":
             quiet = True
 
+        elif arg == "-threads":
+            i = i + 1
+            num_threads = get_num_workers(argv[i])
+
         elif src_color_filename is None:
             src_color_filename = argv[i]
 
@@ -189,12 +268,10 @@ def main(argv=sys.argv):
 
     # assign RGB and hillshade bands
     rBand = colordataset.GetRasterBand(1)
-    gBand = colordataset.GetRasterBand(2)
-    bBand = colordataset.GetRasterBand(3)
+    # bands 1 to 3 are merged, and the alpha band, if any, copied
+    band_list = [1, 2, 3]
     if colordataset.RasterCount == 4:
-        aBand = colordataset.GetRasterBand(4)
-    else:
-        aBand = None
+        band_list.append(4)
 
     hillband = hilldataset.GetRasterBand(1)
     hillbandnodatavalue = hillband.GetNoDataValue()
@@ -204,46 +281,32 @@ def main(argv=sys.argv):
         print("Color and hillshade must be the same size in pixels.")
         return 1
 
-    # loop over lines to apply hillshade
-    for i in range(hillband.YSize):
-        # load RGB and Hillshade arrays
-        rScanline = rBand.ReadAsArray(0, i, hillband.XSize, 1, hillband.XSize, 1)
-        gScanline = gBand.ReadAsArray(0, i, hillband.XSize, 1, hillband.XSize, 1)
-        bScanline = bBand.ReadAsArray(0, i, hillband.XSize, 1, hillband.XSize, 1)
-        hillScanline = hillband.ReadAsArray(0, i, hillband.XSize, 1, hillband.XSize, 1)
-
-        # convert to HSV
-        hsv = rgb_to_hsv(rScanline, gScanline, bScanline)
-
-        # if there's nodata on the hillband, use the v value from the color
-        # dataset instead of the hillshade value.
-        if hillbandnodatavalue is not None:
-            equal_to_nodata = numpy.equal(hillScanline, hillbandnodatavalue)
-            v = numpy.choose(equal_to_nodata, (hillScanline, hsv[2]))
-        else:
-            v = hillScanline
-
-        # replace v with hillshade
-        hsv_adjusted = numpy.asarray([hsv[0], hsv[1], v])
-
-        # convert back to RGB
-        dst_color = hsv_to_rgb(hsv_adjusted)
-
-        # write out new RGB bands to output one band at a time
-        outband = outdataset.GetRasterBand(1)
-        outband.WriteArray(dst_color[0], 0, i)
-        outband = outdataset.GetRasterBand(2)
-        outband.WriteArray(dst_color[1], 0, i)
-        outband = outdataset.GetRasterBand(3)
-        outband.WriteArray(dst_color[2], 0, i)
-        if aBand is not None:
-            aScanline = aBand.ReadAsArray(0, i, hillband.XSize, 1, hillband.XSize, 1)
-            outband = outdataset.GetRasterBand(4)
-            outband.WriteArray(aScanline, 0, i)
-
-        # update progress line
-        if not quiet:
-            gdal.TermProgress_nocb((float(i + 1) / hillband.YSize))
+    # process block sized windows in worker threads. All bands of a window
+    # are read, and then written, at once by the main thread, in order.
+    def read(window):
+        rgb = colordataset.ReadAsArray(*window.window, band_list=band_list)
+        hill = hillband.ReadAsArray(*window.window)
+        return rgb, hill
+
+    def process(data):
+        rgb, hill = data
+        dst_color = hsv_merge_block(rgb, hill, hillbandnodatavalue)
+        if len(band_list) == 4:
+            # copy the alpha band
+            dst_color = numpy.concatenate((dst_color, rgb[3:4]))
+        return dst_color
+
+    def write(window, dst_color):
+        outdataset.WriteArray(dst_color, window.xoff, window.yoff, band_list=band_list)
+
+    process_blocks(
+        get_block_windows(rBand),
+        read,
+        process,
+        write,
+        num_workers=num_threads,
+        progress_callback=None if quiet else gdal.TermProgress_nocb,
+    )
 
     return 0
 
@@ -29,6 +29,7 @@
 # DEALINGS IN THE SOFTWARE.
 ###############################################################################
 
+import hashlib
 import sys
 
 from osgeo import gdal, ogr
@@ -48,6 +49,7 @@ def Usage():
     print(
         "             [-compare_before_update] [-preserve_fid] [-select field_list] [-dry_run] [-progress] [-skip_failures] [-quiet]"
     )
+    print("             [-hash_index [-gt n]]")
     print("")
     print(
         "Update a target datasource with the features of a source datasource. Contrary to ogr2ogr,"
@@ -97,6 +99,22 @@ def Usage():
         " * When -select is specified, only the list of fields specified will be updated. This option is only compatible"
     )
     print("   with -update_only.")
+    print(
+        " * When -hash_index is specified, an in-memory index of the target layer, from the FID or the value of the match field"
+    )
+    print(
+        "   to the FID (and a digest of the content with -compare_before_update) of the target features, is built first."
+    )
+    print(
+        "   Source features are then matched against it, and the inserts and updates are grouped in transactions of"
+    )
+    print(
+        "   n features (-gt, 100000 by default). With -compare_before_update, features are considered as equal when their"
+    )
+    print(
+        "   field values and the binary encoding of their geometries are equal. Source features with a null value in the"
+    )
+    print("   match field do not match any target feature.")
     print("")
 
     return 2
@@ -132,6 +150,10 @@ def ogrupdate_analyse_args(argv, progress=None, progress_arg=None):
 
     dry_run = False
 
+    hash_index = False
+
+    transaction_size = None
+
     if not argv:
         return Usage()
 
@@ -172,6 +194,11 @@ def ogrupdate_analyse_args(argv, progress=None, progress_arg=None):
                 papszSelFields = []
         elif arg == "-dry_run":
             dry_run = True
+        elif arg == "-hash_index":
+            hash_index = True
+        elif arg == "-gt" and i + 1 < len(argv):
+            i = i + 1
+            transaction_size = int(argv[i])
         elif arg == "-progress":
             progress = ogr.TermProgress_nocb
             progress_arg = None
@@ -230,6 +257,7 @@ def ogrupdate_analyse_args(argv, progress=None, progress_arg=None):
 
     if (
         matchfieldname is None
+        and not hash_index
         and dst_layer.TestCapability(ogr.OLCRandomRead) == 0
         and not quiet
     ):
@@ -237,6 +265,11 @@ def ogrupdate_analyse_args(argv, progress=None, progress_arg=None):
             "Warning: target layer does not advertise fast random read capability. Update might be slow"
         )
 
+    if transaction_size is None:
+        transaction_size = 100000
+    elif not hash_index and not quiet:
+        print("Warning: -gt is only used with -hash_index. Ignoring it")
+
     if papszSelFields is not None and compare_before_update:
         print(
             "Warning: -select and -compare_before_update are not compatible. Ignoring -compare_before_update"
@@ -289,6 +322,8 @@ def ogrupdate_analyse_args(argv, progress=None, progress_arg=None):
         inserted_failed,
         progress,
         progress_arg,
+        hash_index,
+        transaction_size,
     )
 
     if not quiet:
@@ -327,6 +362,265 @@ def AreFeaturesEqual(src_feat, dst_feat):
     return True
 
 
+###############################################################
+# GetFeatureDigest()
+
+
+def GetFeatureDigest(feat):
+    h = hashlib.blake2b(digest_size=16)
+    h.update(repr([feat.GetField(i) for i in range(feat.GetFieldCount())]).encode())
+    for i in range(feat.GetGeomFieldCount()):
+        geom = feat.GetGeomFieldRef(i)
+        h.update(b"\0" if geom is None else b"\1" + geom.ExportToIsoWkb())
+    return h.digest()
+
+
+###############################################################
+# GetMatchKeyFunction()
+
+
+def GetMatchKeyFunction(idx, match_type):
+    """Return a function computing the match key of a feature, consistent
+    with the attribute filter used when not using -hash_index"""
+    if match_type == ogr.OFTReal:
+        return lambda feat: feat.GetFieldAsDouble(idx)
+    if match_type == ogr.OFTInteger:
+        return lambda feat: feat.GetFieldAsInteger(idx)
+    return lambda feat: feat.GetFieldAsString(idx)
+
+
+###############################################################
+# AddToDestinationIndex()
+
+
+def AddToDestinationIndex(index, dst_feat, dst_idx, dst_key, compute_digest):
+    if dst_idx is None:
+        key = dst_feat.GetFID()
+    elif not dst_feat.IsFieldSetAndNotNull(dst_idx):
+        # would not be selected by the attribute filter
+        return
+    else:
+        key = dst_key(dst_feat)
+    # Like with the attribute filter, the first matching feature is used
+    if key not in index:
+        index[key] = [
+            dst_feat.GetFID(),
+            GetFeatureDigest(dst_feat) if compute_digest else None,
+        ]
+
+
+###############################################################
+# BuildDestinationIndex()
+
+
+def BuildDestinationIndex(dst_layer, dst_idx, dst_key, compute_digest):
+    """Return a dictionary from the match key (the FID if dst_idx is None) of
+    the features of the destination layer to their [FID, digest] pair, the
+    digest being None if compute_digest is False"""
+    if not compute_digest:
+        # Only fetch what is needed to compute the key
+        dst_layer_defn = dst_layer.GetLayerDefn()
+        ignored_fields = ["OGR_GEOMETRY", "OGR_STYLE"]
+        for i in range(dst_layer_defn.GetFieldCount()):
+            if i != dst_idx:
+                ignored_fields.append(dst_layer_defn.GetFieldDefn(i).GetName())
+        for i in range(dst_layer_defn.GetGeomFieldCount()):
+            name = dst_layer_defn.GetGeomFieldDefn(i).GetName()
+            if name:
+                ignored_fields.append(name)
+        dst_layer.SetIgnoredFields(ignored_fields)
+
+    index = {}
+    dst_layer.ResetReading()
+    for dst_feat in dst_layer:
+        AddToDestinationIndex(index, dst_feat, dst_idx, dst_key, compute_digest)
+
+    if not compute_digest:
+        dst_layer.SetIgnoredFields([])
+    dst_layer.ResetReading()
+    return index
+
+
+###############################################################
+# ogrupdate_process_hash_index()
+
+
+def ogrupdate_process_hash_index(
+    src_layer,
+    dst_layer,
+    matchfieldname,
+    update_mode,
+    preserve_fid,
+    compare_before_update,
+    papszSelFields,
+    dry_run,
+    skip_failures,
+    transaction_size,
+    counts,
+    progress,
+    progress_arg,
+):
+
+    src_layer_defn = src_layer.GetLayerDefn()
+    dst_layer_defn = dst_layer.GetLayerDefn()
+
+    src_idx = None
+    dst_idx = None
+    src_key = None
+    dst_key = None
+    if matchfieldname is not None:
+        src_idx = src_layer_defn.GetFieldIndex(matchfieldname)
+        dst_idx = dst_layer_defn.GetFieldIndex(matchfieldname)
+        src_type = src_layer_defn.GetFieldDefn(src_idx).GetType()
+        dst_type = dst_layer_defn.GetFieldDefn(dst_idx).GetType()
+        match_type = src_type if src_type == dst_type else ogr.OFTString
+        src_key = GetMatchKeyFunction(src_idx, match_type)
+        dst_key = GetMatchKeyFunction(dst_idx, match_type)
+
+    index = BuildDestinationIndex(dst_layer, dst_idx, dst_key, compare_before_update)
+
+    # Fields and geometry fields updated by UpdateFeature()
+    if papszSelFields is not None:
+        sel_fields = [
+            (
+                src_layer_defn.GetFieldIndex(fieldname),
+                dst_layer_defn.GetFieldIndex(fieldname),
+            )
+            for fieldname in papszSelFields
+        ]
+        updated_fields = [dst_fld_idx for _, dst_fld_idx in sel_fields]
+        updated_geom_fields = []
+        update_style_string = False
+    else:
+        # Same fields as the ones set by SetFrom()
+        updated_fields = [
+            i
+            for i in range(dst_layer_defn.GetFieldCount())
+            if src_layer_defn.GetFieldIndex(dst_layer_defn.GetFieldDefn(i).GetName())
+            >= 0
+        ]
+        updated_geom_fields = list(range(dst_layer_defn.GetGeomFieldCount()))
+        update_style_string = True
+
+    if progress is not None:
+        src_featurecount = src_layer.GetFeatureCount()
+
+    use_transactions = not dry_run and transaction_size > 0
+    written_in_transaction = 0
+    if use_transactions:
+        dst_layer.StartTransaction()
+
+    ret = 0
+
+    iter_src_feature = 0
+    src_layer.ResetReading()
+    while True:
+        src_feat = src_layer.GetNextFeature()
+        if src_feat is None:
+            break
+        src_fid = src_feat.GetFID()
+
+        iter_src_feature = iter_src_feature + 1
+        if progress is not None:
+            if (
+                progress(iter_src_feature * 1.0 / src_featurecount, "", progress_arg)
+                != 1
+            ):
+                ret = 1
+                break
+
+        if src_key is None:
+            match = index.get(src_fid)
+        elif src_feat.IsFieldSetAndNotNull(src_idx):
+            match = index.get(src_key(src_feat))
+        else:
+            # A null value does not match any feature
+            match = None
+
+        if match is None:
+            if update_mode == UPDATE_ONLY:
+                continue
+            dst_feat = ogr.Feature(dst_layer_defn)
+            dst_feat.SetFrom(src_feat)
+            if preserve_fid:
+                dst_feat.SetFID(src_fid)
+            if dry_run:
+                ret = 0
+            else:
+                ret = dst_layer.CreateFeature(dst_feat)
+            if ret == 0:
+                counts["inserted"] += 1
+                if not dry_run:
+                    # Later source features with the same key will update it
+                    AddToDestinationIndex(
+                        index, dst_feat, dst_idx, dst_key, compare_before_update
+                    )
+            else:
+                counts["inserted_failed"] += 1
+
+        elif update_mode == APPEND_ONLY:
+            continue
+
+        else:
+            dst_fid, dst_digest = match
+            if compare_before_update and GetFeatureDigest(src_feat) == dst_digest:
+                continue
+            dst_feat = ogr.Feature(dst_layer_defn)
+            if papszSelFields is not None:
+                for fld_src_idx, fld_dst_idx in sel_fields:
+                    fld_type = src_layer_defn.GetFieldDefn(fld_src_idx).GetType()
+                    if fld_type == ogr.OFTReal:
+                        dst_feat.SetField(
+                            fld_dst_idx, src_feat.GetFieldAsDouble(fld_src_idx)
+                        )
+                    elif fld_type == ogr.OFTInteger:
+                        dst_feat.SetField(
+                            fld_dst_idx, src_feat.GetFieldAsInteger(fld_src_idx)
+                        )
+                    else:
+                        dst_feat.SetField(
+                            fld_dst_idx, src_feat.GetFieldAsString(fld_src_idx)
+                        )
+            else:
+                dst_feat.SetFrom(src_feat)
+            dst_feat.SetFID(dst_fid)
+            if dry_run:
+                ret = 0
+            else:
+                ret = dst_layer.UpdateFeature(
+                    dst_feat, updated_fields, updated_geom_fields, update_style_string
+                )
+            if ret == 0:
+                counts["updated"] += 1
+                if compare_before_update and not dry_run:
+                    match[1] = GetFeatureDigest(src_feat)
+            else:
+                counts["updated_failed"] += 1
+
+        if ret != 0:
+            if not skip_failures:
+                if gdal.GetLastErrorMsg() == "":
+                    print(
+                        "An error occurred during feature insertion/update. "
+                        "Interrupting processing."
+                    )
+                ret = 1
+                break
+            else:
+                ret = 0
+        elif use_transactions and not dry_run:
+            written_in_transaction += 1
+            if written_in_transaction == transaction_size:
+                dst_layer.CommitTransaction()
+                dst_layer.StartTransaction()
+                written_in_transaction = 0
+
+    if use_transactions:
+        dst_layer.CommitTransaction()
+
+    return ret
+
+
 ###############################################################
 # ogrupdate_process()
 
@@ -347,6 +641,8 @@ def ogrupdate_process(
     inserted_failed_out=None,
     progress=None,
     progress_arg=None,
+    hash_index=False,
+    transaction_size=100000,
 ):
 
     src_layer_defn = src_layer.GetLayerDefn()
@@ -375,6 +671,38 @@ def ogrupdate_process(
                         print("Cannot find field '%s' in destination layer" % fieldname)
                     return 1
 
+    if hash_index:
+        counts = {
+            "updated": 0,
+            "updated_failed": 0,
+            "inserted": 0,
+            "inserted_failed": 0,
+        }
+        ret = ogrupdate_process_hash_index(
+            src_layer,
+            dst_layer,
+            matchfieldname,
+            update_mode,
+            preserve_fid,
+            compare_before_update,
+            papszSelFields,
+            dry_run,
+            skip_failures,
+            transaction_size,
+            counts,
+            progress,
+            progress_arg,
+        )
+        if updated_count_out is not None and len(updated_count_out) == 1:
+            updated_count_out[0] = counts["updated"]
+        if updated_failed_out is not None and len(updated_failed_out) == 1:
+            updated_failed_out[0] = counts["updated_failed"]
+        if inserted_count_out is not None and len(inserted_count_out) == 1:
+            inserted_count_out[0] = counts["inserted"]
+        if inserted_failed_out is not None and len(inserted_failed_out) == 1:
+            inserted_failed_out[0] = counts["inserted_failed"]
+        return ret
+
     if progress is not None:
         src_featurecount = src_layer.GetFeatureCount()
 
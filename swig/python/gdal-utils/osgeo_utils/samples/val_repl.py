@@ -38,6 +38,11 @@ import sys
 import numpy as np
 
 from osgeo import gdal
+from osgeo_utils.auxiliary.block_processing import (
+    get_block_windows,
+    get_num_workers,
+    process_blocks,
+)
 
 gdal.TermProgress = gdal.TermProgress_nocb
 
@@ -47,7 +52,8 @@ gdal.TermProgress = gdal.TermProgress_nocb
 
 def Usage():
     print("Usage: val_repl.py -innd in_nodata_value -outnd out_nodata_value")
-    print("                   [-of out_format] [-ot out_type] infile outfile")
+    print("                   [-of out_format] [-ot out_type]")
+    print("                   [-threads {ALL_CPUS|number}] infile outfile")
     print("")
     return 2
 
@@ -66,6 +72,7 @@ def main(argv=sys.argv):
     outfile = None
     driver_name = "GTiff"
     typ = gdal.GDT_Byte
+    num_threads = 1
 
     # Parse command line arguments.
     i = 1
@@ -88,6 +95,10 @@ def main(argv=sys.argv):
             i = i + 1
             typ = ParseType(argv[i])
 
+        elif arg == "-threads":
+            i = i + 1
+            num_threads = get_num_workers(argv[i])
+
         elif infile is None:
             infile = arg
 
@@ -127,14 +138,24 @@ def main(argv=sys.argv):
     if prj:
         outdataset.SetProjection(prj)
 
-    for iBand in range(1, indataset.RasterCount + 1):
-        inband = indataset.GetRasterBand(iBand)
-        outband = outdataset.GetRasterBand(iBand)
+    # process windows of whole blocks of all the bands at once
+    def read(window):
+        return indataset.ReadAsArray(*window.window)
+
+    def process(data):
+        return np.choose(np.equal(data, inNoData), (data, outNoData))
 
-        for i in range(inband.YSize - 1, -1, -1):
-            scanline = inband.ReadAsArray(0, i, inband.XSize, 1, inband.XSize, 1)
-            scanline = np.choose(np.equal(scanline, inNoData), (scanline, outNoData))
-            outband.WriteArray(scanline, 0, i)
+    def write(window, data):
+        outdataset.WriteArray(data, window.xoff, window.yoff)
+
+    process_blocks(
+        get_block_windows(indataset.GetRasterBand(1)),
+        read,
+        process,
+        write,
+        num_workers=num_threads,
+        progress_callback=None,
+    )
     return 0
 
 
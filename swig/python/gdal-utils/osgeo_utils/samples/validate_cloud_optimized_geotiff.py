@@ -53,6 +53,150 @@ class ValidateCloudOptimizedGeoTIFFException(Exception):
     pass
 
 
+# Ranges of bytes read by the full check that are separated by less than
+# FULL_CHECK_MAX_GAP bytes are fetched by a single read, of at most
+# FULL_CHECK_MAX_READ_SIZE bytes.
+FULL_CHECK_MAX_GAP = 1024 * 1024
+FULL_CHECK_MAX_READ_SIZE = 16 * 1024 * 1024
+
+TIFFTAG_STRIPOFFSETS = 273
+TIFFTAG_SAMPLESPERPIXEL = 277
+TIFFTAG_STRIPBYTECOUNTS = 279
+TIFFTAG_PLANARCONFIG = 284
+TIFFTAG_TILEOFFSETS = 324
+TIFFTAG_TILEBYTECOUNTS = 325
+
+# struct format of the TIFF data types that can be found in the tags read
+TIFF_TYPE_FORMATS = {3: "H", 4: "I", 13: "I", 16: "Q", 18: "Q"}
+
+
+def read_ifd_tags(f, ifd_offset, tags):
+    """Return a dictionary with the values of the given tags of an IFD.
+
+    The values of each tag are read with a single read.
+    """
+
+    gdal.VSIFSeekL(f, 0, 0)
+    header = gdal.VSIFReadL(4, 1, f)
+    byte_order = "<" if header[0:2] == b"II" else ">"
+    bigtiff = struct.unpack(byte_order + "H", header[2:4])[0] == 43
+    if bigtiff:
+        count_format, entry_format, entry_size, inline_size = "Q", "HHQ8s", 20, 8
+    else:
+        count_format, entry_format, entry_size, inline_size = "H", "HHI4s", 12, 4
+
+    gdal.VSIFSeekL(f, ifd_offset, 0)
+    count_size = struct.calcsize(count_format)
+    entry_count = struct.unpack(
+        byte_order + count_format, gdal.VSIFReadL(count_size, 1, f)
+    )[0]
+    entries = gdal.VSIFReadL(entry_size * entry_count, 1, f)
+
+    values = {}
+    for i in range(entry_count):
+        tag, tiff_type, count, value = struct.unpack(
+            byte_order + entry_format, entries[i * entry_size : (i + 1) * entry_size]
+        )
+        if tag not in tags or tiff_type not in TIFF_TYPE_FORMATS:
+            continue
+        value_format = byte_order + "%d%s" % (count, TIFF_TYPE_FORMATS[tiff_type])
+        size = struct.calcsize(value_format)
+        if size > inline_size:
+            value_offset = struct.unpack(byte_order + ("Q" if bigtiff else "I"), value)[
+                0
+            ]
+            gdal.VSIFSeekL(f, value_offset, 0)
+            value = gdal.VSIFReadL(size, 1, f)
+        if len(value) < size:
+            continue
+        values[tag] = struct.unpack(value_format, value[0:size])
+    return values
+
+
+def get_block_offsets_and_sizes(f, band):
+    """Return the lists of the offsets and sizes of the blocks of a band,
+    in row major order, 0 for missing blocks."""
+
+    block_size = band.GetBlockSize()
+    yblocks = (band.YSize + block_size[1] - 1) // block_size[1]
+    xblocks = (band.XSize + block_size[0] - 1) // block_size[0]
+    block_count = xblocks * yblocks
+
+    # Read the offset and size arrays from the IFD of the band
+    ifd_offset = band.GetMetadataItem("IFD_OFFSET", "TIFF")
+    if ifd_offset is not None:
+        tags = read_ifd_tags(
+            f,
+            int(ifd_offset),
+            (
+                TIFFTAG_STRIPOFFSETS,
+                TIFFTAG_SAMPLESPERPIXEL,
+                TIFFTAG_STRIPBYTECOUNTS,
+                TIFFTAG_PLANARCONFIG,
+                TIFFTAG_TILEOFFSETS,
+                TIFFTAG_TILEBYTECOUNTS,
+            ),
+        )
+        offsets = tags.get(TIFFTAG_TILEOFFSETS, tags.get(TIFFTAG_STRIPOFFSETS))
+        sizes = tags.get(TIFFTAG_TILEBYTECOUNTS, tags.get(TIFFTAG_STRIPBYTECOUNTS))
+        first_block = 0
+        expected_count = block_count
+        if tags.get(TIFFTAG_PLANARCONFIG, (1,))[0] == 2:
+            first_block = (band.GetBand() - 1) * block_count
+            expected_count = block_count * tags.get(TIFFTAG_SAMPLESPERPIXEL, (1,))[0]
+        # the block layout of GDAL may differ from the TIFF one, for example
+        # for single strip files
+        if (
+            offsets is not None
+            and sizes is not None
+            and first_block >= 0
+            and len(offsets) == len(sizes) == expected_count
+        ):
+            offsets = offsets[first_block : first_block + block_count]
+            sizes = sizes[first_block : first_block + block_count]
+            return (
+                [offset if size else 0 for offset, size in zip(offsets, sizes)],
+                [size if offset else 0 for offset, size in zip(offsets, sizes)],
+            )
+
+    offsets = []
+    sizes = []
+    for y in range(yblocks):
+        for x in range(xblocks):
+            offset = band.GetMetadataItem("BLOCK_OFFSET_%d_%d" % (x, y), "TIFF")
+            offsets.append(int(offset) if offset is not None else 0)
+            bytecount = band.GetMetadataItem("BLOCK_SIZE_%d_%d" % (x, y), "TIFF")
+            sizes.append(int(bytecount) if bytecount is not None else 0)
+    return offsets, sizes
+
+
+def read_ranges(f, ranges):
+    """Return a dictionary of the bytes of the (offset, size) ranges,
+    reading ranges close to each other at once."""
+
+    result = {}
+    ranges = sorted(set(ranges))
+    i = 0
+    while i < len(ranges):
+        start = ranges[i][0]
+        end = ranges[i][0] + ranges[i][1]
+        j = i + 1
+        while (
+            j < len(ranges)
+            and ranges[j][0] - end <= FULL_CHECK_MAX_GAP
+            and max(end, ranges[j][0] + ranges[j][1]) - start
+            <= FULL_CHECK_MAX_READ_SIZE
+        ):
+            end = max(end, ranges[j][0] + ranges[j][1])
+            j += 1
+        gdal.VSIFSeekL(f, start, 0)
+        data = gdal.VSIFReadL(1, end - start, f)
+        for offset, size in ranges[i:j]:
+            result[(offset, size)] = data[offset - start : offset - start + size]
+        i = j
+    return result
+
+
 def full_check_band(
     f,
     band_name,
@@ -75,78 +219,80 @@ def full_check_band(
             ]
             mask_band = None
 
-    yblocks = (band.YSize + block_size[1] - 1) // block_size[1]
     xblocks = (band.XSize + block_size[0] - 1) // block_size[0]
+    offsets, bytecounts = get_block_offsets_and_sizes(f, band)
+    if mask_band:
+        offsets_mask, _ = get_block_offsets_and_sizes(f, mask_band)
+
+    # Fetch the leader and trailer bytes of all the blocks
+    ranges = []
+    for offset, bytecount in zip(offsets, bytecounts):
+        if offset > 0:
+            if block_leader_size_as_uint4:
+                ranges.append((offset - 4, 4))
+            if block_trailer_last_4_bytes_repeated and bytecount >= 4:
+                ranges.append((offset + bytecount - 4, 8))
+    range_bytes = read_ranges(f, ranges)
+
     last_offset = 0
-    for y in range(yblocks):
-        for x in range(xblocks):
+    for block_id, (offset, bytecount) in enumerate(zip(offsets, bytecounts)):
+        y, x = divmod(block_id, xblocks)
 
-            offset = band.GetMetadataItem("BLOCK_OFFSET_%d_%d" % (x, y), "TIFF")
-            offset = int(offset) if offset is not None else 0
-            bytecount = band.GetMetadataItem("BLOCK_SIZE_%d_%d" % (x, y), "TIFF")
-            bytecount = int(bytecount) if bytecount is not None else 0
+        if offset > 0:
+            if block_order_row_major and offset < last_offset:
+                errors += [
+                    band_name
+                    + ": offset of block (%d, %d) is smaller than previous block"
+                    % (x, y)
+                ]
 
-            if offset > 0:
-                if block_order_row_major and offset < last_offset:
+            if block_leader_size_as_uint4:
+                leader_size = struct.unpack("<I", range_bytes[(offset - 4, 4)])[0]
+                if leader_size != bytecount:
                     errors += [
                         band_name
-                        + ": offset of block (%d, %d) is smaller than previous block"
-                        % (x, y)
+                        + ": for block (%d, %d), size in leader bytes is %d instead of %d"
+                        % (x, y, leader_size, bytecount)
                     ]
 
-                if block_leader_size_as_uint4:
-                    gdal.VSIFSeekL(f, offset - 4, 0)
-                    leader_size = struct.unpack("<I", gdal.VSIFReadL(4, 1, f))[0]
-                    if leader_size != bytecount:
+            if block_trailer_last_4_bytes_repeated:
+                if bytecount >= 4:
+                    last_bytes = range_bytes[(offset + bytecount - 4, 8)]
+                    if last_bytes[0:4] != last_bytes[4:8]:
                         errors += [
                             band_name
-                            + ": for block (%d, %d), size in leader bytes is %d instead of %d"
-                            % (x, y, leader_size, bytecount)
+                            + ": for block (%d, %d), trailer bytes are invalid" % (x, y)
                         ]
 
-                if block_trailer_last_4_bytes_repeated:
-                    if bytecount >= 4:
-                        gdal.VSIFSeekL(f, offset + bytecount - 4, 0)
-                        last_bytes = gdal.VSIFReadL(8, 1, f)
-                        if last_bytes[0:4] != last_bytes[4:8]:
-                            errors += [
-                                band_name
-                                + ": for block (%d, %d), trailer bytes are invalid"
-                                % (x, y)
-                            ]
-
-            if mask_band:
-                offset_mask = mask_band.GetMetadataItem(
-                    "BLOCK_OFFSET_%d_%d" % (x, y), "TIFF"
+        if mask_band:
+            offset_mask = offsets_mask[block_id]
+            if offset > 0 and offset_mask > 0:
+                # bytecount_mask = int(mask_band.GetMetadataItem('BLOCK_SIZE_%d_%d' % (x,y), 'TIFF'))
+                expected_offset_mask = (
+                    offset
+                    + bytecount
+                    + (4 if block_leader_size_as_uint4 else 0)
+                    + (4 if block_trailer_last_4_bytes_repeated else 0)
                 )
-                offset_mask = int(offset_mask) if offset_mask is not None else 0
-                if offset > 0 and offset_mask > 0:
-                    # bytecount_mask = int(mask_band.GetMetadataItem('BLOCK_SIZE_%d_%d' % (x,y), 'TIFF'))
-                    expected_offset_mask = (
-                        offset
-                        + bytecount
-                        + (4 if block_leader_size_as_uint4 else 0)
-                        + (4 if block_trailer_last_4_bytes_repeated else 0)
-                    )
-                    if offset_mask != expected_offset_mask:
-                        errors += [
-                            "Mask of "
-                            + band_name
-                            + ": for block (%d, %d), offset is %d, whereas %d was expected"
-                            % (x, y, offset_mask, expected_offset_mask)
-                        ]
-                elif offset == 0 and offset_mask > 0:
-                    if block_order_row_major and offset_mask < last_offset:
-                        errors += [
-                            "Mask of "
-                            + band_name
-                            + ": offset of block (%d, %d) is smaller than previous block"
-                            % (x, y)
-                        ]
+                if offset_mask != expected_offset_mask:
+                    errors += [
+                        "Mask of "
+                        + band_name
+                        + ": for block (%d, %d), offset is %d, whereas %d was expected"
+                        % (x, y, offset_mask, expected_offset_mask)
+                    ]
+            elif offset == 0 and offset_mask > 0:
+                if block_order_row_major and offset_mask < last_offset:
+                    errors += [
+                        "Mask of "
+                        + band_name
+                        + ": offset of block (%d, %d) is smaller than previous block"
+                        % (x, y)
+                    ]
 
-                    offset = offset_mask
+                offset = offset_mask
 
-            last_offset = offset
+        last_offset = offset
 
 
 def validate(ds, check_tiled=True, full_check=False):